@@ -0,0 +1,123 @@
+"""
+Fan-Out Benchmark
+=================
+
+Measures the allocations and the time of :meth:`AbstractModule.append` for a varying
+number of subscribers. The current implementation hands the same update message to all
+subscribers. For comparison, the benchmark also measures appending a shallow copy of the
+update message for every subscriber, which was necessary as long as update messages
+stored their iteration cursor on the instance.
+"""
+
+import argparse
+import copy
+import time
+import tracemalloc
+
+import retico_core
+from retico_core import audio
+
+
+class FrameProducer(retico_core.AbstractProducingModule):
+    """A producing module that is never run and only used to create and append IUs."""
+
+    @staticmethod
+    def name():
+        return "Frame Producer"
+
+    @staticmethod
+    def description():
+        return "A module that creates audio frames for the benchmark."
+
+    @staticmethod
+    def output_iu():
+        return audio.AudioIU
+
+    def process_update(self, update_message):
+        return None
+
+
+class Sink(retico_core.AbstractConsumingModule):
+    """A consuming module that is never run and only used as a subscriber."""
+
+    @staticmethod
+    def name():
+        return "Sink"
+
+    @staticmethod
+    def description():
+        return "A module that subscribes to the producer."
+
+    @staticmethod
+    def input_ius():
+        return [audio.AudioIU]
+
+    def process_update(self, update_message):
+        return None
+
+
+def append_with_copy(module, update_message):
+    """Append the update message the way it was done before (one copy per queue)."""
+    for q in module.right_buffers():
+        q.put(copy.copy(update_message))
+
+
+def measure(subscribers, messages, append):
+    producer = FrameProducer()
+    sinks = [Sink() for _ in range(subscribers)]
+    for sink in sinks:
+        producer.subscribe(sink)
+    update_messages = []
+    for _ in range(messages):
+        iu = producer.create_iu()
+        iu.set_audio(b"\0" * 640, 320, 16000, 2)
+        update_messages.append(
+            retico_core.UpdateMessage.from_iu(iu, retico_core.UpdateType.ADD)
+        )
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    for update_message in update_messages:
+        append(producer, update_message)
+    duration = time.perf_counter() - start
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / messages, duration / messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000, help="Messages to append")
+    parser.add_argument(
+        "--subscribers",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8, 16, 32],
+        help="Numbers of subscribers",
+    )
+    args = parser.parse_args()
+
+    print(
+        "%11s  %15s  %15s  %12s  %12s"
+        % ("subscribers", "copy B/msg", "shared B/msg", "copy us/msg", "shared us/msg")
+    )
+    for subscribers in args.subscribers:
+        copy_bytes, copy_time = measure(subscribers, args.messages, append_with_copy)
+        shared_bytes, shared_time = measure(
+            subscribers, args.messages, retico_core.AbstractModule.append
+        )
+        print(
+            "%11d  %15.0f  %15.0f  %12.2f  %12.2f"
+            % (
+                subscribers,
+                copy_bytes,
+                shared_bytes,
+                copy_time * 1e6,
+                shared_time * 1e6,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
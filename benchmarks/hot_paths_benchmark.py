@@ -0,0 +1,259 @@
+"""
+Hot Paths Benchmark
+===================
+
+Measures the time of the operations of retico_core.abstract that are executed for every
+incremental unit or update message flowing through a network:
+
+- creating IUs with create_iu (including the truncation of old links) and runs of
+  100 IUs with create_iu and create_ius,
+- creating update messages with UpdateMessage.from_iu and add_iu,
+- checking the IU types of update messages with has_valid_ius,
+- appending update messages to 1 to 16 subscribers,
+- putting update messages into and getting them out of an incremental queue,
+- marking IUs as processed with set_processed (by several modules and by the
+  single module an IU was sent to) and
+- revoking and committing IUs in a large current_output list.
+
+The results can be saved as JSON and compared with the results of an earlier run
+(e.g., of another version of retico-core):
+
+    python benchmarks/hot_paths_benchmark.py --output before.json
+    python benchmarks/hot_paths_benchmark.py --compare before.json
+"""
+
+import argparse
+import json
+import platform
+import time
+
+import retico_core
+from retico_core import text
+
+
+class TextProducer(retico_core.AbstractModule):
+    """A module that is never run and only used to create and append IUs."""
+
+    @staticmethod
+    def name():
+        return "Text Producer"
+
+    @staticmethod
+    def description():
+        return "A module that creates text IUs for the benchmark."
+
+    @staticmethod
+    def input_ius():
+        return [text.TextIU]
+
+    @staticmethod
+    def output_iu():
+        return text.TextIU
+
+    def process_update(self, update_message):
+        return None
+
+
+def measure(operation, number, repeat):
+    """Return the best time in seconds per call of operation(i) for i in range(number)
+    over repeat runs."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(number):
+            operation(i)
+        duration = (time.perf_counter() - start) / number
+        if best is None or duration < best:
+            best = duration
+    return best
+
+
+def bench_create_iu(number, repeat):
+    module = TextProducer()
+    source = TextProducer()
+    grounded_in = source.create_iu()
+    for _ in range(retico_core.IncrementalUnit.MAX_DEPTH + 1):
+        grounded_in = source.create_iu(grounded_in)
+    return measure(lambda i: module.create_iu(grounded_in), number, repeat)
+
+
+def bench_create_run(batch, number, repeat):
+    module = TextProducer()
+    grounded_in = TextProducer().create_iu()
+    if batch:
+        return measure(lambda i: module.create_ius(100, grounded_in), number, repeat)
+
+    def operation(i):
+        for _ in range(100):
+            module.create_iu(grounded_in)
+
+    return measure(operation, number, repeat)
+
+
+def bench_from_iu(number, repeat):
+    iu = TextProducer().create_iu()
+    add = retico_core.UpdateType.ADD
+    return measure(lambda i: retico_core.UpdateMessage.from_iu(iu, add), number, repeat)
+
+
+def bench_add_iu(number, repeat):
+    module = TextProducer()
+    ius = [module.create_iu() for _ in range(10)]
+    add = retico_core.UpdateType.ADD
+
+    def operation(i):
+        update_message = retico_core.UpdateMessage()
+        for iu in ius:
+            update_message.add_iu(iu, add)
+
+    return measure(operation, number, repeat)
+
+
+def bench_has_valid_ius(number, repeat):
+    module = TextProducer()
+    update_message = retico_core.UpdateMessage()
+    for _ in range(10):
+        update_message.add_iu(module.create_iu(), retico_core.UpdateType.ADD)
+    iu_classes = [text.TextIU]
+    return measure(lambda i: update_message.has_valid_ius(iu_classes), number, repeat)
+
+
+def bench_append(subscribers, number, repeat):
+    producer = TextProducer()
+    queues = [producer.subscribe(TextProducer()) for _ in range(subscribers)]
+    update_messages = [
+        retico_core.UpdateMessage.from_iu(
+            producer.create_iu(), retico_core.UpdateType.ADD
+        )
+        for _ in range(number)
+    ]
+
+    def operation(i):
+        producer.append(update_messages[i])
+        if i == number - 1:
+            for q in queues:
+                q.clear()
+
+    return measure(operation, number, repeat)
+
+
+def bench_queue(number, repeat):
+    q = retico_core.IncrementalQueue(None, None)
+    update_message = retico_core.UpdateMessage.from_iu(
+        TextProducer().create_iu(), retico_core.UpdateType.ADD
+    )
+
+    def operation(i):
+        q.put(update_message)
+        q.get_nowait()
+
+    return measure(operation, number, repeat)
+
+
+def bench_set_processed(number, repeat):
+    producer = TextProducer()
+    consumers = [TextProducer() for _ in range(4)]
+    ius = [producer.create_iu() for _ in range(number)]
+
+    def operation(i):
+        iu = ius[i]
+        for consumer in consumers:
+            iu.set_processed(consumer)
+
+    return measure(operation, number, repeat)
+
+
+def bench_set_processed_single_writer(number, repeat):
+    producer = TextProducer()
+    consumer = TextProducer()
+    producer.subscribe(consumer)
+    ius = [producer.create_iu() for _ in range(number)]
+    producer.append(retico_core.UpdateMessage.from_iu_list([(iu, "add") for iu in ius]))
+
+    def operation(i):
+        ius[i].set_processed(consumer)
+
+    return measure(operation, number, repeat)
+
+
+def bench_current_output(method, size, number, repeat):
+    module = TextProducer()
+    module.current_output = [module.create_iu() for _ in range(size)]
+    last = module.current_output[-1]
+    if method == "revoke":
+        return measure(
+            lambda i: module.revoke(last, remove_revoked=False), number, repeat
+        )
+    return measure(lambda i: module.commit(last), number, repeat)
+
+
+def run(number, repeat, output_size):
+    results = {
+        "create_iu": bench_create_iu(number, repeat),
+        "create_iu_x100": bench_create_run(False, max(number // 100, 10), repeat),
+        "create_ius_100": bench_create_run(True, max(number // 100, 10), repeat),
+        "update_message_from_iu": bench_from_iu(number, repeat),
+        "update_message_add_iu_x10": bench_add_iu(number, repeat),
+        "has_valid_ius_x10": bench_has_valid_ius(number, repeat),
+        "queue_put_get": bench_queue(number, repeat),
+        "set_processed_x4": bench_set_processed(number, repeat),
+        "set_processed_single_writer": bench_set_processed_single_writer(
+            number, repeat
+        ),
+    }
+    for subscribers in (1, 4, 16):
+        results["append_%d_subscribers" % subscribers] = bench_append(
+            subscribers, number, repeat
+        )
+    for method in ("revoke", "commit"):
+        results["%s_%d_outputs" % (method, output_size)] = bench_current_output(
+            method, output_size, max(number // 100, 10), repeat
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=10000, help="Calls per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark")
+    parser.add_argument(
+        "--output-size",
+        type=int,
+        default=1000,
+        help="Length of current_output for revoke and commit",
+    )
+    parser.add_argument("--output", help="Save the results as JSON to this file")
+    parser.add_argument("--compare", help="Compare with the results in this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.number, args.repeat, args.output_size)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    print("%-30s  %12s  %12s" % ("benchmark", "us/op", "vs. baseline"))
+    for name, seconds in results.items():
+        comparison = ""
+        if baseline.get(name):
+            comparison = "%.2fx" % (seconds / baseline[name])
+        print("%-30s  %12.3f  %12s" % (name, seconds * 1e6, comparison))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "retico_core": retico_core.__version__,
+                    "python": platform.python_version(),
+                    "number": args.number,
+                    "repeat": args.repeat,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
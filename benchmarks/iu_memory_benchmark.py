@@ -0,0 +1,93 @@
+"""
+IU Memory Benchmark
+===================
+
+Measures the memory and construction time of AudioIUs in their compact representation
+(slots, lazily created lock, processed list and meta data) in comparison to the former
+representation with a __dict__ and an eagerly created lock, processed list and meta
+data dictionary per IU.
+"""
+
+import argparse
+import threading
+import time
+import tracemalloc
+
+import retico_core
+from retico_core import audio
+
+
+class DictAudioIU(audio.AudioIU):
+    """An AudioIU with the former representation: a __dict__ and eagerly created
+    lock, processed list and meta data."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._mutex = threading.Lock()
+        self._processed_list = []
+        self._meta_data = {}
+
+
+class FrameProducer(retico_core.AbstractProducingModule):
+    """A producing module that is never run and only used as the creator of IUs."""
+
+    @staticmethod
+    def name():
+        return "Frame Producer"
+
+    @staticmethod
+    def description():
+        return "A module that creates audio frames for the benchmark."
+
+    @staticmethod
+    def output_iu():
+        return audio.AudioIU
+
+    def process_update(self, update_message):
+        return None
+
+
+def create(iu_class, creator, number, frame):
+    return [
+        iu_class(
+            creator=creator,
+            iuid=i,
+            rate=16000,
+            nframes=320,
+            sample_width=2,
+            raw_audio=frame,
+        )
+        for i in range(number)
+    ]
+
+
+def measure(iu_class, number):
+    creator = FrameProducer()
+    frame = b"\0" * 640
+    # The payload is shared by all IUs, so only the IUs themselves are measured.
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    ius = create(iu_class, creator, number, frame)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del ius
+
+    start = time.perf_counter()
+    ius = create(iu_class, creator, number, frame)
+    duration = time.perf_counter() - start
+    return (after - before) / number, duration / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=50000, help="IUs to create")
+    args = parser.parse_args()
+
+    print("%-12s  %10s  %10s" % ("iu", "B/IU", "us/IU"))
+    for label, iu_class in (("dict", DictAudioIU), ("compact", audio.AudioIU)):
+        memory, duration = measure(iu_class, args.number)
+        print("%-12s  %10.0f  %10.2f" % (label, memory, duration * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Revoke Latency Benchmark
+========================
+
+Measures the time until a REVOKE takes effect in an :class:`AudioDispatcherModule`
+while ADDs of other speech IUs are waiting in its left buffer. The benchmark compares
+the regular :class:`IncrementalQueue`, in which the revoke has to wait for all queued
+ADDs, with the :class:`PriorityIncrementalQueue`, in which it overtakes them.
+
+The latency is the time between appending the revoke and the moment the dispatcher
+removed the audio of the revoked IU from its audio buffer. The revoked IU is already
+being dispatched when the other ADDs and the revoke are appended.
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+import retico_core
+from retico_core import audio
+
+RATE = 16000
+SAMPLE_WIDTH = 2
+
+
+class SpeechProducer(retico_core.AbstractProducingModule):
+    """A producing module that is never run and only used to create and append IUs."""
+
+    @staticmethod
+    def name():
+        return "Speech Producer"
+
+    @staticmethod
+    def description():
+        return "A module that creates speech IUs for the benchmark."
+
+    @staticmethod
+    def output_iu():
+        return audio.SpeechIU
+
+    def process_update(self, update_message):
+        return None
+
+
+class TimedDispatcher(audio.AudioDispatcherModule):
+    """An audio dispatcher that records when it processed a revoke."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.revoked = threading.Event()
+        self.revoked_at = None
+
+    def process_update(self, update_message):
+        result = super().process_update(update_message)
+        if retico_core.UpdateType.REVOKE in update_message.update_types():
+            self.revoked_at = time.perf_counter()
+            self.revoked.set()
+        return result
+
+
+def speech_message(producer, seconds):
+    iu = producer.create_iu()
+    nframes = int(seconds * RATE)
+    iu.set_audio(b"\0" * nframes * SAMPLE_WIDTH, nframes, RATE, SAMPLE_WIDTH)
+    iu.dispatch = True
+    return retico_core.UpdateMessage.from_iu(iu, retico_core.UpdateType.ADD)
+
+
+def measure(queue_class, queued, seconds):
+    producer = SpeechProducer(queue_class=queue_class)
+    dispatcher = TimedDispatcher(
+        rate=RATE, sample_width=SAMPLE_WIDTH, continuous=False, interrupt=False
+    )
+    producer.subscribe(dispatcher)
+    utterance = speech_message(producer, seconds)
+    waiting = [speech_message(producer, seconds) for _ in range(queued)]
+    revoke = retico_core.UpdateMessage.from_iu(
+        next(utterance.incremental_units()), retico_core.UpdateType.REVOKE
+    )
+
+    dispatcher.run()
+    producer.append(utterance)
+    # The utterance is being spoken before the other ADDs and the revoke arrive.
+    while not dispatcher.is_dispatching():
+        time.sleep(0.001)
+    for update_message in waiting:
+        producer.append(update_message)
+    start = time.perf_counter()
+    producer.append(revoke)
+    dispatcher.revoked.wait()
+    latency = dispatcher.revoked_at - start
+    dispatcher.stop()
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--queued", type=int, default=30, help="ADDs waiting in front of the revoke"
+    )
+    parser.add_argument(
+        "--seconds", type=float, default=1.0, help="Length of each speech IU"
+    )
+    parser.add_argument("--trials", type=int, default=20, help="Number of trials")
+    args = parser.parse_args()
+
+    print("%-26s  %12s  %12s" % ("queue", "median ms", "max ms"))
+    for queue_class in (
+        retico_core.IncrementalQueue,
+        retico_core.PriorityIncrementalQueue,
+    ):
+        latencies = [
+            measure(queue_class, args.queued, args.seconds) for _ in range(args.trials)
+        ]
+        print(
+            "%-26s  %12.2f  %12.2f"
+            % (
+                queue_class.__name__,
+                statistics.median(latencies) * 1000,
+                max(latencies) * 1000,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Scheduler Benchmark
+===================
+
+Compares running every module in its own thread with running the modules on the shared
+worker pool of a :class:`retico_core.scheduler.Scheduler`.
+
+The benchmark builds a number of parallel chains of pass-through modules that are fed by
+a trigger module and end in a callback module. It measures the time it takes until all
+messages have passed through all chains and the mean latency of a message through one
+chain.
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+import retico_core
+from retico_core import debug, text
+
+
+class PassThroughModule(retico_core.AbstractModule):
+    """A module that creates one output IU for every input IU."""
+
+    @staticmethod
+    def name():
+        return "Pass Through Module"
+
+    @staticmethod
+    def description():
+        return "A module that passes on the text of the IUs it receives."
+
+    @staticmethod
+    def input_ius():
+        return [text.TextIU]
+
+    @staticmethod
+    def output_iu():
+        return text.TextIU
+
+    def process_update(self, update_message):
+        um = retico_core.UpdateMessage()
+        for iu, ut in update_message:
+            output_iu = self.create_iu(iu)
+            output_iu.payload = iu.payload
+            um.add_iu(output_iu, ut)
+        return um
+
+
+def build_network(chains, length):
+    """Build a network with the given number of chains of pass-through modules.
+
+    Returns:
+        (TextTriggerModule, list, threading.Event, list): The trigger module feeding the
+        chains, the latencies measured at the end of the chains, an event that is set
+        once all expected messages arrived and a one-element list with the expected
+        number of messages.
+    """
+    trigger = text.TextTriggerModule()
+    latencies = []
+    expected = [0]
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def callback(update_message):
+        now = time.perf_counter()
+        with lock:
+            for iu in update_message.incremental_units():
+                source = iu
+                while source.grounded_in is not None:
+                    source = source.grounded_in
+                latencies.append(now - source.meta_data["sent"])
+            if len(latencies) >= expected[0]:
+                done.set()
+
+    for _ in range(chains):
+        previous = trigger
+        for _ in range(length):
+            module = PassThroughModule()
+            previous.subscribe(module)
+            previous = module
+        previous.subscribe(debug.CallbackModule(callback))
+    return trigger, latencies, done, expected
+
+
+def run_benchmark(chains, length, messages, rate, scheduler=None):
+    """Run the benchmark once and return the results as a dict."""
+    trigger, latencies, done, expected = build_network(chains, length)
+    expected[0] = chains * messages
+    retico_core.network.run(trigger, scheduler=scheduler)
+    threads_running = threading.active_count()
+    time.sleep(0.2)
+    start = time.perf_counter()
+    for _ in range(messages):
+        iu = trigger.create_iu()
+        iu.payload = "benchmark"
+        iu.meta_data["sent"] = time.perf_counter()
+        trigger.append(retico_core.UpdateMessage.from_iu(iu, retico_core.UpdateType.ADD))
+        if rate:
+            time.sleep(1.0 / rate)
+    finished = done.wait(timeout=120)
+    duration = time.perf_counter() - start
+    retico_core.network.stop(trigger)
+    if not finished:
+        raise RuntimeError("Not all messages arrived in time")
+    return {
+        "threads": threads_running,
+        "duration": duration,
+        "throughput": len(latencies) / duration,
+        "mean_latency": statistics.mean(latencies),
+        "p95_latency": statistics.quantiles(latencies, n=20)[-1],
+    }
+
+
+def print_result(label, result):
+    print(
+        "%-22s threads: %4d  duration: %7.3fs  throughput: %9.1f msg/s  "
+        "latency mean: %7.3fms  p95: %7.3fms"
+        % (
+            label,
+            result["threads"],
+            result["duration"],
+            result["throughput"],
+            result["mean_latency"] * 1000,
+            result["p95_latency"] * 1000,
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chains", type=int, default=8, help="Number of chains")
+    parser.add_argument("--length", type=int, default=5, help="Modules per chain")
+    parser.add_argument("--messages", type=int, default=500, help="Messages per chain")
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0,
+        help="Messages per second sent by the trigger (0 sends as fast as possible)",
+    )
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4], help="Scheduler workers"
+    )
+    args = parser.parse_args()
+
+    print(
+        "%d chains of %d modules (%d modules), %d messages per chain"
+        % (args.chains, args.length, args.chains * (args.length + 1) + 1, args.messages)
+    )
+    result = run_benchmark(args.chains, args.length, args.messages, args.rate)
+    print_result("thread per module", result)
+    for workers in args.workers:
+        scheduler = retico_core.scheduler.Scheduler(workers=workers)
+        result = run_benchmark(
+            args.chains, args.length, args.messages, args.rate, scheduler
+        )
+        scheduler.shutdown()
+        print_result("scheduler (%d workers)" % workers, result)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,16 @@
 from retico_core.abstract import *
 from retico_core import audio
+from retico_core import clock
 from retico_core import debug
+from retico_core import events
 from retico_core import network
 from retico_core import text
 from retico_core import dialogue
 from retico_core import robot
+from retico_core import scheduler
+from retico_core import stats
+from retico_core import tracing
+from retico_core import asynchronous
+from retico_core import process
 
 from retico_core.version import __version__
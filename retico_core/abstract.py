@@ -11,13 +11,24 @@ The Incremental Unit provides the basic data structure to exchange information
 between modules.
 """
 
+import collections
+import collections.abc
 import queue
 import threading
 import time
 import enum
-import copy
+import heapq
+import itertools
 import json
+import os
+import pickle
 import uuid
+import weakref
+
+from retico_core import clock
+from retico_core import events
+from retico_core import stats
+from retico_core import tracing
 
 
 class UpdateType(enum.Enum):
@@ -40,17 +51,162 @@ class IncrementalQueue(queue.Queue):
     every subscriber to the incremental queue. Every unit gets its own queue and
     may process the items at different speeds.
 
+    If the queue is bounded (maxsize > 0) and full, putting an update message into the
+    queue blocks the producer until the consumer took an update message out of the
+    queue. Subclasses of this queue implement other policies for when the queue is full
+    and count the number of update messages they dropped.
+
     Attributes:
         provider (AbstractModule): The module that provides IUs for this queue.
         consumer (AbstractModule): The module that consumes IUs for this queue.
         maxsize (int): The maximum size of the queue, where 0 does not restrict
             the size.
+        dropped (int): The number of update messages that were dropped because the
+            queue was full.
+        trusted (bool): Whether the output IU of the provider is compatible with the
+            input IUs of the consumer. Update messages that the provider validated
+            when appending them are not checked again by the consumer. Set by
+            :meth:`AbstractModule.subscribe`.
+        last_put_at (float): The time (of time.perf_counter) the update message that
+            was last taken out of the queue was put into it. None if it is unknown.
     """
 
-    def __init__(self, provider, consumer, maxsize=0):
+    MAXSIZE = 0
+    """The default maximum size of queues of this class, where 0 does not restrict the
+    size."""
+
+    def __init__(self, provider, consumer, maxsize=None):
+        if maxsize is None:
+            maxsize = self.MAXSIZE
         super().__init__(maxsize=maxsize)
         self.provider = provider
         self.consumer = consumer
+        self.inbox = None
+        self.dropped = 0
+        self.trusted = False
+        self.last_put_at = None
+        self._put_times = {}
+        self._voided = set()
+
+    @classmethod
+    def bounded(cls, maxsize):
+        """Return a subclass of this queue class with the given default maximum size.
+
+        The returned class can be passed as the queue_class of a module, e.g.,
+        ``queue_class=DropOldestIncrementalQueue.bounded(50)``.
+
+        Args:
+            maxsize (int): The maximum size of the queues.
+
+        Returns:
+            class: A subclass of this class with MAXSIZE set to maxsize.
+        """
+        return type("%s%d" % (cls.__name__, maxsize), (cls,), {"MAXSIZE": maxsize})
+
+    def put(self, item, block=True, timeout=None):
+        """Put an update message into the queue and notify the inbox of the consumer.
+
+        If an inbox is attached to the queue (this is done by the consuming module
+        when the queue is added as a left buffer), the arrival of the item is recorded
+        in the inbox, so that the consumer is woken up and processes it immediately.
+
+        Args:
+            item (UpdateMessage): The update message to put into the queue.
+            block (bool): Whether to block if the queue is full.
+            timeout (float): The maximum time in seconds to block.
+        """
+        self._put_times[id(item)] = time.perf_counter()
+        try:
+            super().put(item, block=block, timeout=timeout)
+        except queue.Full:
+            self._forget(item)
+            raise
+        self._notify_inbox(item)
+
+    def get(self, block=True, timeout=None):
+        """Remove and return the next update message of the queue.
+
+        The time the update message was put into the queue is stored in last_put_at.
+
+        Args:
+            block (bool): Whether to block until an update message is available.
+            timeout (float): The maximum time in seconds to block.
+
+        Returns:
+            UpdateMessage: The next update message.
+        """
+        item = super().get(block=block, timeout=timeout)
+        self.last_put_at = self._put_times.pop(id(item), None)
+        return item
+
+    def _forget(self, item):
+        """Forget the time an update message was put into the queue, e.g., because it
+        could not be put into the queue."""
+        self._put_times.pop(id(item), None)
+
+    def _void(self, item):
+        """Forget an update message that was removed from the queue without being
+        taken out of it (e.g., because it was dropped or replaced). The caller has to
+        hold the mutex of the queue.
+
+        The arrival of the update message that was recorded in the inbox is skipped,
+        so that it is not matched with a later update message of the queue."""
+        self._forget(item)
+        if self.inbox is not None:
+            self._voided.add(id(item))
+
+    def _void_all(self):
+        """Forget all update messages that are waiting in the queue, e.g., because the
+        queue is cleared. The caller has to hold the mutex of the queue."""
+        if self.inbox is not None:
+            self._voided.update(self._put_times)
+        self._put_times.clear()
+
+    def is_voided(self, item):
+        """Return whether an update message was removed from the queue without being
+        taken out of it. Used by the inbox to skip the arrival of the update message.
+        The update message is only reported once.
+
+        Args:
+            item (UpdateMessage): An update message that was put into the queue.
+
+        Returns:
+            bool: True if the update message was dropped, replaced or cleared.
+        """
+        try:
+            self._voided.remove(id(item))
+        except KeyError:
+            return False
+        return True
+
+    def _notify_inbox(self, item):
+        """Notify the inbox of the consumer after an update message was put into the
+        queue."""
+        if tracing.RECORDER is not None:
+            tracing.RECORDER.instant(
+                "put", "queue", {"queue": "%s -> %s" % (self.provider, self.consumer)}
+            )
+        if self.inbox is not None:
+            self.inbox.put(self, item)
+
+    def _put_unbounded(self, item):
+        """Put an item into the queue regardless of its maximum size. The caller has
+        to hold the mutex of the queue."""
+        self._put_times[id(item)] = time.perf_counter()
+        self._put(item)
+        self.unfinished_tasks += 1
+        self.not_empty.notify()
+
+    def _full(self):
+        """Return whether the queue is full. The caller has to hold the mutex of the
+        queue."""
+        return 0 < self.maxsize <= self._qsize()
+
+    def clear(self):
+        """Remove all update messages that are waiting in the queue."""
+        with self.mutex:
+            self.queue.clear()
+            self._void_all()
 
     def remove(self):
         """Removes the queue from the consumer and the producer."""
@@ -58,6 +214,659 @@ class IncrementalQueue(queue.Queue):
         self.consumer.remove_left_buffer(self)
 
 
+class DropOldestIncrementalQueue(IncrementalQueue):
+    """An incremental queue that drops the oldest update message when a new update
+    message is put into the full queue. The producer is never blocked."""
+
+    def put(self, item, block=True, timeout=None):
+        with self.not_full:
+            if self._full():
+                self._void(self._get())
+                self.dropped += 1
+            self._put_unbounded(item)
+        self._notify_inbox(item)
+
+
+class DropNewestIncrementalQueue(IncrementalQueue):
+    """An incremental queue that drops new update messages while the queue is full.
+    The producer is never blocked."""
+
+    def put(self, item, block=True, timeout=None):
+        with self.not_full:
+            if self._full():
+                self.dropped += 1
+                return
+            self._put_unbounded(item)
+        self._notify_inbox(item)
+
+
+class DropAddsIncrementalQueue(IncrementalQueue):
+    """An incremental queue that only drops update messages that solely consist of
+    ADD updates when the queue is full.
+
+    If a new update message containing only ADD updates is put into the full queue, it
+    is dropped. Other update messages (e.g., containing REVOKE or COMMIT updates) are
+    always kept. To make room for them, the oldest waiting update message that only
+    contains ADD updates is dropped. If there is none, the queue grows beyond its
+    maximum size. The producer is never blocked.
+    """
+
+    @staticmethod
+    def _only_adds(update_message):
+        for ut in update_message.update_types():
+            if ut != UpdateType.ADD:
+                return False
+        return True
+
+    def put(self, item, block=True, timeout=None):
+        with self.not_full:
+            if self._full():
+                if self._only_adds(item):
+                    self.dropped += 1
+                    return
+                for i, waiting in enumerate(self.queue):
+                    if self._only_adds(waiting):
+                        del self.queue[i]
+                        self._void(waiting)
+                        self.dropped += 1
+                        break
+            self._put_unbounded(item)
+        self._notify_inbox(item)
+
+
+class PriorityIncrementalQueue(IncrementalQueue):
+    """An incremental queue in which REVOKE and COMMIT updates overtake waiting ADD
+    updates.
+
+    The queue has two lanes: update messages that contain one of the
+    CONTROL_UPDATE_TYPES are put into the control lane, all other update messages are
+    put into the regular lane. Update messages in the control lane are taken out of the
+    queue first. Within each lane, the update messages keep the order in which they
+    were put into the queue.
+
+    The order of the updates of each IU is preserved: If an update message in the
+    regular lane still contains one of the IUs of a new control message (e.g., an IU is
+    revoked before its ADD was taken out of the queue), the control message is put into
+    the regular lane behind it. Thus, a revoke only overtakes the updates of other IUs.
+
+    A consumer that needs the strict order of all update messages should use a regular
+    :class:`IncrementalQueue` instead.
+    """
+
+    CONTROL_UPDATE_TYPES = frozenset([UpdateType.REVOKE, UpdateType.COMMIT])
+    """The update types that put an update message into the control lane."""
+
+    def _init(self, maxsize):
+        self.queue = collections.deque()
+        self.control = collections.deque()
+        self._pending_ius = collections.Counter()
+
+    def _qsize(self):
+        return len(self.queue) + len(self.control)
+
+    def _is_control(self, update_message):
+        for iu, ut in update_message:
+            if ut in self.CONTROL_UPDATE_TYPES:
+                break
+        else:
+            return False
+        pending = self._pending_ius
+        for iu in update_message.incremental_units():
+            if id(iu) in pending:
+                return False
+        return True
+
+    def _put(self, item):
+        if item is not None and self._is_control(item):
+            self.control.append(item)
+            return
+        self.queue.append(item)
+        if item is not None:
+            for iu in item.incremental_units():
+                self._pending_ius[id(iu)] += 1
+
+    def _get(self):
+        if self.control:
+            return self.control.popleft()
+        item = self.queue.popleft()
+        if item is not None:
+            pending = self._pending_ius
+            for iu in item.incremental_units():
+                key = id(iu)
+                pending[key] -= 1
+                if not pending[key]:
+                    del pending[key]
+        return item
+
+    def clear(self):
+        with self.mutex:
+            self.queue.clear()
+            self.control.clear()
+            self._pending_ius.clear()
+            self._void_all()
+
+
+class CoalescingIncrementalQueue(IncrementalQueue):
+    """An incremental queue that keeps at most one waiting update message per key.
+
+    This queue is meant for state-like streams (e.g., of RobotStateIUs) where only the
+    newest value matters. When an update message is put into the queue while another
+    update message with the same key is still waiting, the waiting update message is
+    replaced by the new one. The new update message takes the place of the old one in
+    the queue. Thus, the number of waiting update messages is bounded by the number of
+    keys, no matter how fast the producer is.
+
+    Per default, the key of an update message are the creators of its IUs. A different
+    key (e.g., a field of the payload) can be given by creating a subclass with
+    :meth:`keyed` or by overriding :meth:`coalescing_key`. Update messages that
+    contain other updates than ADD are never replaced and never replace other update
+    messages.
+
+    Attributes:
+        coalesced (int): The number of update messages that were replaced by newer
+            ones.
+    """
+
+    def __init__(self, provider, consumer, maxsize=None):
+        super().__init__(provider, consumer, maxsize=maxsize)
+        self.coalesced = 0
+
+    @classmethod
+    def keyed(cls, key):
+        """Return a subclass of this queue class that uses the given function as the
+        coalescing key.
+
+        The returned class can be passed as the queue_class of a module, e.g., to keep
+        the newest state of every joint of a robot:
+
+        .. code-block:: python
+
+            queue_class=CoalescingIncrementalQueue.keyed(
+                lambda um: next(um.incremental_units()).payload["joint"]
+            )
+
+        The key has to be a hashable value that is equal for update messages that
+        replace each other. Objects that are only equal to themselves, like the
+        iterators returned by :meth:`UpdateMessage.update_types`, would never match
+        a waiting update message.
+
+        Args:
+            key (function): A function that returns a hashable key for an update
+                message.
+
+        Returns:
+            class: A subclass of this class with the coalescing_key method replaced.
+
+        Raises:
+            TypeError: If the key is not callable. Putting an update message into the
+                queue raises a TypeError if the key returns an iterator or an
+                unhashable object.
+        """
+        if not callable(key):
+            raise TypeError("The coalescing key has to be a function.")
+
+        def coalescing_key(self, update_message):
+            value = key(update_message)
+            if isinstance(value, collections.abc.Iterator) or not isinstance(
+                value, collections.abc.Hashable
+            ):
+                raise TypeError(
+                    "The coalescing key has to be a hashable value, not %s."
+                    % type(value).__name__
+                )
+            return value
+
+        return type("Keyed%s" % cls.__name__, (cls,), {"coalescing_key": coalescing_key})
+
+    def coalescing_key(self, update_message):
+        """Return the key of an update message. Of all waiting update messages with
+        the same key, only the newest is kept.
+
+        Args:
+            update_message (UpdateMessage): An update message containing only ADD
+                updates.
+
+        Returns:
+            object: A hashable key that is equal for update messages that replace
+            each other. Per default, the creators of the IUs.
+        """
+        return tuple(iu.creator for iu in update_message.incremental_units())
+
+    def _init(self, maxsize):
+        super()._init(maxsize)
+        self._waiting = {}
+        self._keys = {}
+
+    def _key(self, update_message):
+        if update_message is None:
+            return None
+        for ut in update_message.update_types():
+            if ut != UpdateType.ADD:
+                return None
+        return self.coalescing_key(update_message)
+
+    def _put(self, item):
+        key = self._key(item)
+        if key is None:
+            self.queue.append(item)
+            return
+        waiting = self._waiting.get(key)
+        if waiting is not None:
+            for i, queued in enumerate(self.queue):
+                if queued is waiting:
+                    self.queue[i] = item
+                    break
+            del self._keys[id(waiting)]
+            self._void(waiting)
+            self.coalesced += 1
+        else:
+            self.queue.append(item)
+        self._waiting[key] = item
+        self._keys[id(item)] = key
+
+    def _get(self):
+        item = self.queue.popleft()
+        key = self._keys.pop(id(item), None)
+        if key is not None:
+            del self._waiting[key]
+        return item
+
+    def clear(self):
+        with self.mutex:
+            self.queue.clear()
+            self._waiting.clear()
+            self._keys.clear()
+            self._void_all()
+
+
+class Inbox:
+    """The fan-in inbox of a module.
+
+    Every left buffer of a module notifies the inbox of the module when an update
+    message is put into it. The inbox records the order in which the update messages
+    arrived across all left buffers, so that the module can wait on a single queue and
+    process the messages of all its providers in their true arrival order, without
+    polling each buffer with a timeout. The arrivals of update messages that a buffer
+    dropped, replaced or cleared are skipped.
+    """
+
+    def __init__(self):
+        self._arrivals = queue.SimpleQueue()
+        self.listener = None
+
+    def put(self, buffer, update_message):
+        """Record that an update message has been put into the given buffer.
+
+        If a listener is set (e.g., by a :class:`Scheduler<retico_core.scheduler.Scheduler>`),
+        it is called after the arrival is recorded.
+
+        Args:
+            buffer (IncrementalQueue): The left buffer that received an update
+                message.
+            update_message (UpdateMessage): The update message that was put into the
+                buffer.
+        """
+        self._arrivals.put((buffer, update_message))
+        if self.listener is not None:
+            self.listener()
+
+    def wakeup(self):
+        """Wake up a module that is currently waiting on the inbox without handing
+        it an update message."""
+        self._arrivals.put(None)
+        if self.listener is not None:
+            self.listener()
+
+    def get(self, block=True, timeout=None):
+        """Return the next update message in order of arrival together with the left
+        buffer it was taken from.
+
+        If no update message arrives in time or the inbox is woken up, (None, None)
+        is returned.
+
+        Args:
+            block (bool): Whether to wait for an update message to arrive.
+            timeout (float): The maximum time in seconds to wait.
+
+        Returns:
+            (IncrementalQueue, UpdateMessage): The left buffer the update message
+            was taken from (its provider is the module that produced the update
+            message) and the update message itself.
+        """
+        while True:
+            try:
+                arrival = self._arrivals.get(block=block, timeout=timeout)
+            except queue.Empty:
+                return None, None
+            if arrival is None:
+                return None, None
+            buffer, update_message = arrival
+            if buffer.is_voided(update_message):
+                # The update message was dropped or replaced by the buffer
+                continue
+            try:
+                update_message = buffer.get_nowait()
+            except queue.Empty:
+                # The update message was removed from the buffer by other means
+                # (e.g., the buffer was cleared when the provider was stopped).
+                continue
+            if tracing.RECORDER is not None:
+                tracing.RECORDER.instant(
+                    "get",
+                    "queue",
+                    {"queue": "%s -> %s" % (buffer.provider, buffer.consumer)},
+                )
+            return buffer, update_message
+
+    def empty(self):
+        """Return whether there are no recorded arrivals in the inbox.
+
+        Returns:
+            bool: True if the inbox is empty.
+        """
+        return self._arrivals.empty()
+
+
+class MetaData(collections.abc.MutableMapping):
+    """The meta data of an incremental unit.
+
+    The meta data of an IU is based on the meta data of the IU it is grounded in. To
+    avoid copying the meta data at every hop, the meta data is a stack of layers: Keys
+    are looked up in the own layer of the IU first and then in the layers it is based
+    on. Writing to the meta data only changes the own layer. When new meta data is based
+    on this meta data (see :meth:`child`), the own layer is frozen and shared, so that
+    later changes are not visible to the child, just as with a copy.
+
+    The meta data behaves like a dictionary and compares equal to dictionaries with the
+    same items. Changes of the layers are guarded by a lock of the meta data that is
+    only created once the meta data is first changed.
+    """
+
+    __slots__ = ("_local", "_base", "_depth", "_lock")
+
+    MAX_LAYERS = 8
+    """The number of shared layers after which they are merged into one."""
+
+    _DELETED = object()
+
+    def __init__(self, data=None):
+        """Initialize the meta data.
+
+        Args:
+            data (dict): The initial items of the meta data. The dictionary is used as
+                the own layer and is not copied.
+        """
+        self._local = data if data else None
+        self._base = None
+        self._depth = 0
+        self._lock = None
+
+    def _get_lock(self):
+        lock = self._lock
+        if lock is None:
+            with _LAZY_LOCK:
+                if self._lock is None:
+                    self._lock = threading.Lock()
+                lock = self._lock
+        return lock
+
+    def child(self):
+        """Return new meta data that is based on this meta data.
+
+        Returns:
+            MetaData: Meta data with the same items, whose changes do not affect this
+            meta data and vice versa.
+        """
+        if self._local:
+            with self._get_lock():
+                if self._local:
+                    if self._depth >= self.MAX_LAYERS:
+                        layer = self._flatten()
+                        self._base = (layer, None)
+                        self._depth = 1
+                    else:
+                        self._base = (self._local, self._base)
+                        self._depth += 1
+                    self._local = None
+                base, depth = self._base, self._depth
+        else:
+            # Without an own layer, there is nothing to freeze and no lock is needed
+            base, depth = self._base, self._depth
+        child = MetaData()
+        child._base = base
+        child._depth = depth
+        return child
+
+    def _flatten(self):
+        layers = []
+        if self._local:
+            layers.append(self._local)
+        base = self._base
+        while base is not None:
+            layers.append(base[0])
+            base = base[1]
+        items = {}
+        for layer in reversed(layers):
+            items.update(layer)
+        return {k: v for k, v in items.items() if v is not self._DELETED}
+
+    def __getitem__(self, key):
+        local = self._local
+        if local is not None and key in local:
+            value = local[key]
+        else:
+            base = self._base
+            while base is not None:
+                if key in base[0]:
+                    value = base[0][key]
+                    break
+                base = base[1]
+            else:
+                raise KeyError(key)
+        if value is self._DELETED:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        with self._get_lock():
+            if self._local is None:
+                self._local = {}
+            self._local[key] = value
+
+    def __delitem__(self, key):
+        self[key]  # raises a KeyError if the key does not exist
+        with self._get_lock():
+            if self._base is None:
+                del self._local[key]
+                return
+            if self._local is None:
+                self._local = {}
+            self._local[key] = self._DELETED
+
+    def __iter__(self):
+        return iter(self._flatten())
+
+    def __len__(self):
+        return len(self._flatten())
+
+    def __bool__(self):
+        return bool(self._local) or self._base is not None
+
+    def __repr__(self):
+        return "MetaData(%r)" % self._flatten()
+
+    def __reduce__(self):
+        return (MetaData, (self._flatten(),))
+
+
+_LAZY_LOCK = threading.Lock()
+"""A lock guarding the lazy creation of the locks and meta data of IUs and of the locks
+of meta data."""
+
+
+class ModuleIndex:
+    """Assigns small integer indices to modules.
+
+    The indices are used to store the modules that processed an IU as a bitmask (see
+    :meth:`IncrementalUnit.set_processed`). A module gets its index when it first
+    processes an IU. The registry only holds weak references to the modules, and the
+    index of a module that was garbage collected is given to the next module, so that
+    the bitmasks stay as small as the number of modules that are alive.
+
+    IUs that are still alive may have the bit of a collected module set. Each reuse of
+    an index therefore increments the :attr:`epoch` of the registry, and IUs remember
+    the epoch in which their bitmask was written. Bits of indices that were reused
+    after that epoch belong to the collected module and are ignored (see
+    :meth:`stale`).
+
+    Attributes:
+        epoch (int): The number of times an index was given to another module.
+    """
+
+    def __init__(self):
+        self.epoch = 0
+        self._lock = threading.Lock()
+        self._modules = []
+        self._reused_at = []
+        self._free = []
+        self._released = collections.deque()
+
+    def register(self, module):
+        """Return the index of a module, assigning a new one if necessary.
+
+        Args:
+            module (AbstractModule): The module.
+
+        Returns:
+            int: The index of the module.
+        """
+        with self._lock:
+            index = module._module_index
+            if index is not None:
+                return index
+            # Finalizers may run during any allocation, so they only queue the index
+            # and never take the lock themselves.
+            while self._released:
+                heapq.heappush(self._free, self._released.popleft())
+            if self._free:
+                index = heapq.heappop(self._free)
+                self.epoch += 1
+                self._reused_at[index] = self.epoch
+                self._modules[index] = weakref.ref(module)
+            else:
+                index = len(self._modules)
+                self._modules.append(weakref.ref(module))
+                self._reused_at.append(0)
+            weakref.finalize(module, self._released.append, index)
+            module._module_index = index
+            return index
+
+    def stale(self, mask, epoch):
+        """Return the bits of a bitmask whose index was reused after an epoch.
+
+        Args:
+            mask (int): A bitmask of module indices.
+            epoch (int): The epoch in which the bitmask was written.
+
+        Returns:
+            int: The bits of the mask that belong to garbage collected modules.
+        """
+        stale = 0
+        reused_at = self._reused_at
+        while mask:
+            bit = mask & -mask
+            if reused_at[bit.bit_length() - 1] > epoch:
+                stale |= bit
+            mask ^= bit
+        return stale
+
+    def modules(self, mask):
+        """Return the modules whose bits are set in a bitmask.
+
+        Args:
+            mask (int): A bitmask of module indices.
+
+        Returns:
+            list: The modules that are still alive, ordered by their index.
+        """
+        modules = []
+        while mask:
+            bit = mask & -mask
+            module = self._modules[bit.bit_length() - 1]()
+            if module is not None:
+                modules.append(module)
+            mask ^= bit
+        return modules
+
+
+MODULE_INDEX = ModuleIndex()
+"""The registry of the indices of all modules."""
+
+_PROCESSED_LOCK = threading.Lock()
+"""A lock guarding the processed bitmasks of IUs that may be processed by more than
+one module concurrently."""
+
+
+IUID_SEQUENCE_BITS = 32
+"""The number of low bits of an iuid that hold the sequence number of the IU. The high
+bits hold a random prefix of the module (or process) that created the IU."""
+
+
+def _random_iuid_prefix():
+    """Return a random prefix for iuids, shifted above the sequence bits."""
+    return int.from_bytes(os.urandom(4), "big") << IUID_SEQUENCE_BITS
+
+
+_FALLBACK_IUIDS = itertools.count(_random_iuid_prefix())
+
+
+def _reset_fallback_iuids():
+    global _FALLBACK_IUIDS
+    _FALLBACK_IUIDS = itertools.count(_random_iuid_prefix())
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_fallback_iuids)
+
+
+def generate_iuid():
+    """Return a new iuid for an IU that is not created by a module.
+
+    The ids are 64-bit integers made of a random prefix of the process and a sequence
+    number, so that they are unique across processes.
+
+    Returns:
+        int: A new iuid.
+    """
+    return next(_FALLBACK_IUIDS)
+
+
+_PICKLING = threading.local()
+"""Thread-local options for pickling IUs (see :func:`dumps_detached`)."""
+
+
+def dumps_detached(obj):
+    """Pickle an object (e.g., an update message) with the IUs it contains detached
+    from their history.
+
+    The previous_iu of every pickled IU is dropped and its grounded_in is replaced by
+    an :class:`IncrementalUnitStub` that only holds the iuid and the creator of the
+    grounding IU. The size of a pickled IU is thus independent of the length of the
+    chains behind it, which is what is needed when IUs are sent to another process.
+
+    Args:
+        obj: The object to pickle.
+
+    Returns:
+        bytes: The pickled object.
+    """
+    _PICKLING.detached = True
+    try:
+        return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+    finally:
+        _PICKLING.detached = False
+
+
 class IncrementalUnit:
     """An abstract incremental unit.
 
@@ -78,10 +887,55 @@ class IncrementalUnit:
         meta_data (dict): Meta data that offers optional meta information. This
             field can be used to add information that is not available for all
             uses of the specific incremental unit.
+        emitted_at (float): The UNIX timestamp of the moment the IU was appended to
+            the right buffers of its creator. Only set in trace mode (see
+            :mod:`retico_core.tracing`).
+        received_at (dict): The UNIX timestamps of the moments the IU was taken out
+            of the left buffers of the modules processing it, by module id. Only set
+            in trace mode.
+
+    The attributes of the IU are stored in slots. The lock of the IU, the list of
+    modules that processed it and its meta data are only created once they are
+    needed. Arbitrary attributes can still be set on every IU; they are stored in a
+    __dict__ that is only created when the first such attribute is set. For IUs that
+    are produced at a high rate (e.g., audio frames), subclasses can store their own
+    attributes compactly as well by declaring them in __slots__:
+
+    .. code-block:: python
+
+        class MyIU(IncrementalUnit):
+            __slots__ = ("value",)
     """
 
+    __slots__ = (
+        "creator",
+        "creator_id",
+        "iuid",
+        "previous_iu",
+        "grounded_in",
+        "payload",
+        "committed",
+        "revoked",
+        "created_at",
+        "emitted_at",
+        "received_at",
+        "_processed",
+        "_processed_epoch",
+        "_single_writer",
+        "_mutex",
+        "_meta_data",
+        "_previous_depth",
+        "_grounded_depth",
+        "__dict__",
+    )
+
     MAX_DEPTH = 50
-    """Maximum depth of the previous_iu and grounded_in connections."""
+    """Maximum depth of the previous_iu and grounded_in connections.
+
+    The connections are cut once a chain grows to twice this depth, so that the chains
+    only have to be walked once every MAX_DEPTH IUs. Modules may bound the history of
+    their IUs further (see the history_length and history_window arguments of
+    :class:`AbstractModule`)."""
 
     def __init__(
         self,
@@ -100,7 +954,8 @@ class IncrementalUnit:
                 unit.
             iuid (int): The id of the IU. This should be a unique ID given by the module
                 that produces the incremental unit and is used to identify the IU later
-                on - for example when revoking an IU.
+                on - for example when revoking an IU. If None, a new id is generated
+                with :func:`generate_iuid`.
             previous_iu (IncrementalUnit): A link to the incremental unit
                 created before the current one by the same module.
             grounded_in (IncrementalUnit): A link to the incremental unit that
@@ -111,38 +966,113 @@ class IncrementalUnit:
         self.creator_id = creator.id
         self.iuid = iuid
         if self.iuid is None:
-            self.iuid = hash(self)
+            self.iuid = generate_iuid()
         self.previous_iu = previous_iu
         self.grounded_in = grounded_in
-        self._processed_list = []
+        self._processed = 0
+        self._processed_epoch = 0
+        self._single_writer = None
         self.payload = payload
-        self.mutex = threading.Lock()
+        self._mutex = None
 
         self.committed = False
         self.revoked = False
 
-        self.meta_data = {}
-        if grounded_in:
-            self.meta_data = {**grounded_in.meta_data}
+        self._meta_data = None
+        if grounded_in is not None and grounded_in._meta_data:
+            self._meta_data = grounded_in._meta_data.child()
 
-        self.created_at = time.time()
+        self.created_at = clock.CLOCK.time()
+        self.emitted_at = None
+        self.received_at = None
         self._remove_old_links()
 
+    @property
+    def mutex(self):
+        """threading.Lock: The lock of the IU. It is created on first use."""
+        mutex = self._mutex
+        if mutex is None:
+            with _LAZY_LOCK:
+                if self._mutex is None:
+                    self._mutex = threading.Lock()
+                mutex = self._mutex
+        return mutex
+
+    @mutex.setter
+    def mutex(self, mutex):
+        self._mutex = mutex
+
+    @property
+    def meta_data(self):
+        """MetaData: Meta data that offers optional meta information. It is based on
+        the meta data of the IU this IU is grounded in and is created on first use."""
+        meta_data = self._meta_data
+        if meta_data is None:
+            with _LAZY_LOCK:
+                if self._meta_data is None:
+                    self._meta_data = MetaData()
+                meta_data = self._meta_data
+        return meta_data
+
+    @meta_data.setter
+    def meta_data(self, meta_data):
+        if meta_data is not None and not isinstance(meta_data, MetaData):
+            meta_data = MetaData(dict(meta_data))
+        self._meta_data = meta_data
+
     def _remove_old_links(self):
-        current_depth = 0
+        """Bound the depth of the previous_iu and grounded_in chains of this IU.
+
+        The depth of both chains is derived from the depth stored in the linked IUs.
+        Only if a chain is twice as deep as MAX_DEPTH, it is walked and cut after
+        MAX_DEPTH IUs, so the cost per IU is constant on average.
+        """
         previous_iu = self.previous_iu
-        while previous_iu:
-            if current_depth == self.MAX_DEPTH:
-                previous_iu.previous_iu = None
-            previous_iu = previous_iu.previous_iu
-            current_depth += 1
-        current_depth = 0
+        if previous_iu is None:
+            self._previous_depth = 0
+        else:
+            self._previous_depth = previous_iu._previous_depth + 1
+            if self._previous_depth > 2 * self.MAX_DEPTH:
+                self._previous_depth = self._cut_chain(
+                    previous_iu, "previous_iu", "_previous_depth"
+                )
         grounded_in = self.grounded_in
-        while grounded_in:
-            if current_depth == self.MAX_DEPTH:
-                grounded_in.grounded_in = None
-            grounded_in = grounded_in.grounded_in
-            current_depth += 1
+        if grounded_in is None:
+            self._grounded_depth = 0
+        else:
+            self._grounded_depth = grounded_in._grounded_depth + 1
+            if self._grounded_depth > 2 * self.MAX_DEPTH:
+                self._grounded_depth = self._cut_chain(
+                    grounded_in, "grounded_in", "_grounded_depth"
+                )
+
+    def _cut_chain(self, linked_iu, link, depth_name):
+        """Cut the chain of the given link after MAX_DEPTH IUs.
+
+        The lowered depth is written back to the IUs of the chain, so that further IUs
+        linked to the same IU (e.g., many IUs grounded in one IU) do not walk the
+        chain again.
+
+        Args:
+            linked_iu (IncrementalUnit): The first IU of the chain.
+            link (str): The name of the link ("previous_iu" or "grounded_in").
+            depth_name (str): The name of the attribute storing the depth of the
+                chain ("_previous_depth" or "_grounded_depth").
+
+        Returns:
+            int: The depth of the chain, including the link to the first IU.
+        """
+        chain = [linked_iu]
+        while len(chain) <= self.MAX_DEPTH:
+            next_iu = getattr(chain[-1], link)
+            if next_iu is None:
+                break
+            chain.append(next_iu)
+        else:
+            setattr(chain[-1], link, None)
+        for depth, iu in enumerate(reversed(chain)):
+            setattr(iu, depth_name, depth)
+        return len(chain)
 
     def age(self):
         """Returns the age of the IU in seconds.
@@ -150,7 +1080,7 @@ class IncrementalUnit:
         Returns:
             float: The age of the IU in seconds
         """
-        return time.time() - self.created_at
+        return clock.CLOCK.time() - self.created_at
 
     def older_than(self, s):
         """Return whether the IU is older than s seconds.
@@ -163,28 +1093,52 @@ class IncrementalUnit:
         """
         return self.age() > s
 
+    def _processed_mask(self):
+        processed = self._processed
+        epoch = self._processed_epoch
+        if epoch != MODULE_INDEX.epoch:
+            processed &= ~MODULE_INDEX.stale(processed, epoch)
+        return processed
+
+    def _add_processed(self, index):
+        epoch = MODULE_INDEX.epoch
+        processed = self._processed
+        if self._processed_epoch != epoch:
+            processed &= ~MODULE_INDEX.stale(processed, self._processed_epoch)
+        self._processed = processed | 1 << index
+        self._processed_epoch = epoch
+
     def processed_list(self):
         """Return a list of all modules that have already processed this IU.
 
-        The returned list is a copy of the list held by the IU.
-
         Returns:
-            list: A list of all modules that have alread processed this IU.
+            list: A list of all modules that have alread processed this IU, ordered by
+            their module index.
         """
-        with self.mutex:
-            return list(self._processed_list)
+        return MODULE_INDEX.modules(self._processed_mask())
 
     def set_processed(self, module):
-        """Add the module to the list of modules that have already processed
-        this IU.
+        """Add the module to the modules that have already processed this IU.
+
+        The modules are stored as a bitmask of their indices in :data:`MODULE_INDEX`.
+        If the IU was only sent to a single module by its creator, that module is the
+        only one writing the bitmask and it is updated without a lock. IUs that are
+        sent to several modules, appended again by another module or never sent by a
+        module are updated under a lock (see :meth:`AbstractModule.append`).
 
         Args:
             module (AbstractModule): The module that has processed this IU.
         """
         if not isinstance(module, AbstractModule):
             raise TypeError("Given object is not a module!")
-        with self.mutex:
-            self._processed_list.append(module)
+        index = module._module_index
+        if index is None:
+            index = MODULE_INDEX.register(module)
+        if self._single_writer:
+            self._add_processed(index)
+        else:
+            with _PROCESSED_LOCK:
+                self._add_processed(index)
 
     def is_processed_by(self, module):
         """Return True if the IU is processed by the given module.
@@ -199,8 +1153,10 @@ class IncrementalUnit:
         Returns:
             bool: Whether or not the module has processed the IU.
         """
-        with self.mutex:
-            return module in self._processed_list
+        index = getattr(module, "_module_index", None)
+        if index is None or not isinstance(module, AbstractModule):
+            return False
+        return bool(self._processed_mask() >> index & 1)
 
     def __repr__(self):
         return "%s - (%s): %s" % (
@@ -214,6 +1170,12 @@ class IncrementalUnit:
             return False
         return self.iuid == other.iuid
 
+    def __hash__(self):
+        try:
+            return hash(self.iuid)
+        except AttributeError:  # while the IU is being unpickled
+            return id(self)
+
     def to_zmq(self, update_type):
         """
         returns a formatted string that can be sent across zeromq
@@ -241,19 +1203,34 @@ class IncrementalUnit:
         raise NotImplementedError()
 
     def __getstate__(self):
-        state = self.__dict__.copy()
         """
         Will recursively call __getstate__ for any objects contained. When testing, simply calling .__getstate__() does
         not show the impact of the recursive calls, must call pickle.loads(pickle.dumps(<object>)) and check the output. 
         """
+        state = dict(getattr(self, "__dict__", {}))
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get("__slots__", ()):
+                if name != "__dict__" and hasattr(self, name):
+                    state[name] = getattr(self, name)
         # Don't (can't) pickle mutex
-        del state['mutex']
-        # Both creator and _processed list hold AbstractModule objects.
+        del state['_mutex']
+        # Both creator and _processed refer to AbstractModule objects (_processed by their index in MODULE_INDEX).
         # While we _can_ add get/set state to AbstractModule and drop the related mutex, there are still challenges
         # because of IncrementalQueue and any class level attributes the modules inheriting AbstractModule would
         # bring along. If it is determined that we need to be passing the modules, each abstract module would
         # likely need to implement its own get/set state for pickling.
-        del state['_processed_list'] # Until there is a compelling reason to keep this, it's far easier to remove, there are lots of nested mutex vals
+        # The module indices are only valid in this process
+        del state['_processed']
+        del state['_processed_epoch']
+        del state['_single_writer']
+        if getattr(_PICKLING, "detached", False):
+            # Only the IU itself crosses the process boundary, not its history
+            state['previous_iu'] = None
+            state['_previous_depth'] = 0
+            grounded_in = state.get('grounded_in')
+            if isinstance(grounded_in, IncrementalUnit):
+                state['grounded_in'] = IncrementalUnitStub.of(grounded_in)
+                state['_grounded_depth'] = 1
         # Pass creator name to maintain log trail of module history
         state['creator_name'] = state['creator'].name()
         # Pass creator description so we can include note about IU having been sent over ZMQ
@@ -263,36 +1240,113 @@ class IncrementalUnit:
         return state
 
     def __setstate__(self, state):
-        self.__dict__.update(state)
+        creator_name = state['creator_name']
+        creator_description = state['creator_description']
+        for name, value in state.items():
+            setattr(self, name, value)
 
         # Add mutex back since it doesn't exist in the pickle
-        self.mutex = threading.Lock()
-        self._processed_list = []
-        self.creator = AbstractModule
+        self._mutex = None
+        self._processed = 0
+        self._processed_epoch = 0
+        self._single_writer = None
         # Dynamically create a class (the arguments are name, base classes, class dictionary).
         # The type function tells what kind of data an object is or creates a new class dynamically
         # https://docs.python.org/3/library/functions.html#type
         # Note: I chose to put this here instead of creating another class in abstract because I do not want it used
         # in any other scenarios throughout retico - this is a very specific (and not really ideal) use case.
         # The anonymous lambda functions might take up more memory, so keep an eye on that.
-        self.creator = type('AnonymousCreator', (object,), {'name': lambda self: state['creator_name'], 'description': lambda self: state['creator_description']})()
+        self.creator = type('AnonymousCreator', (object,), {'name': lambda self: creator_name, 'description': lambda self: creator_description})()
+
+
+class IncrementalUnitStub(IncrementalUnit):
+    """A placeholder for the IU another IU is grounded in, used when the IU is pickled
+    with :func:`dumps_detached`.
+
+    The stub only keeps the iuid, the creator, the flags, the creation time and the
+    trace stamps (see :mod:`retico_core.tracing`) of the original IU. It compares equal
+    to the original IU, but has no payload and no links.
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def type():
+        return "Incremental Unit Stub"
+
+    @classmethod
+    def of(cls, iu):
+        """Create a stub of the given IU.
+
+        Args:
+            iu (IncrementalUnit): The IU to create a stub of.
+
+        Returns:
+            IncrementalUnitStub: The stub. If the IU is a stub itself, it is returned.
+        """
+        if isinstance(iu, cls):
+            return iu
+        stub = cls.__new__(cls)
+        stub.creator = iu.creator
+        stub.creator_id = iu.creator_id
+        stub.iuid = iu.iuid
+        stub.previous_iu = None
+        stub.grounded_in = None
+        stub.payload = None
+        stub.committed = iu.committed
+        stub.revoked = iu.revoked
+        stub.created_at = iu.created_at
+        stub.emitted_at = iu.emitted_at
+        stub.received_at = None
+        if iu.received_at is not None:
+            stub.received_at = dict(iu.received_at)
+        stub._processed = 0
+        stub._processed_epoch = 0
+        stub._single_writer = None
+        stub._mutex = None
+        stub._meta_data = None
+        stub._previous_depth = 0
+        stub._grounded_depth = 0
+        return stub
 
 class UpdateMessage:
     """A class that encapsulates multiple incremental units and their update type. The
-    update types can be any of the ones defined in the enum UpdateType"""
+    update types can be any of the ones defined in the enum UpdateType
+
+    Once an update message is appended to the right buffers of a module, the same
+    instance is handed to every subscriber. It is then frozen and no incremental units
+    can be added anymore. Iterating over an update message creates a new iterator each
+    time, so that multiple modules can iterate over it at the same time.
+
+    The incremental units and their update types are stored in two parallel lists.
+    Besides add_iu and add_ius, which check every incremental unit and update type,
+    the classmethods :meth:`from_pairs` and :meth:`from_ius` create update messages
+    from many incremental units at once and may skip the checks for units that are
+    known to be valid.
+    """
+
+    __slots__ = (
+        "_ius",
+        "_update_types",
+        "_frozen",
+        "_validated_by",
+        "found_invalid_iu",
+    )
 
     def __init__(self):
         """Initializes the update message with no IU added.
 
         To initialize with a single IU use the classmethod "from_iu" or for a list of
-        IUs use the classmethod "from_ius".
+        IUs use the classmethods "from_ius" or "from_pairs".
         """
-        self._msgs = []  # First element of tuple is IU, second is UpdateType
-        self._counter = -1
+        self._ius = []
+        self._update_types = []
+        self._frozen = False
+        self._validated_by = None
         self.found_invalid_iu = None
 
     def __len__(self):
-        return len(self._msgs)
+        return len(self._ius)
 
     @classmethod
     def from_iu(cls, iu, update_type):
@@ -303,12 +1357,17 @@ class UpdateMessage:
             iu (IncrementalUnit): The first incremental unit of the update message
             update_type (UpdateType): The update type of the incremental unit.
         """
-        um = UpdateMessage()
-        um.add_iu(iu, update_type)
+        if not isinstance(iu, IncrementalUnit):
+            raise TypeError("IU is of type %s but should be IncrementalUnit" % type(iu))
+        if not isinstance(update_type, UpdateType):
+            update_type = UpdateType(update_type)
+        um = cls()
+        um._ius.append(iu)
+        um._update_types.append(update_type)
         return um
 
     @classmethod
-    def from_iu_list(cls, self, iu_list):
+    def from_iu_list(cls, iu_list):
         """Initializes the update message with a list of tuples containing the update
         type and incremental units in the format (IncrementalUnit, UpdateType)
 
@@ -316,19 +1375,133 @@ class UpdateMessage:
             iu_list (list): A list of IncrementalUnit-UpdateType-tuples in the format
                 (IncrementalUnit, UpdateType) that will be added to the update message.
         """
-        um = UpdateMessage()
-        um.add_ius(iu_list)
+        return cls.from_pairs(iu_list)
+
+    @classmethod
+    def from_pairs(cls, pairs, trusted=False):
+        """Initializes the update message with pairs of incremental units and update
+        types, e.g., the pairs of another update message.
+
+        Args:
+            pairs (iterable): IncrementalUnit-UpdateType-tuples in the format
+                (IncrementalUnit, UpdateType).
+            trusted (bool): Whether the pairs are known to contain only incremental
+                units and update types of type UpdateType, so that they are not
+                checked.
+
+        Raises:
+            TypeError: When an incremental unit is not of type IncrementalUnit. Only
+                applies if trusted is not set.
+            ValueError: When an update type can not be converted to an UpdateType. Only
+                applies if trusted is not set.
+        """
+        um = cls()
+        if trusted:
+            for iu, update_type in pairs:
+                um._ius.append(iu)
+                um._update_types.append(update_type)
+            return um
+        pairs = list(pairs)
+        for iu, update_type in pairs:
+            if not isinstance(iu, IncrementalUnit):
+                raise TypeError(
+                    "IU is of type %s but should be IncrementalUnit" % type(iu)
+                )
+        um._ius = [iu for iu, _ in pairs]
+        um._update_types = [
+            ut if isinstance(ut, UpdateType) else UpdateType(ut) for _, ut in pairs
+        ]
+        return um
+
+    @classmethod
+    def from_ius(cls, ius, update_type=UpdateType.ADD, trusted=False):
+        """Initializes the update message with incremental units that all have the
+        same update type.
+
+        Args:
+            ius (iterable): The incremental units of the update message.
+            update_type (UpdateType): The update type of all incremental units.
+            trusted (bool): Whether the incremental units are known to be of type
+                IncrementalUnit, so that they are not checked.
+
+        Raises:
+            TypeError: When an incremental unit is not of type IncrementalUnit. Only
+                applies if trusted is not set.
+            ValueError: When the update type can not be converted to an UpdateType.
+        """
+        if not isinstance(update_type, UpdateType):
+            update_type = UpdateType(update_type)
+        um = cls()
+        um._ius = list(ius)
+        if not trusted:
+            for iu in um._ius:
+                if not isinstance(iu, IncrementalUnit):
+                    raise TypeError(
+                        "IU is of type %s but should be IncrementalUnit" % type(iu)
+                    )
+        um._update_types = [update_type] * len(um._ius)
         return um
 
     def __iter__(self):
-        return self
+        return zip(self._ius, self._update_types)
+
+    def freeze(self):
+        """Freeze the update message so that no incremental units can be added anymore.
+
+        This is done when the update message is appended to the right buffers of a
+        module, because from then on it is shared by all subscribers.
+        """
+        self._frozen = True
+
+    def is_frozen(self):
+        """Return whether the update message is frozen.
+
+        Returns:
+            bool: Whether incremental units can no longer be added.
+        """
+        return self._frozen
+
+    def _check_not_frozen(self):
+        if self._frozen:
+            raise ValueError(
+                "The update message was already appended and can not be changed"
+            )
 
-    def __next__(self):
-        self._counter += 1
-        if self._counter == len(self._msgs):
-            self._counter = -1
-            raise StopIteration
-        return self._msgs[self._counter]
+    @classmethod
+    def merge(cls, update_messages, cancel_revoked=True):
+        """Merge multiple update messages into a single update message.
+
+        The incremental units and update types of all update messages are added to the
+        new update message in their original order. This can be used by modules that
+        process batches of update messages (see
+        :meth:`AbstractModule.process_update_batch`).
+
+        If cancel_revoked is set, incremental units that are added and then revoked
+        within the given update messages are removed from the merged update message
+        altogether (together with all other updates of those IUs), as a module
+        processing the merged message never has to consider them.
+
+        Args:
+            update_messages (list): The update messages to merge.
+            cancel_revoked (bool): Whether IUs that are added and revoked within the
+                update messages should be left out.
+
+        Returns:
+            UpdateMessage: A new update message containing the updates of all given
+            update messages.
+        """
+        pairs = [pair for update_message in update_messages for pair in update_message]
+        if cancel_revoked:
+            added = set()
+            cancelled = set()
+            for iu, ut in pairs:
+                if ut == UpdateType.ADD:
+                    added.add(id(iu))
+                elif ut == UpdateType.REVOKE and id(iu) in added:
+                    cancelled.add(id(iu))
+            if cancelled:
+                pairs = [(iu, ut) for iu, ut in pairs if id(iu) not in cancelled]
+        return cls.from_pairs(pairs, trusted=True)
 
     def add_iu(self, iu, update_type, strict_update_type=True):
         """Adds an incremental unit to the update message with the given update type.
@@ -350,13 +1523,16 @@ class UpdateMessage:
                 or if the update_type does not correspond to an update type.
             ValueError: When the given udpate type is not a valid update type or the
                 given argument cannot be converted to an UpdateType. Only applies if the
-                strict_update_type flag is set.
+                strict_update_type flag is set. Also raised when the update message is
+                frozen.
         """
+        self._check_not_frozen()
         if not isinstance(iu, IncrementalUnit):
             raise TypeError("IU is of type %s but should be IncrementalUnit" % type(iu))
         if strict_update_type and not isinstance(update_type, UpdateType):
             update_type = UpdateType(update_type)
-        self._msgs.append((iu, update_type))
+        self._ius.append(iu)
+        self._update_types.append(update_type)
 
     def add_ius(self, iu_list, strict_update_type=True):
         """Adds a list of incremental units and according update types to the update
@@ -364,7 +1540,7 @@ class UpdateMessage:
 
         Args:
             iu_list (list): A list containing tuples of update types and incremental
-            units in the format (IncrementalUnit, UpdateType).
+                units in the format (UpdateType, IncrementalUnit).
             strict_update_type (bool): Whether the update type should be checked and
                 converted to type UpdateType. If the given argument is not of type
                 UpdateType or a str that can be converted to UpdateType, a ValueError
@@ -375,19 +1551,21 @@ class UpdateMessage:
                 or if the update_type does not correspond to an update type.
             ValueError: When the given udpate type is not a valid update type or the
                 given argument cannot be converted to an UpdateType. Only applies if the
-                strict_update_type flag is set.
+                strict_update_type flag is set. Also raised when the update message is
+                frozen.
         """
+        self._check_not_frozen()
+        update_types = []
         for update_type, iu in iu_list:
             if not isinstance(iu, IncrementalUnit):
                 raise TypeError(
                     "IU is of type %s but should be IncrementalUnit" % type(iu)
                 )
-            if strict_update_type and not isinstance(update_type, UpdateType):
-                UpdateType(update_type)
-        for update_type, iu in iu_list:
             if strict_update_type and not isinstance(update_type, UpdateType):
                 update_type = UpdateType(update_type)
-            self._msgs.append((iu, update_type))
+            update_types.append(update_type)
+        self._ius.extend(iu for _, iu in iu_list)
+        self._update_types.extend(update_types)
 
     def has_valid_ius(self, iu_classes):
         """Checks whether the IUs in this update message are all of the type provided in
@@ -405,26 +1583,24 @@ class UpdateMessage:
             return False
         if not isinstance(iu_classes, list):
             iu_classes = [iu_classes]
-
+        iu_classes = tuple(iu_classes)
         for iu in self.incremental_units():
-            if not isinstance(iu, tuple(iu_classes)):
+            if not isinstance(iu, iu_classes):
                 self.found_invalid_iu = type(iu)
                 return False
         return True
 
     def update_types(self):
-        """A generator that iterates of all the update types of the update message,
+        """Return an iterator over all the update types of the update message,
         ignoring the incemental units
         """
-        for _, ut in self._msgs:
-            yield ut
+        return iter(self._update_types)
 
     def incremental_units(self):
-        """A generator that iterates of all the incremental units of the update message,
+        """Return an iterator over all the incremental units of the update message,
         ignoring the update types.
         """
-        for iu, _ in self._msgs:
-            yield iu
+        return iter(self._ius)
 
     def set_processed(self, module):
         """Sets all the incremental units of the update message as processed by the
@@ -433,10 +1609,176 @@ class UpdateMessage:
         Args:
             module (IncrementalModule): The module that has processed the incremental
             units of this update message."""
-        for iu in self.incremental_units():
+        for iu in self._ius:
             iu.set_processed(module)
 
 
+class IUList(list):
+    """An ordered list of IUs with constant time lookup of the position of an IU.
+
+    The list is used for the current_input and current_output of a module. It is a
+    subclass of list, so it can be used wherever a list is expected (e.g., sorted,
+    compared to lists or serialized). Additionally, it keeps the positions of its IUs
+    in a dictionary, so that checking whether an IU is in the list, finding its
+    position and getting all IUs after it take constant time instead of scanning the
+    list. Appending and removing IUs at the end of the list keeps the positions up to
+    date. Other changes (e.g., inserting or removing an IU in the middle of the list
+    or sorting it) are rare and cause the positions to be rebuilt on the next lookup.
+    """
+
+    __slots__ = ("_positions",)
+
+    def __init__(self, ius=()):
+        """Initialize the list.
+
+        Args:
+            ius (iterable): The initial IUs of the list.
+        """
+        super().__init__(ius)
+        self._positions = None
+
+    def _position(self, iu):
+        try:
+            return self._index().get(iu)
+        except TypeError:  # unhashable objects are never in the list
+            return None
+
+    def _index(self):
+        positions = self._positions
+        if positions is None:
+            positions = {}
+            for i, iu in enumerate(self):
+                positions.setdefault(iu, i)
+            self._positions = positions
+        return positions
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._positions = None
+
+    def __delitem__(self, index):
+        if index == -1 or index == len(self) - 1:
+            self.pop()
+            return
+        super().__delitem__(index)
+        self._positions = None
+
+    def __iadd__(self, other):
+        for iu in other:
+            self.append(iu)
+        return self
+
+    def __imul__(self, n):
+        result = super().__imul__(n)
+        self._positions = None
+        return result
+
+    def __contains__(self, iu):
+        return self._position(iu) is not None
+
+    def __reduce__(self):
+        return (IUList, (list(self),))
+
+    def insert(self, index, iu):
+        if index >= len(self):
+            self.append(iu)
+            return
+        super().insert(index, iu)
+        self._positions = None
+
+    def append(self, iu):
+        if self._positions is not None:
+            self._positions.setdefault(iu, len(self))
+        super().append(iu)
+
+    def extend(self, ius):
+        for iu in ius:
+            self.append(iu)
+
+    def pop(self, index=-1):
+        if index == -1 or index == len(self) - 1:
+            iu = super().pop()
+            positions = self._positions
+            if positions is not None and positions.get(iu) == len(self):
+                del positions[iu]
+            return iu
+        iu = super().pop(index)
+        self._positions = None
+        return iu
+
+    def clear(self):
+        super().clear()
+        self._positions = None
+
+    def sort(self, *, key=None, reverse=False):
+        super().sort(key=key, reverse=reverse)
+        self._positions = None
+
+    def reverse(self):
+        super().reverse()
+        self._positions = None
+
+    def index(self, iu, start=0, stop=None):
+        """Return the position of the first occurrence of an IU.
+
+        Raises:
+            ValueError: If the IU is not in the list.
+        """
+        position = self._position(iu)
+        if position is not None and position >= start:
+            if stop is None or position < stop:
+                return position
+        if stop is None:
+            stop = len(self)
+        return super().index(iu, start, stop)
+
+    def get(self, iu):
+        """Return the IU of the list that is equal to the given IU.
+
+        Args:
+            iu (IncrementalUnit): The IU to look up (e.g., an IU with the same iuid).
+
+        Returns:
+            IncrementalUnit: The IU of the list or None if it is not in the list.
+        """
+        position = self._position(iu)
+        if position is None:
+            return None
+        return self[position]
+
+    def after(self, iu):
+        """Return all IUs after the given IU.
+
+        Args:
+            iu (IncrementalUnit): An IU of the list.
+
+        Returns:
+            list: The IUs following the IU or all IUs if it is not in the list.
+        """
+        position = self._position(iu)
+        if position is None:
+            return self[:]
+        return self[position + 1 :]
+
+    def discard(self, iu):
+        """Remove the first occurrence of an IU if it is in the list.
+
+        Args:
+            iu (IncrementalUnit): The IU to remove.
+
+        Returns:
+            IncrementalUnit: The removed IU of the list or None.
+        """
+        position = self._position(iu)
+        if position is None:
+            return None
+        return self.pop(position)
+
+    def remove(self, iu):
+        if self.discard(iu) is None:
+            raise ValueError("%r is not in list" % (iu,))
+
+
 class AbstractModule:
     """An abstract module that is able to incrementally process data."""
 
@@ -449,6 +1791,11 @@ class AbstractModule:
     QUEUE_TIMEOUT = 0.01
     """Timeout in seconds for the incremental queues as not to block processing."""
 
+    WAKEUP_TIMEOUT = 1.0
+    """Maximum time in seconds an idle module waits for a new update message before it
+    checks again whether it is still running. Modules are woken up immediately when an
+    update message arrives or when they are stopped."""
+
     @staticmethod
     def name():
         """Return the human-readable name of the module.
@@ -503,7 +1850,14 @@ class AbstractModule:
                 d[k] = v
         return d
 
-    def __init__(self, queue_class=IncrementalQueue, meta_data={}, **kwargs):
+    def __init__(
+        self,
+        queue_class=IncrementalQueue,
+        meta_data={},
+        history_length=None,
+        history_window=None,
+        **kwargs,
+    ):
         """Initialize the module with a default IncrementalQueue.
 
         Args:
@@ -514,17 +1868,30 @@ class AbstractModule:
             meta_data (dict): A dict with meta data about the module. This may
                 be coordinates of the visualization of this module or other
                 auxiliary information.
+            history_length (int): The maximum number of IUs created by this module
+                that stay linked through their previous_iu connections. If None, the history is only bounded by
+                IncrementalUnit.MAX_DEPTH.
+            history_window (float): The maximum age in seconds of the IUs created by
+                this module that stay linked. If None, the age is not restricted.
         """
+        if history_length is not None and history_length < 1:
+            raise ValueError("The history length has to be at least 1")
+        if history_window is not None and history_window <= 0:
+            raise ValueError("The history window has to be positive")
         self._right_buffers = []
         self._is_running = False
         self._previous_iu = None
         self.found_invalid_ius = []
         self._left_buffers = []
         self.mutex = threading.Lock()
+        self._inbox = Inbox()
+        self._current_provider = None
         self.events = {}
+        self.event_dispatcher = None
+        self._stats = stats.ModuleStats()
 
-        self.current_input = []
-        self.current_output = []
+        self._current_input = IUList()
+        self._current_output = IUList()
 
         self.meta_data = {}
         if meta_data:
@@ -535,7 +1902,45 @@ class AbstractModule:
             self.queue_class = queue_class
 
         self.iu_counter = 0
+        self._next_iuid = 0
+        self._iuid_limit = 0
+        self._iu_lock = threading.Lock()
         self.id = str(uuid.uuid4())
+        self._module_index = None
+        self._input_types = {}
+        self._output_types = {}
+        self._trusted_output = False
+        self._batching = self.processes_batches()
+
+        self.history_length = history_length
+        self.history_window = history_window
+        self._history = None
+        if history_length is not None or history_window is not None:
+            self._history = collections.deque()
+
+    @property
+    def current_input(self):
+        """IUList: The IUs the module is currently working with. Lists assigned to it
+        are converted to an :class:`IUList`."""
+        return self._current_input
+
+    @current_input.setter
+    def current_input(self, ius):
+        if not isinstance(ius, IUList):
+            ius = IUList(ius)
+        self._current_input = ius
+
+    @property
+    def current_output(self):
+        """IUList: The IUs the module currently produced. Lists assigned to it are
+        converted to an :class:`IUList`."""
+        return self._current_output
+
+    @current_output.setter
+    def current_output(self, ius):
+        if not isinstance(ius, IUList):
+            ius = IUList(ius)
+        self._current_output = ius
 
     def revoke(self, iu, remove_revoked=True):
         """Revokes an IU form the list of the current_input or current_output, depending
@@ -547,14 +1952,13 @@ class AbstractModule:
                 deleted from the current_input or current_output list or if only the
                 revoked flag should be set.
         """
-        if iu in self.current_input:
-            self.current_input[self.current_input.index(iu)].revoked = True
+        for ius in (self._current_input, self._current_output):
             if remove_revoked:
-                self.current_input.remove(iu)
-        if iu in self.current_output:
-            self.current_output[self.current_output.index(iu)].revoked = True
-            if remove_revoked:
-                self.current_output.remove(iu)
+                current_iu = ius.discard(iu)
+            else:
+                current_iu = ius.get(iu)
+            if current_iu is not None:
+                current_iu.revoked = True
 
     def commit(self, iu):
         """Sets an IU as committed from the list of the current_input or current_output,
@@ -563,10 +1967,10 @@ class AbstractModule:
         Args:
             iu (IncrementalUnit): The incremental unit to set as committed.
         """
-        if iu in self.current_input:
-            self.current_input[self.current_input.index(iu)].committed = True
-        if iu in self.current_output:
-            self.current_output[self.current_output.index(iu)].committed = True
+        for ius in (self._current_input, self._current_output):
+            current_iu = ius.get(iu)
+            if current_iu is not None:
+                current_iu.committed = True
 
     def input_committed(self):
         """Checks whether all IUs in the input are committed.
@@ -592,6 +1996,7 @@ class AbstractModule:
             return
         if self._is_running:
             self.stop()
+        left_buffer.inbox = self._inbox
         self._left_buffers.append(left_buffer)
 
     def remove_left_buffer(self, left_buffer):
@@ -606,6 +2011,7 @@ class AbstractModule:
         if self._is_running:
             self.stop()
         self._left_buffers.remove(left_buffer)
+        left_buffer.inbox = None
 
     def left_buffers(self):
         """Returns the list of left buffers of the module.
@@ -662,6 +2068,12 @@ class AbstractModule:
         If update_message is None or there are no IUs in the update message, the method
         returns without doing anything.
 
+        The same update message instance is put into all queues. It is frozen, so that
+        no incremental units can be added to it afterwards. IUs that are sent to more
+        than one module or that are appended by a module other than their creator are
+        marked as shared, so that their processed bitmask is updated under a lock (see
+        :meth:`IncrementalUnit.set_processed`).
+
         Args:
             update_message (UpdateMessage): The update message that should be added to
                 all output queues. May be None.
@@ -673,8 +2085,26 @@ class AbstractModule:
                 "Update message is of type %s but should be UpdateMessage"
                 % type(update_message)
             )
+        update_message.freeze()
+        if (
+            self._trusted_output
+            and update_message._validated_by is None
+            and self._find_invalid_type(
+                update_message, self._output_types, self.output_iu
+            )
+            is None
+        ):
+            update_message._validated_by = self.id
+        # An IU has a single writer of its processed bitmask if it is only ever sent
+        # by its creator to one module. Once it is sent elsewhere, it stays shared.
+        single_writer = len(self._right_buffers) <= 1
+        for iu in update_message.incremental_units():
+            if iu._single_writer is not False:
+                iu._single_writer = single_writer and iu.creator is self
+        if tracing.ENABLED:
+            tracing.stamp_emitted(update_message)
         for q in self._right_buffers:
-            q.put(copy.copy(update_message))
+            q.put(update_message)
 
     def subscribe(self, module, q=None):
         """Subscribe a module to the queue.
@@ -692,9 +2122,65 @@ class AbstractModule:
             self.event_call(self.EVENT_SUBSCRIBE, {"module": module})
             q = self.queue_class(self, module)
             module.add_left_buffer(q)
+        q.trusted = self.is_compatible(module)
+        if q.trusted:
+            self._trusted_output = True
         self._right_buffers.append(q)
         return q
 
+    def is_compatible(self, module):
+        """Return whether the IUs produced by this module can be processed by the given
+        module, i.e., whether the output IU of this module is a subclass of one of the
+        input IUs of the other module.
+
+        Args:
+            module (AbstractModule): The module that consumes the output of this module.
+
+        Returns:
+            bool: Whether all IUs produced by this module are valid input of the module.
+        """
+        try:
+            output_iu = self.output_iu()
+            if not isinstance(output_iu, type):
+                return False
+            return module._is_valid_type(
+                output_iu, module._input_types, module.input_ius
+            )
+        except NotImplementedError:
+            return False
+
+    @staticmethod
+    def _is_valid_type(iu_type, cache, iu_classes):
+        """Return whether instances of iu_type are instances of the classes returned by
+        iu_classes and store the result in the cache."""
+        valid = cache.get(iu_type)
+        if valid is None:
+            classes = iu_classes()
+            if classes is None:
+                valid = False
+            else:
+                if not isinstance(classes, list):
+                    classes = [classes]
+                valid = issubclass(iu_type, tuple(classes))
+            cache[iu_type] = valid
+        return valid
+
+    def _find_invalid_type(self, update_message, cache, iu_classes):
+        """Return the type of the first IU of the update message that is not valid
+        according to iu_classes or None if all IUs are valid.
+
+        The result for every IU type is stored in the given cache, so that the classes
+        are only checked once per IU type.
+        """
+        for iu in update_message.incremental_units():
+            iu_type = type(iu)
+            valid = cache.get(iu_type)
+            if valid is None:
+                valid = self._is_valid_type(iu_type, cache, iu_classes)
+            if not valid:
+                return iu_type
+        return None
+
     def remove_from_rb(self, module):
         """Removes the connection to a module from the right buffers.
 
@@ -774,46 +2260,288 @@ class AbstractModule:
         """
         raise NotImplementedError()
 
+    def process_update_batch(self, update_messages):
+        """Processes all update messages that were waiting in the left buffers at once
+        and returns a new update message that can be appended to the output queues.
+
+        This method is optional. Modules that override it receive all update messages
+        waiting in their inbox in a single call instead of calling process_update for
+        each of them. This allows a module that fell behind to catch up in one step or
+        to process many IUs (e.g., audio frames) at once. A simple implementation may
+        merge the update messages and process them together:
+
+        .. code-block:: python
+
+            def process_update_batch(self, update_messages):
+                return self.process_update(UpdateMessage.merge(update_messages))
+
+        Args:
+            update_messages (list): The update messages that should be processed by the
+                module in the order of their arrival.
+
+        Returns:
+            UpdateMessage: An update message that is produced by this module based
+            on the incremental units that were given. May be None.
+        """
+        raise NotImplementedError()
+
+    def processes_batches(self):
+        """Return whether this module processes update messages in batches, i.e.,
+        whether it overrides the process_update_batch method.
+
+        Returns:
+            bool: Whether process_update_batch is used instead of process_update.
+        """
+        return type(self).process_update_batch is not AbstractModule.process_update_batch
+
     def _run(self):
         self.prepare_run()
         self._is_running = True
         while self._is_running:
-            # When buffer is empty the loop is too tight and chokes the entire system. (Loop executes without releasing resources to the OS)
-            time.sleep(0.02)
-            for buffer in self._left_buffers:
-                with self.mutex:
-                    try:
-                        update_message = buffer.get(timeout=self.QUEUE_TIMEOUT)
-                    except queue.Empty:
-                        update_message = None
-                    if update_message:
-                        '''
-                        If this module gets an invalid IU, print a warning the first time
-                        then ignore thereafter. 
-                        '''
-                        if not update_message.has_valid_ius(self.input_ius()):
-                            viu = update_message.found_invalid_iu
-                            if viu not in self.found_invalid_ius:
-                                print("Warning: the module {} can't handle type of IU {}. Will ignore this IU type.".format(self.name(), viu))
-                                self.found_invalid_ius.append(viu)
-                            continue
-                        output_message = self.process_update(update_message)
-                        update_message.set_processed(self)
-                        for input_iu in update_message.incremental_units():
-                            self.event_call(self.EVENT_PROCESS_IU, {"iu": input_iu})
-                        self.event_call(
-                            self.EVENT_PROCESS_UPDATE_MESSAGE,
-                            {"update_message": update_message},
-                        )
-                        if output_message:
-                            if output_message.has_valid_ius(self.output_iu()):
-                                self.append(output_message)
-                            else:
-                                raise TypeError(
-                                    "This module should not produce IUs of this type."
-                                )
+            buffer, update_message = clock.CLOCK.wait(self._inbox, self.WAKEUP_TIMEOUT)
+            if buffer is None:
+                continue
+            self._process_arrival(buffer, update_message)
         self.shutdown()
 
+    def _process_pending(self, max_messages=None):
+        """Process the update messages that are waiting in the inbox without blocking.
+
+        This is used by a :class:`Scheduler<retico_core.scheduler.Scheduler>` to
+        activate the module instead of running it in its own thread.
+
+        Args:
+            max_messages (int): The maximum number of update messages to process. If
+                None, all waiting update messages are processed.
+
+        Returns:
+            int: The number of update messages that were processed.
+        """
+        count = 0
+        while self._is_running and (max_messages is None or count < max_messages):
+            buffer, update_message = self._inbox.get(block=False)
+            if buffer is None:
+                break
+            remaining = None if max_messages is None else max_messages - count
+            count += self._process_arrival(buffer, update_message, remaining)
+        return count
+
+    def _process_arrival(self, buffer, update_message, max_messages=None):
+        """Process an update message that was taken from the inbox.
+
+        If the module processes batches, the other update messages waiting in the
+        inbox are processed together with it.
+
+        Args:
+            buffer (IncrementalQueue): The left buffer the update message came from.
+            update_message (UpdateMessage): The update message.
+            max_messages (int): The maximum size of a batch. If None, all waiting
+                update messages are processed.
+
+        Returns:
+            int: The number of update messages that were processed.
+        """
+        with self.mutex:
+            if not self._batching:
+                self._current_provider = buffer.provider
+                self._process_update_message(update_message, buffer, buffer.last_put_at)
+                self._current_provider = None
+                return 1
+            batch = [update_message]
+            buffers = [buffer]
+            put_times = [buffer.last_put_at]
+            while max_messages is None or len(batch) < max_messages:
+                buffer, update_message = self._inbox.get(block=False)
+                if buffer is None:
+                    break
+                batch.append(update_message)
+                buffers.append(buffer)
+                put_times.append(buffer.last_put_at)
+            self._process_update_batch(batch, buffers, put_times)
+            self._current_provider = None
+            return len(batch)
+
+    def _process_update_batch(self, update_messages, buffers=None, put_times=None):
+        """Validates and processes a batch of update messages with the
+        process_update_batch method, calls the according events and appends the
+        output to the right buffers.
+
+        Args:
+            update_messages (list): The update messages to process.
+            buffers (list): The left buffers the update messages were taken from.
+                May be None.
+            put_times (list): The times (of time.perf_counter) the update messages
+                were put into the left buffers. May be None.
+        """
+        if buffers is None:
+            buffers = [None] * len(update_messages)
+        if put_times is None:
+            put_times = [None] * len(update_messages)
+        valid = [
+            (um, buffer, put_at)
+            for um, buffer, put_at in zip(update_messages, buffers, put_times)
+            if self._check_input(um, buffer)
+        ]
+        if not valid:
+            return
+        valid_messages = [um for um, _, _ in valid]
+        if tracing.ENABLED:
+            for update_message in valid_messages:
+                tracing.stamp_received(update_message, self)
+        last_provider = getattr(valid[-1][1], "provider", None)
+        self._current_provider = last_provider
+        start = time.perf_counter()
+        output_message = self.process_update_batch(valid_messages)
+        end = time.perf_counter()
+        self._stats.record(valid_messages, start, end, [t for _, _, t in valid])
+        if tracing.RECORDER is not None:
+            tracing.RECORDER.span(
+                self.name(),
+                "process_update",
+                start,
+                end,
+                {"messages": len(valid_messages)},
+            )
+        for update_message, buffer, _ in valid:
+            self._current_provider = getattr(buffer, "provider", None)
+            self._complete_update_message(update_message, None)
+        self._current_provider = last_provider
+        self._append_output(output_message)
+
+    def _process_update_message(self, update_message, buffer=None, put_at=None):
+        """Validates and processes a single update message taken from a left buffer,
+        calls the according events and appends the output to the right buffers.
+
+        Args:
+            update_message (UpdateMessage): The update message to process.
+            buffer (IncrementalQueue): The left buffer the update message was taken
+                from. May be None.
+            put_at (float): The time (of time.perf_counter) the update message was put
+                into the left buffer. May be None.
+        """
+        if not self._check_input(update_message, buffer):
+            return
+        if tracing.ENABLED:
+            tracing.stamp_received(update_message, self)
+        start = time.perf_counter()
+        output_message = self.process_update(update_message)
+        end = time.perf_counter()
+        self._stats.record((update_message,), start, end, (put_at,))
+        if tracing.RECORDER is not None:
+            tracing.RECORDER.span(self.name(), "process_update", start, end)
+        self._complete_update_message(update_message, output_message)
+
+    def _check_input(self, update_message, buffer=None):
+        """Return whether the update message should be processed by the module.
+
+        Update messages from trusted left buffers that were validated by their
+        provider are not checked again. If this module gets an invalid IU, a warning is
+        printed the first time and the IU type is ignored thereafter.
+
+        Args:
+            update_message (UpdateMessage): The update message taken from a left
+                buffer.
+            buffer (IncrementalQueue): The left buffer the update message was taken
+                from. May be None.
+
+        Returns:
+            bool: Whether the update message is valid and should be processed.
+        """
+        if not update_message:
+            return False
+        if (
+            buffer is not None
+            and buffer.trusted
+            and update_message._validated_by == buffer.provider.id
+        ):
+            return True
+        viu = self._find_invalid_type(update_message, self._input_types, self.input_ius)
+        if viu is not None:
+            self._stats.record_invalid(update_message)
+            if viu not in self.found_invalid_ius:
+                print(
+                    "Warning: the module {} can't handle type of IU {}. Will ignore this IU type.".format(
+                        self.name(), viu
+                    )
+                )
+                self.found_invalid_ius.append(viu)
+            return False
+        return True
+
+    def _complete_update_message(self, update_message, output_message):
+        """Marks the update message as processed, calls the according events and
+        appends the output message to the right buffers.
+
+        Args:
+            update_message (UpdateMessage): The update message that was processed.
+            output_message (UpdateMessage): The update message produced by the
+                module. May be None.
+        """
+        update_message.set_processed(self)
+        for input_iu in update_message.incremental_units():
+            self.event_call(self.EVENT_PROCESS_IU, {"iu": input_iu})
+        self.event_call(
+            self.EVENT_PROCESS_UPDATE_MESSAGE,
+            {"update_message": update_message, "provider": self._current_provider},
+        )
+        self._append_output(output_message)
+
+    def _append_output(self, output_message):
+        """Checks the type of the IUs produced by the module and appends the output
+        message to the right buffers.
+
+        Args:
+            output_message (UpdateMessage): The update message produced by the
+                module. May be None.
+
+        Raises:
+            TypeError: When the output message contains IUs of the wrong type.
+        """
+        if output_message:
+            if (
+                self._find_invalid_type(
+                    output_message, self._output_types, self.output_iu
+                )
+                is not None
+            ):
+                raise TypeError("This module should not produce IUs of this type.")
+            output_message._validated_by = self.id
+            self.append(output_message)
+
+    def stats(self):
+        """Return the statistics of the update messages processed by this module.
+
+        The statistics contain the number of processed update messages and IUs (in
+        total and per second), the number of ignored IUs and summaries of the
+        histograms of the time update messages waited in the left buffers
+        ("queue_wait") and of the processing time ("process_time") in seconds. See
+        :mod:`retico_core.stats` for details.
+
+        Returns:
+            dict: The statistics of the module.
+        """
+        return self._stats.summary()
+
+    def reset_stats(self):
+        """Reset the statistics of this module."""
+        self._stats.reset()
+
+    def current_provider(self):
+        """Return the module that provided the update message that is currently
+        processed.
+
+        This may be used in the process_update method of modules with multiple left
+        buffers to distinguish the providers of the incoming update messages. While a
+        batch is processed with process_update_batch, this is the provider of the last
+        update message of the batch. The events of every update message of the batch
+        are called with its own provider.
+
+        Returns:
+            AbstractModule: The module that produced the update message currently
+            processed or None if no update message is processed.
+        """
+        return self._current_provider
+
     def is_valid_input_iu(self, iu):
         """Return whether the given IU is a valid input IU.
 
@@ -862,21 +2590,40 @@ class AbstractModule:
         be used to tear down the pipeline needed for processing the IUs."""
         pass
 
-    def run(self, run_setup=True):
+    def is_schedulable(self):
+        """Return whether this module can be run by a shared
+        :class:`Scheduler<retico_core.scheduler.Scheduler>`.
+
+        Only modules that rely on the default processing loop can be scheduled.
+        Modules that define their own loop (like producing modules, which
+        continuously generate output) always run in their own thread.
+
+        Returns:
+            bool: Whether the module can be activated by a scheduler.
+        """
+        return type(self)._run is AbstractModule._run
+
+    def run(self, run_setup=True, scheduler=None):
         """Run the processing pipeline of this module in a new thread. The
         thread can be stopped by calling the stop() method.
 
         Args:
             run_setup (bool): Whether or not the setup method should be executed
             before the thread is started.
+            scheduler (Scheduler): An optional scheduler with a shared pool of
+                worker threads. If given and the module is schedulable, the module
+                is activated by the scheduler whenever update messages arrive
+                instead of running in its own thread. Ignored if a virtual clock is
+                used (see :mod:`retico_core.clock`).
         """
         if run_setup:
             self.setup()
         for q in self.right_buffers():
-            with q.mutex:
-                q.queue.clear()
-        t = threading.Thread(target=self._run)
-        t.start()
+            q.clear()
+        if scheduler is not None and self.is_schedulable() and not clock.CLOCK.virtual:
+            scheduler.add(self)
+        else:
+            clock.CLOCK.start_thread(self._run, self.name(), self._inbox)
         self.event_call(self.EVENT_START)
 
     def stop(self, clear_buffer=True):
@@ -884,6 +2631,7 @@ class AbstractModule:
         next possible point in time. This may be after the next incoming IU is
         processed."""
         self._is_running = False
+        self._inbox.wakeup()
         if clear_buffer:
             for buffer in self.right_buffers():
                 while not buffer.empty():
@@ -899,6 +2647,10 @@ class AbstractModule:
         because it will alreade have been introduced into the chain of IUs of
         this module!
 
+        IUs may be created from multiple threads of the module (e.g., the processing
+        thread and a dispatching thread), so the chain of IUs is only changed while
+        holding the IU lock of the module.
+
         Args:
             grounded_in (IncrementalUnit): The incremental unit that the new
                 unit is based on. May be None.
@@ -908,16 +2660,117 @@ class AbstractModule:
             unit it is grounded in and to the previous IU that was generated by
             this module.
         """
-        new_iu = self.output_iu()(
-            creator=self,
-            iuid=f"{hash(self)}:{self.iu_counter}",
-            previous_iu=self._previous_iu,
-            grounded_in=grounded_in,
-        )
-        self.iu_counter += 1
-        self._previous_iu = new_iu
+        iu_class = self.output_iu()
+        with self._iu_lock:
+            iuid = self._next_iuid
+            if iuid >= self._iuid_limit:
+                iuid = self._take_iuids(1)
+            else:
+                self._next_iuid = iuid + 1
+            new_iu = iu_class(
+                creator=self,
+                iuid=iuid,
+                previous_iu=self._previous_iu,
+                grounded_in=grounded_in,
+            )
+            self.iu_counter += 1
+            self._previous_iu = new_iu
+            if self._history is not None:
+                self._retain(new_iu)
         return new_iu
 
+    def create_ius(self, n, grounded_in=None):
+        """Creates a run of new Incremental Units that are all grounded in the same IU.
+
+        The IUs are created like n consecutive calls of :meth:`create_iu`: they get
+        sequential ids and each IU is linked to the IU created before it. This is
+        faster than calling create_iu for every IU and should be used by modules that
+        produce many IUs at once (e.g., when splitting a long utterance into chunks).
+
+        As with create_iu, all of the created IUs are introduced into the chain of IUs
+        of this module and should not be discarded.
+
+        Args:
+            n (int): The number of IUs to create.
+            grounded_in (IncrementalUnit): The incremental unit that the new units
+                are based on. May be None.
+
+        Returns:
+            list: The n new incremental units in the order of their creation.
+        """
+        iu_class = self.output_iu()
+        with self._iu_lock:
+            first_iuid = self._take_iuids(n)
+            previous_iu = self._previous_iu
+            new_ius = []
+            for iuid in range(first_iuid, first_iuid + n):
+                previous_iu = iu_class(
+                    creator=self,
+                    iuid=iuid,
+                    previous_iu=previous_iu,
+                    grounded_in=grounded_in,
+                )
+                new_ius.append(previous_iu)
+            self.iu_counter += n
+            self._previous_iu = previous_iu
+            if self._history is not None:
+                for new_iu in new_ius:
+                    self._retain(new_iu)
+        return new_ius
+
+    def _take_iuids(self, n):
+        """Reserve n consecutive iuids for new IUs of this module. Must be called while
+        holding the IU lock of the module.
+
+        The iuids of a module are 64-bit integers made of a random prefix of the module
+        (see :data:`IUID_SEQUENCE_BITS`) and a sequence number, so that they are unique
+        across modules and processes and increase in the order the IUs are created. A
+        new prefix is drawn when the sequence numbers run out.
+
+        Args:
+            n (int): The number of iuids.
+
+        Returns:
+            int: The first of the n iuids.
+        """
+        first = self._next_iuid
+        if first + n > self._iuid_limit:
+            first = _random_iuid_prefix()
+            self._iuid_limit = first + (1 << IUID_SEQUENCE_BITS)
+        self._next_iuid = first + n
+        return first
+
+    def _retain(self, new_iu):
+        """Add a new IU to the history of this module and unlink the IUs that exceed
+        the history length or window.
+
+        The module drops its reference to the unlinked IUs and the oldest IU that is
+        kept loses its previous_iu connection to them. Thus, IUs outside of the
+        history can be garbage collected once no other module holds them anymore. The
+        unlinked IUs themselves are not changed, as they may already have been
+        emitted.
+
+        Args:
+            new_iu (IncrementalUnit): The IU that was just created.
+        """
+        history = self._history
+        history.append(new_iu)
+        length = self.history_length
+        expired_before = None
+        if self.history_window is not None:
+            expired_before = new_iu.created_at - self.history_window
+        removed = False
+        while len(history) > 1 and (
+            (length is not None and len(history) > length)
+            or (expired_before is not None and history[0].created_at < expired_before)
+        ):
+            history.popleft()
+            removed = True
+        if removed:
+            oldest = history[0]
+            oldest.previous_iu = None
+            oldest._previous_depth = 0
+
     def latest_iu(self):
         """Provides reading access to the latest incremental unit that was
         produced by this module.
@@ -935,7 +2788,7 @@ class AbstractModule:
     def __repr__(self):
         return self.name()
 
-    def event_subscribe(self, event_name, callback):
+    def event_subscribe(self, event_name, callback, sample=1, event_filter=None):
         """
         Subscribe a callback to an event with the given name. If tge event name
         is "*", then the callback will be called after every event.
@@ -944,14 +2797,43 @@ class AbstractModule:
         triggered the event (AbstractModule), the name of the event (str) and a
         dict (dict) that may contain data relevant to the event.
 
+        The callback is called by the event dispatcher of the module (see
+        :mod:`retico_core.events`), which may drop events if the callbacks do
+        not keep up with them.
+
         Args:
             event_name (str): The name of the event to subscribe to
             callback (function): A function that is called once the event occurs
+            sample (int): If greater than 1, only every n-th event is passed to
+                the callback.
+            event_filter (function): An optional function that is given the same
+                arguments as the callback and returns whether the callback should
+                be called for the event.
         """
+        if sample != 1 or event_filter is not None:
+            callback = events.EventSubscription(callback, sample, event_filter)
         if not self.events.get(event_name):
             self.events[event_name] = []
         self.events[event_name].append(callback)
 
+    def event_unsubscribe(self, event_name, callback):
+        """Unsubscribe a callback from an event with the given name.
+
+        Callbacks that were subscribed with a sample or an event filter are
+        unsubscribed by passing the same callback function.
+
+        Args:
+            event_name (str): The name of the event the callback was subscribed to
+            callback (function): The function that was subscribed
+
+        Raises:
+            ValueError: If the callback is not subscribed to the event.
+        """
+        callbacks = list(self.events.get(event_name, []))
+        callbacks.remove(callback)
+        # The list is replaced instead of changed, as it may be iterated by event_call
+        self.events[event_name] = callbacks
+
     def event_call(self, event_name, data={}):
         """
         Calls all callback functions that are subscribed to the given event
@@ -971,12 +2853,19 @@ class AbstractModule:
             data = {}
         if event_name == "*":
             return
-        if self.events.get(event_name):
-            for callback in self.events[event_name]:
-                threading.Thread(target=callback, args=(self, event_name, data)).start()
-        if self.events.get("*"):
-            for callback in self.events["*"]:
-                threading.Thread(target=callback, args=(self, event_name, data)).start()
+        callbacks = self.events.get(event_name)
+        wildcard_callbacks = self.events.get("*")
+        if not callbacks and not wildcard_callbacks:
+            return
+        dispatcher = self.event_dispatcher
+        if dispatcher is None:
+            dispatcher = events.EventDispatcher.default()
+        if callbacks:
+            for callback in callbacks:
+                dispatcher.dispatch(callback, self, event_name, data)
+        if wildcard_callbacks:
+            for callback in wildcard_callbacks:
+                dispatcher.dispatch(callback, self, event_name, data)
 
 
 class AbstractProducingModule(AbstractModule):
@@ -1004,7 +2893,7 @@ class AbstractProducingModule(AbstractModule):
         raise NotImplementedError()
 
     def __init__(self, queue_class=IncrementalQueue, **kwargs):
-        super().__init__(queue_class=IncrementalQueue, **kwargs)
+        super().__init__(queue_class=queue_class, **kwargs)
 
     def _run(self):
         self.prepare_run()
@@ -1012,13 +2901,7 @@ class AbstractProducingModule(AbstractModule):
         while self._is_running:
             with self.mutex:
                 output_message = self.process_update(None)
-                if output_message:
-                    if output_message.has_valid_ius(self.output_iu()):
-                        self.append(output_message)
-                    else:
-                        raise TypeError(
-                            "This module should not produce IUs of this type."
-                        )
+                self._append_output(output_message)
         self.shutdown()
 
     def process_update(self, update_message):
@@ -1075,14 +2958,15 @@ class AbstractTriggerModule(AbstractProducingModule):
         raise NotImplementedError()
 
     def __init__(self, queue_class=IncrementalQueue, **kwargs):
-        super().__init__(queue_class=IncrementalQueue, **kwargs)
+        super().__init__(queue_class=queue_class, **kwargs)
 
     def _run(self):
         self.prepare_run()
         self._is_running = True
         while self._is_running:
-            with self.mutex:
-                time.sleep(0.05)
+            # Trigger modules have no input, so they only need to wake up when they
+            # are stopped.
+            clock.CLOCK.wait(self._inbox, self.WAKEUP_TIMEOUT)
         self.shutdown()
 
     def process_update(self, update_message):
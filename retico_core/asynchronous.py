@@ -0,0 +1,341 @@
+"""
+Asynchronous Module
+===================
+
+This module defines incremental modules whose `process_update` method is a coroutine.
+All asynchronous modules of a network run as tasks on a single asyncio event loop
+instead of each running in its own thread. This is useful for modules that spend most
+of their time waiting for I/O (e.g., clients of local model servers), as hundreds of
+them can share a single thread.
+
+Asynchronous modules can be connected to regular modules in both directions. An
+asynchronous module does not poll its left buffers but awaits the arrival of new update
+messages in its inbox.
+
+The event loop runs in its own thread and is managed by an :class:`EventLoopRunner`.
+Per default, all asynchronous modules share the runner returned by
+:meth:`EventLoopRunner.default`, but a runner may also be given to
+:meth:`network.run<retico_core.network.run>`:
+
+.. code-block:: python
+
+    runner = retico_core.asynchronous.EventLoopRunner()
+    retico_core.network.run(module, event_loop=runner)
+"""
+
+import asyncio
+import threading
+import time
+import traceback
+
+from retico_core import abstract
+from retico_core import tracing
+
+
+class EventLoopRunner:
+    """Runs an asyncio event loop in a dedicated thread on which asynchronous modules
+    are executed.
+
+    Attributes:
+        loop (asyncio.AbstractEventLoop): The event loop of the runner. None until the
+            runner is started.
+    """
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    @classmethod
+    def default(cls):
+        """Return the runner that is shared by all asynchronous modules that are run
+        without a specific runner.
+
+        Returns:
+            EventLoopRunner: The default runner.
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def __init__(self):
+        self.loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the event loop in a new thread if it is not yet running."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._run_loop, name="retico-event-loop", daemon=True
+            )
+            self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def in_loop_thread(self):
+        """Return whether the calling code runs in the thread of the event loop.
+
+        Returns:
+            bool: True if called from the event loop thread.
+        """
+        return threading.current_thread() is self._thread
+
+    def add(self, module):
+        """Start running an asynchronous module on the event loop.
+
+        Args:
+            module (AsyncAbstractModule): The module to run.
+        """
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(module._arun(self), self.loop)
+        future.add_done_callback(self._report_exception)
+
+    @staticmethod
+    def _report_exception(future):
+        if not future.cancelled() and future.exception() is not None:
+            exc = future.exception()
+            traceback.print_exception(type(exc), exc, exc.__traceback__)
+
+    def shutdown(self, timeout=5.0):
+        """Stop the event loop and its thread.
+
+        All modules running on the loop should be stopped beforehand. Tasks that did
+        not finish within the timeout are cancelled.
+
+        Args:
+            timeout (float): The time in seconds to wait for running tasks to finish.
+        """
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._finish_tasks(timeout), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        thread.join()
+        self.loop.close()
+
+    @staticmethod
+    async def _finish_tasks(timeout):
+        current = asyncio.current_task()
+        tasks = [t for t in asyncio.all_tasks() if t is not current]
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+
+
+class AsyncAbstractModule(abstract.AbstractModule):
+    """An abstract module whose process_update method is a coroutine.
+
+    The module runs as a task on the event loop of an :class:`EventLoopRunner` and
+    awaits incoming update messages instead of waiting for them in a thread.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._arrival = None
+
+    async def process_update(self, update_message):
+        """Processes the update message given and returns a new update message that can
+        be appended to the output queues.
+
+        This method is a coroutine and should await I/O instead of blocking, as all
+        asynchronous modules of a network share the same event loop.
+
+        Args:
+            update_message (UpdateMessage): The update message that should be processed
+                by the module.
+
+        Returns:
+            UpdateMessage: An update message that is produced by this module based
+            on the incremental units that were given. May be None.
+        """
+        raise NotImplementedError()
+
+    def is_schedulable(self):
+        return False
+
+    def run(self, run_setup=True, event_loop=None):
+        """Run the processing pipeline of this module as a task on an event loop. The
+        task can be stopped by calling the stop() method.
+
+        Args:
+            run_setup (bool): Whether or not the setup method should be executed
+                before the task is started.
+            event_loop (EventLoopRunner): The runner on whose event loop the module
+                should be executed. If None, the default runner is used.
+        """
+        if run_setup:
+            self.setup()
+        for q in self.right_buffers():
+            q.clear()
+        if event_loop is None:
+            event_loop = EventLoopRunner.default()
+        event_loop.add(self)
+        self.event_call(self.EVENT_START)
+
+    def _listen(self, runner):
+        """Connect the inbox of the module to an asyncio event that is set whenever an
+        update message arrives or the module is woken up."""
+        arrival = asyncio.Event()
+        loop = runner.loop
+
+        def listener():
+            if runner.in_loop_thread():
+                arrival.set()
+            else:
+                loop.call_soon_threadsafe(arrival.set)
+
+        self._arrival = arrival
+        self._inbox.listener = listener
+
+    async def _arun(self, runner):
+        self._listen(runner)
+        self.prepare_run()
+        self._is_running = True
+        while self._is_running:
+            buffer, update_message = self._inbox.get(block=False)
+            if buffer is None:
+                self._arrival.clear()
+                if self._is_running and self._inbox.empty():
+                    await self._arrival.wait()
+                continue
+            self._current_provider = buffer.provider
+            if self._check_input(update_message, buffer):
+                if tracing.ENABLED:
+                    tracing.stamp_received(update_message, self)
+                start = time.perf_counter()
+                output_message = await self.process_update(update_message)
+                end = time.perf_counter()
+                self._stats.record((update_message,), start, end, (buffer.last_put_at,))
+                if tracing.RECORDER is not None:
+                    tracing.RECORDER.span(self.name(), "process_update", start, end)
+                self._complete_update_message(update_message, output_message)
+            self._current_provider = None
+        self._inbox.listener = None
+        self.shutdown()
+
+
+class AsyncAbstractProducingModule(AsyncAbstractModule):
+    """An abstract asynchronous producing module.
+
+    The producing module has no input queue and thus does not wait for any input. The
+    process_update coroutine is awaited continuously and may return new output when it
+    becomes available. It should await something (e.g., the next item of an input
+    stream or asyncio.sleep) so that other modules on the event loop can run.
+    """
+
+    @staticmethod
+    def name():
+        raise NotImplementedError()
+
+    @staticmethod
+    def description():
+        raise NotImplementedError()
+
+    @staticmethod
+    def input_ius():
+        return []
+
+    @staticmethod
+    def output_iu():
+        raise NotImplementedError()
+
+    async def _arun(self, runner):
+        self._listen(runner)
+        self.prepare_run()
+        self._is_running = True
+        while self._is_running:
+            output_message = await self.process_update(None)
+            self._append_output(output_message)
+        self._inbox.listener = None
+        self.shutdown()
+
+    async def process_update(self, update_message):
+        raise NotImplementedError()
+
+
+class AsyncAbstractConsumingModule(AsyncAbstractModule):
+    """An abstract asynchronous consuming module.
+
+    The consuming module consumes IUs but does not return any data.
+    """
+
+    @staticmethod
+    def name():
+        raise NotImplementedError()
+
+    @staticmethod
+    def description():
+        raise NotImplementedError()
+
+    @staticmethod
+    def input_ius():
+        raise NotImplementedError()
+
+    @staticmethod
+    def output_iu():
+        return None
+
+    def subscribe(self, module, q=None):
+        raise ValueError("Consuming Modules do not produce any output")
+
+    async def process_update(self, update_message):
+        raise NotImplementedError()
+
+
+class AsyncAbstractTriggerModule(AsyncAbstractProducingModule):
+    """An abstract asynchronous trigger module that produces an update message once
+    the trigger coroutine is awaited. Unless the module is triggered no updates are
+    produced."""
+
+    @staticmethod
+    def name():
+        raise NotImplementedError()
+
+    @staticmethod
+    def description():
+        raise NotImplementedError()
+
+    @staticmethod
+    def input_ius():
+        return []
+
+    @staticmethod
+    def output_iu():
+        raise NotImplementedError()
+
+    async def _arun(self, runner):
+        self._listen(runner)
+        self.prepare_run()
+        self._is_running = True
+        while self._is_running:
+            # Trigger modules have no input, so they only need to wake up when they
+            # are stopped.
+            await self._arrival.wait()
+            self._arrival.clear()
+        self._inbox.listener = None
+        self.shutdown()
+
+    async def process_update(self, update_message):
+        return None
+
+    async def trigger(self, data={}, update_type=abstract.UpdateType.ADD):
+        """The trigger coroutine that should produce an update message and append it to
+        the right buffer
+
+        Args:
+            data (dict): A dictionary with data that can be used for the trigger
+            update_type (UpdateType): The update type that the IU should have. Default
+                is UpdateType.ADD
+        """
+        raise NotImplementedError()
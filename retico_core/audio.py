@@ -60,6 +60,8 @@ class AudioIU(retico_core.IncrementalUnit):
         sample_width (int): The bytes per sample of this IU
     """
 
+    __slots__ = ("raw_audio", "rate", "nframes", "sample_width")
+
     @staticmethod
     def type():
         return "Audio IU"
@@ -67,7 +69,7 @@ class AudioIU(retico_core.IncrementalUnit):
     def __init__(
         self,
         creator=None,
-        iuid=0,
+        iuid=None,
         previous_iu=None,
         grounded_in=None,
         rate=None,
@@ -114,6 +116,8 @@ class SpeechIU(AudioIU):
     type of IU to AudioIU.
     """
 
+    __slots__ = ("dispatch",)
+
     @staticmethod
     def type():
         return "Speech IU"
@@ -130,6 +134,8 @@ class DispatchedAudioIU(AudioIU):
     wants to track the status of the current dispatched audio.
     """
 
+    __slots__ = ("completion", "is_dispatching")
+
     @staticmethod
     def type():
         return "Dispatched Audio IU"
@@ -525,37 +531,60 @@ class AudioDispatcherModule(retico_core.AbstractModule):
         # incoming IU is set to not dispatch, we stop dispatching and clean the
         # buffer
         for iu, ut in update_message:
+            if ut == retico_core.UpdateType.REVOKE:
+                self._revoke_dispatch(iu)
+                continue
             if ut != retico_core.UpdateType.ADD:
                 continue
             if self.interrupt or not iu.dispatch:
                 self.set_dispatching(False)
                 self.audio_buffer = []
             if iu.dispatch:
-                # Loop over all frames (frame-sized chunks of data) in the input IU
-                # and add them to the buffer to be dispatched by the
-                # _dispatch_audio_loop
-                for i in range(0, iu.nframes, self.target_chunk_size):
+                # Split the input IU into frame-sized chunks of data and add them to
+                # the buffer to be dispatched by the _dispatch_audio_loop. The IUs of
+                # all chunks are created at once and added to the buffer together, so
+                # that the dispatch loop is only blocked once.
+                chunk_starts = range(0, iu.nframes, self.target_chunk_size)
+                chunk_ius = self.create_ius(len(chunk_starts), iu)
+                for i, current_iu in zip(chunk_starts, chunk_ius):
                     cur_pos = i * self.sample_width
                     data = iu.raw_audio[cur_pos : cur_pos + cur_width]
                     distance = cur_width - len(data)
-                    data += b"\0" * distance
+                    if distance:
+                        data += b"\0" * distance
 
                     completion = float((i + self.target_chunk_size) / iu.nframes)
                     if completion > 1:
                         completion = 1
 
-                    current_iu = self.create_iu(iu)
                     current_iu.set_dispatching(completion, True)
                     current_iu.set_audio(
                         data, self.target_chunk_size, self.rate, self.sample_width
                     )
-                    self.audio_buffer.append(current_iu)
-                self.set_dispatching(True)
+                with self.dispatching_mutex:
+                    self.audio_buffer.extend(chunk_ius)
+                    self._is_dispatching = True
         return None
 
+    def _revoke_dispatch(self, iu):
+        """Remove the audio of a revoked speech IU from the audio buffer, so that it
+        is not dispatched anymore. If no other audio is left in the buffer, the
+        dispatching is stopped.
+
+        Args:
+            iu (SpeechIU): The speech IU that was revoked.
+        """
+        with self.dispatching_mutex:
+            self.audio_buffer = [
+                buffered for buffered in self.audio_buffer if buffered.grounded_in != iu
+            ]
+            if not self.audio_buffer:
+                self._is_dispatching = False
+
     def _dispatch_audio_loop(self):
         """A method run in a thread that adds IU to the output queue."""
         while self.run_loop:
+            tick_start = time.perf_counter()
             with self.dispatching_mutex:
                 if self._is_dispatching:
                     if self.audio_buffer:
@@ -581,12 +610,25 @@ class AudioDispatcherModule(retico_core.AbstractModule):
                                 current_iu, retico_core.UpdateType.ADD
                             )
                         )
-            time.sleep((self.target_chunk_size / self.rate) / self.speed)
+                dispatching = self._is_dispatching
+            recorder = retico_core.tracing.RECORDER
+            if recorder is not None:
+                recorder.span(
+                    self.name(),
+                    "dispatch",
+                    tick_start,
+                    time.perf_counter(),
+                    {"dispatching": dispatching},
+                )
+            retico_core.clock.CLOCK.sleep(
+                (self.target_chunk_size / self.rate) / self.speed
+            )
 
     def prepare_run(self):
         self.run_loop = True
-        t = threading.Thread(target=self._dispatch_audio_loop)
-        t.start()
+        retico_core.clock.CLOCK.start_thread(
+            self._dispatch_audio_loop, "%s (dispatch)" % self.name()
+        )
 
     def shutdown(self):
         self.run_loop = False
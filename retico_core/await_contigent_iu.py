@@ -1,6 +1,5 @@
 import queue
 import threading
-import time
 from collections import deque, namedtuple
 from enum import Enum
 
@@ -38,6 +37,7 @@ class AwaitContingentIUsModule(abstract.AbstractModule):
 
         super().__init__(**kwargs)
         self.queue = deque()
+        self._queue_event = threading.Event()
         self.required_ius = required_ius
         self.await_type = await_type
 
@@ -56,10 +56,15 @@ class AwaitContingentIUsModule(abstract.AbstractModule):
     def process_update(self, update_message):
         for iu, ut in update_message:
             self.queue.append(iu)
+        self._queue_event.set()
 
     def _extractor_thread(self):
          while self._extractor_thread_active:
-            time.sleep(0.01)
+            # Wait until process_update has put new IUs into the queue (or the module
+            # is shut down) instead of polling the queue.
+            if not self.queue:
+                self._queue_event.wait(self.WAKEUP_TIMEOUT)
+            self._queue_event.clear()
             if len(self.queue) == 0:
                 continue
             # Iterate over queue and pop the items off, make sure they align with the expected IUs.
@@ -110,3 +115,4 @@ class AwaitContingentIUsModule(abstract.AbstractModule):
 
     def shutdown(self):
         self._extractor_thread_active = False
+        self._queue_event.set()
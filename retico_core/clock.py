@@ -0,0 +1,286 @@
+"""
+Clock Module
+============
+
+This module defines the clock that all modules use to tell the time (e.g., the
+created_at attribute of IUs) and to wait (e.g., the pacing of an
+:class:`AudioDispatcherModule<retico_core.audio.AudioDispatcherModule>`).
+
+Per default, the :class:`RealClock` is used, which simply uses the system time. For
+offline evaluation, a network can be run with a :class:`VirtualClock` in a
+discrete-event mode: virtual time stands still while any module is working and jumps
+to the next point in time a module is waiting for as soon as all modules are idle.
+The timing behavior of the network (e.g., the created_at and age of IUs) is the same
+as in real time, but a network that spends most of its time waiting (e.g., for the
+next frame of audio) runs much faster than real time:
+
+.. code-block:: python
+
+    virtual_clock = retico_core.clock.VirtualClock()
+    retico_core.network.run(reader, clock=virtual_clock)
+    virtual_clock.sleep(10 * 3600)  # returns once 10 hours of audio are processed
+    retico_core.network.stop(reader)
+
+In the discrete-event mode, every module runs in its own thread that takes part in
+the clock (see :meth:`Clock.start_thread`). Modules that define their own loop have to
+wait with :meth:`Clock.sleep` or :meth:`Clock.wait` instead of blocking otherwise, as
+virtual time does not advance while they are working. A producing module that reads
+a corpus should therefore pace its output with ``retico_core.clock.CLOCK.sleep``.
+"""
+
+import contextlib
+import heapq
+import itertools
+import threading
+import time as _time
+
+
+class Clock:
+    """The interface of a clock.
+
+    Attributes:
+        virtual (bool): Whether the time of the clock is independent of the system
+            time.
+    """
+
+    virtual = False
+
+    def time(self):
+        """Return the current time of the clock.
+
+        Returns:
+            float: The current time as a UNIX timestamp.
+        """
+        raise NotImplementedError()
+
+    def sleep(self, seconds):
+        """Wait for the given time.
+
+        Args:
+            seconds (float): The time to wait in seconds.
+        """
+        raise NotImplementedError()
+
+    def wait(self, inbox, timeout):
+        """Wait for the next update message to arrive in an inbox.
+
+        Args:
+            inbox (Inbox): The inbox of a module.
+            timeout (float): The maximum time in seconds to wait.
+
+        Returns:
+            (IncrementalQueue, UpdateMessage): The left buffer and the update message
+            or (None, None) if no update message arrived.
+        """
+        raise NotImplementedError()
+
+    def start_thread(self, target, name, inbox=None):
+        """Start a thread that runs the loop of a module.
+
+        Args:
+            target (function): The function that is run in the thread.
+            name (str): The name of the thread.
+            inbox (Inbox): The inbox the thread waits on with :meth:`wait`. May be
+                None.
+
+        Returns:
+            threading.Thread: The started thread.
+        """
+        t = threading.Thread(target=target, name=name)
+        t.start()
+        return t
+
+    def hold(self):
+        """Return a context manager that keeps the time of the clock from advancing
+        while it is entered (e.g., while the modules of a network are started).
+
+        Returns:
+            A context manager.
+        """
+        return contextlib.nullcontext()
+
+
+class RealClock(Clock):
+    """A clock that uses the system time."""
+
+    time = staticmethod(_time.time)
+    sleep = staticmethod(_time.sleep)
+
+    def wait(self, inbox, timeout):
+        return inbox.get(timeout=timeout)
+
+
+class _Participant:
+    """A thread that takes part in a virtual clock."""
+
+    __slots__ = ("clock", "active", "sleeping", "woken")
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.active = True
+        self.sleeping = False
+        self.woken = False
+
+    def wake(self):
+        self.clock._wake(self)
+
+
+class VirtualClock(Clock):
+    """A clock whose time only advances when all threads taking part in it are idle.
+
+    The threads started with :meth:`start_thread` take part in the clock. They are
+    idle while they :meth:`sleep` or :meth:`wait` for an update message. Once all of
+    them are idle, the time of the clock jumps to the earliest point in time a
+    thread sleeps until and that thread is woken up. Threads that do not take part in
+    the clock (e.g., the main thread) may also sleep on the clock, but the clock does
+    not wait for them while they are working.
+
+    Attributes:
+        advances (int): The number of times the time of the clock jumped forward.
+    """
+
+    virtual = True
+
+    def __init__(self, start=None):
+        """Initialize the clock.
+
+        Args:
+            start (float): The initial time of the clock as a UNIX timestamp. Defaults
+                to the current system time.
+        """
+        self._now = _time.time() if start is None else start
+        self._condition = threading.Condition()
+        self._participants = set()
+        self._sleepers = []
+        self._sequence = itertools.count()
+        self._local = threading.local()
+        self.advances = 0
+
+    def time(self):
+        return self._now
+
+    def sleep(self, seconds):
+        if seconds <= 0:
+            return
+        participant = getattr(self._local, "participant", None)
+        with self._condition:
+            wake_at = self._now + seconds
+            heapq.heappush(self._sleepers, (wake_at, next(self._sequence), participant))
+            if participant is not None:
+                participant.active = False
+                participant.sleeping = True
+            self._advance()
+            while self._now < wake_at:
+                self._condition.wait()
+            if participant is not None:
+                participant.sleeping = False
+
+    def wait(self, inbox, timeout):
+        buffer, update_message = inbox.get(block=False)
+        if buffer is not None:
+            return buffer, update_message
+        participant = getattr(self._local, "participant", None)
+        if participant is None:
+            return inbox.get(timeout=timeout)
+        with self._condition:
+            if not participant.woken:
+                participant.active = False
+                self._advance()
+                while not participant.woken:
+                    self._condition.wait()
+            participant.woken = False
+        return None, None
+
+    def start_thread(self, target, name, inbox=None):
+        participant = _Participant(self)
+        with self._condition:
+            self._participants.add(participant)
+        if inbox is not None:
+            inbox.listener = participant.wake
+
+        def run():
+            self._local.participant = participant
+            try:
+                target()
+            finally:
+                if inbox is not None and inbox.listener == participant.wake:
+                    inbox.listener = None
+                with self._condition:
+                    self._participants.discard(participant)
+                    self._advance()
+
+        return super().start_thread(run, name)
+
+    @contextlib.contextmanager
+    def hold(self):
+        participant = _Participant(self)
+        with self._condition:
+            self._participants.add(participant)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._participants.discard(participant)
+                self._advance()
+
+    def is_idle(self):
+        """Return whether all threads taking part in the clock are idle.
+
+        Returns:
+            bool: True if no thread is working.
+        """
+        with self._condition:
+            return not any(p.active for p in self._participants)
+
+    def _wake(self, participant):
+        with self._condition:
+            participant.woken = True
+            # A sleeping participant is only woken up by the time
+            if not participant.sleeping:
+                participant.active = True
+            self._condition.notify_all()
+
+    def _advance(self):
+        """Advance the time to the next sleeper if all participants are idle. The
+        caller has to hold the condition."""
+        if any(p.active for p in self._participants):
+            return
+        sleepers = self._sleepers
+        if not sleepers:
+            return
+        if sleepers[0][0] > self._now:
+            self._now = sleepers[0][0]
+            self.advances += 1
+        while sleepers and sleepers[0][0] <= self._now:
+            _, _, participant = heapq.heappop(sleepers)
+            if participant is not None:
+                participant.active = True
+        self._condition.notify_all()
+
+
+CLOCK = RealClock()
+"""The clock used by all modules. Use :func:`set_clock` to change it."""
+
+
+def set_clock(clock):
+    """Set the clock used by all modules.
+
+    Args:
+        clock (Clock): The new clock.
+
+    Returns:
+        Clock: The previous clock, so that it can be restored later.
+    """
+    global CLOCK
+    previous = CLOCK
+    CLOCK = clock
+    return previous
+
+
+def get_clock():
+    """Return the clock used by all modules.
+
+    Returns:
+        Clock: The current clock.
+    """
+    return CLOCK
@@ -7,7 +7,6 @@ a dialogue manager.
 """
 
 import retico_core
-import time
 
 
 class DialogueActIU(retico_core.IncrementalUnit):
@@ -23,6 +22,8 @@ class DialogueActIU(retico_core.IncrementalUnit):
             their actual values.
     """
 
+    __slots__ = ("act", "concepts", "confidence")
+
     @staticmethod
     def type():
         return "Dialogue Act Incremental Unit"
@@ -30,7 +31,7 @@ class DialogueActIU(retico_core.IncrementalUnit):
     def __init__(
         self,
         creator=None,
-        iuid=0,
+        iuid=None,
         previous_iu=None,
         grounded_in=None,
         payload=None,
@@ -126,7 +127,7 @@ class GenericDictIU(retico_core.IncrementalUnit):
     def type():
         return "Generic Dictionary IU"
 
-    def __init__(self, creator=None, iuid=0, previous_iu=None, grounded_in=None,
+    def __init__(self, creator=None, iuid=None, previous_iu=None, grounded_in=None,
                  payload=None, **kwargs):
         """Initialize the GenericDictIU with a payload
 
@@ -169,7 +170,7 @@ class DialogueActRecorderModule(retico_core.AbstractConsumingModule):
         self.txt_file = open(self.filename, "w")
 
     def prepare_run(self):
-        self.start_time = time.time()
+        self.start_time = retico_core.clock.CLOCK.time()
 
     def shutdown(self):
         if self.txt_file:
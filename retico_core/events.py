@@ -0,0 +1,245 @@
+"""
+Events Module
+=============
+
+This module defines the event dispatcher that delivers the events of incremental
+modules (see :meth:`event_subscribe<retico_core.abstract.AbstractModule.event_subscribe>`)
+to their callbacks.
+
+Instead of starting a new thread for every callback, the events are put into a bounded
+queue and delivered by a small pool of worker threads. If the callbacks cannot keep up
+with the events (e.g., a "*" callback of a module that processes 50 audio IUs per
+second), events are dropped instead of piling up, and counted in the
+:attr:`EventDispatcher.dropped` attribute. A warning is printed when the first event
+is dropped. The start and stop events of modules are never dropped. A dispatcher in
+inline mode calls the callbacks synchronously in the thread of the module that
+triggered the event.
+
+Per default, all modules share the dispatcher returned by
+:meth:`EventDispatcher.default`, but a dispatcher may also be given to
+:meth:`network.run<retico_core.network.run>` to be used by all modules of a network:
+
+.. code-block:: python
+
+    dispatcher = retico_core.events.EventDispatcher(workers=2, maxsize=1000)
+    retico_core.network.run(module, event_dispatcher=dispatcher)
+
+A subscription may only receive every n-th event or the events that pass a filter:
+
+.. code-block:: python
+
+    module.event_subscribe("process_iu", callback, sample=10)
+"""
+
+import queue
+import threading
+import traceback
+
+
+class EventSubscription:
+    """A callback subscribed to an event that only receives a sample of the events or
+    the events that pass a filter.
+
+    The subscription is called like the callback itself.
+
+    Attributes:
+        callback (function): The callback function.
+        sample (int): Only every n-th event is passed to the callback.
+        event_filter (function): A function that is given the module, the event name
+            and the data of the event and returns whether the event should be passed
+            to the callback. May be None.
+        skipped (int): The number of events that were not passed to the callback
+            because of sampling or filtering.
+    """
+
+    __slots__ = ("callback", "sample", "event_filter", "skipped", "_count", "_lock")
+
+    def __init__(self, callback, sample=1, event_filter=None):
+        if sample < 1:
+            raise ValueError("The sample rate has to be at least 1")
+        self.callback = callback
+        self.sample = sample
+        self.event_filter = event_filter
+        self.skipped = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def accepts(self, module, event_name, data):
+        """Return whether the event should be passed to the callback.
+
+        Args:
+            module (AbstractModule): The module that triggered the event.
+            event_name (str): The name of the event.
+            data (dict): The data of the event.
+
+        Returns:
+            bool: Whether the callback should be called.
+        """
+        if self.event_filter is not None and not self.event_filter(
+            module, event_name, data
+        ):
+            with self._lock:
+                self.skipped += 1
+            return False
+        if self.sample == 1:
+            return True
+        with self._lock:
+            self._count += 1
+            if self._count < self.sample:
+                self.skipped += 1
+                return False
+            self._count = 0
+        return True
+
+    def __call__(self, module, event_name, data):
+        self.callback(module, event_name, data)
+
+    def __eq__(self, other):
+        if isinstance(other, EventSubscription):
+            return self.callback == other.callback
+        return self.callback == other
+
+    def __hash__(self):
+        return hash(self.callback)
+
+
+class EventDispatcher:
+    """Delivers the events of modules to their callbacks on a pool of worker threads.
+
+    Attributes:
+        workers (int): The number of worker threads.
+        maxsize (int): The maximum number of events waiting to be delivered.
+        inline (bool): Whether callbacks are called in the thread of the module that
+            triggered the event instead of a worker thread.
+        dropped (int): The number of events that were dropped because the queue of
+            the dispatcher was full.
+        delivered (int): The number of events that were passed to a callback.
+    """
+
+    KEPT_EVENTS = frozenset(["start", "stop"])
+    """The names of the events that are never dropped (the EVENT_START and EVENT_STOP
+    of :class:`AbstractModule<retico_core.abstract.AbstractModule>`). They are queued
+    even if the queue of the dispatcher is full."""
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    @classmethod
+    def default(cls):
+        """Return the dispatcher that is shared by all modules that do not have a
+        dispatcher of their own.
+
+        Returns:
+            EventDispatcher: The default dispatcher.
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def __init__(self, workers=2, maxsize=1000, inline=False):
+        """Initialize the dispatcher.
+
+        The worker threads are started once the first event is dispatched.
+
+        Args:
+            workers (int): The number of worker threads.
+            maxsize (int): The maximum number of events waiting to be delivered,
+                where 0 does not restrict the number.
+            inline (bool): Whether callbacks should be called synchronously in the
+                thread of the module that triggered the event.
+        """
+        if workers < 1 and not inline:
+            raise ValueError("An event dispatcher needs at least one worker")
+        self.workers = workers
+        self.maxsize = maxsize
+        self.inline = inline
+        self.dropped = 0
+        self.delivered = 0
+        self._events = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        """Start the worker threads of the dispatcher if they are not yet running."""
+        with self._lock:
+            if self._threads or self.inline:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(
+                    target=self._worker, name="retico-events-%d" % i, daemon=True
+                )
+                self._threads.append(t)
+                t.start()
+
+    def shutdown(self):
+        """Deliver the events that are waiting and stop the worker threads."""
+        with self._lock:
+            threads = self._threads
+            self._threads = []
+        for _ in threads:
+            self._events.put(None)
+        for t in threads:
+            t.join()
+
+    def dispatch(self, callback, module, event_name, data):
+        """Deliver an event to a callback.
+
+        If the callback is an :class:`EventSubscription` that does not accept the
+        event, the event is skipped. If the queue of the dispatcher is full, the event
+        is dropped, unless it is one of the KEPT_EVENTS.
+
+        Args:
+            callback (function): The callback that should be called.
+            module (AbstractModule): The module that triggered the event.
+            event_name (str): The name of the event.
+            data (dict): The data of the event.
+        """
+        if isinstance(callback, EventSubscription) and not callback.accepts(
+            module, event_name, data
+        ):
+            return
+        if self.inline:
+            self._deliver((callback, module, event_name, data))
+            return
+        if not self._threads:
+            self.start()
+        event = (callback, module, event_name, data)
+        try:
+            self._events.put_nowait(event)
+        except queue.Full:
+            if event_name in self.KEPT_EVENTS:
+                self._put_unbounded(event)
+                return
+            with self._lock:
+                self.dropped += 1
+                first_drop = self.dropped == 1
+            if first_drop:
+                print(
+                    "Warning: the event dispatcher is full and drops events, starting "
+                    "with the event {} of the module {}.".format(event_name, module)
+                )
+
+    def _put_unbounded(self, event):
+        """Queue an event regardless of the maximum size of the queue."""
+        events = self._events
+        with events.mutex:
+            events._put(event)
+            events.unfinished_tasks += 1
+            events.not_empty.notify()
+
+    def _deliver(self, event):
+        callback, module, event_name, data = event
+        try:
+            callback(module, event_name, data)
+        except Exception:
+            traceback.print_exc()
+        with self._lock:
+            self.delivered += 1
+
+    def _worker(self):
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            self._deliver(event)
@@ -9,6 +9,13 @@ starting and stopping them based on only a single module.
 
 import pickle
 
+import retico_core.clock
+from retico_core import asynchronous
+
+_previous_clocks = {}
+"""The clocks that were replaced by the clocks given to :func:`run`, by the new clock.
+They are restored by :func:`stop`."""
+
 
 def load(filename: str):
     """Loads a network from file and returns a list of modules in that network.
@@ -76,7 +83,7 @@ def _discover_modules(module):
     return set(discovered_lb), set(discovered_rbs)
 
 
-def run(module):
+def run(module, scheduler=None, event_loop=None, event_dispatcher=None, clock=None):
     """Properly prepares and runs a network based on one module or a list of modules.
 
     The network is automatically discovered so that only one module of the network has
@@ -84,24 +91,70 @@ def run(module):
     first calls the `setup` function of each module in the network and then runs all
     modules.
 
+    Per default, every module runs in its own thread. If a scheduler is given, all
+    modules that can be scheduled are run on the worker pool of the scheduler instead.
+    Asynchronous modules are always run together on a single asyncio event loop.
+
     Args:
         module (Abstract Module or list): A module of the network or a list of multiple
             module of the network
+        scheduler (Scheduler): An optional scheduler with a shared pool of worker
+            threads that runs the modules of the network.
+        event_loop (EventLoopRunner): An optional runner whose event loop runs the
+            asynchronous modules of the network. If None, the default runner is used.
+        event_dispatcher (EventDispatcher): An optional dispatcher that delivers the
+            events of all modules of the network. If None, the modules use their own
+            dispatcher or the default dispatcher.
+        clock (Clock): An optional clock that is used by all modules (see
+            :mod:`retico_core.clock`). With a VirtualClock, the network runs in the
+            discrete-event mode. The previous clock is restored when the network is
+            stopped with :func:`stop`. If None, the current clock is kept.
+
+    Raises:
+        ValueError: If a virtual clock is combined with a scheduler or asynchronous
+            modules, whose work the clock can not wait for.
     """
     m_list, _ = discover(module)
 
+    if clock is not None:
+        if clock.virtual and (
+            scheduler is not None
+            or any(isinstance(m, asynchronous.AsyncAbstractModule) for m in m_list)
+        ):
+            raise ValueError(
+                "A virtual clock can not be used with a scheduler or asynchronous modules"
+            )
+        previous_clock = retico_core.clock.set_clock(clock)
+        if previous_clock is not clock:
+            _previous_clocks.setdefault(clock, previous_clock)
+
+    if event_dispatcher is not None:
+        for m in m_list:
+            m.event_dispatcher = event_dispatcher
+
     for m in m_list:
         m.setup()
 
-    for m in m_list:
-        m.run(run_setup=False)
+    # Modules that override run without the scheduler argument still work as long as
+    # no scheduler is given
+    run_kwargs = {}
+    if scheduler is not None:
+        run_kwargs["scheduler"] = scheduler
+
+    with retico_core.clock.CLOCK.hold():
+        for m in m_list:
+            if isinstance(m, asynchronous.AsyncAbstractModule):
+                m.run(run_setup=False, event_loop=event_loop)
+            else:
+                m.run(run_setup=False, **run_kwargs)
 
 
 def stop(module):
     """Properlystops a network based on one module or a list of modules.
 
     The network is automatically discovered so that only one module of the network has
-    to be given to this function for the whole network to be stopped.
+    to be given to this function for the whole network to be stopped. If the network
+    was run with its own clock, the clock that was used before is restored.
 
     Args:
         module (Abstract Module or list): A module of the network or a list of multiple
@@ -112,6 +165,10 @@ def stop(module):
     for m in m_list:
         m.stop()
 
+    previous_clock = _previous_clocks.pop(retico_core.clock.CLOCK, None)
+    if previous_clock is not None:
+        retico_core.clock.set_clock(previous_clock)
+
 
 def discover(module):
     """Discovers all modules and connections from a single a list of modules.
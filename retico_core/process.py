@@ -0,0 +1,258 @@
+"""
+Process Module
+==============
+
+This module allows running an incremental module in a child process, so that CPU-heavy
+modules (e.g., feature extraction or a local classifier) do not compete with the rest
+of the network for the global interpreter lock.
+
+A module is marked to run in a child process by wrapping its class in a
+:class:`ProcessModule`. The ProcessModule takes the place of the module in the network:
+it can be subscribed to and subscribe to other modules, and it is run and stopped by
+:meth:`network.run<retico_core.network.run>` and
+:meth:`network.stop<retico_core.network.stop>` like any other module. The actual module
+is instantiated in the child process with the given arguments.
+
+.. code-block:: python
+
+    classifier = retico_core.process.ProcessModule(
+        MyClassifierModule, module_args={"model": "small"}
+    )
+    asr.subscribe(classifier)
+    classifier.subscribe(dm)
+
+The update messages are exchanged with the child process through
+:class:`ProcessIncrementalQueue` s. IUs are pickled when they cross the process
+boundary, so the creator of an IU is only available by name on the other side (see
+:meth:`IncrementalUnit.__getstate__<retico_core.abstract.IncrementalUnit.__getstate__>`).
+Only the IUs themselves are sent, not their history: the previous_iu of an IU is
+dropped and its grounded_in is replaced by a stub with the iuid and creator of the
+grounding IU (see :func:`dumps_detached<retico_core.abstract.dumps_detached>`).
+IUs produced in the child process get the ProcessModule as their creator once they
+arrive in the parent process.
+
+If the trace mode (see :mod:`retico_core.tracing`) is enabled when the ProcessModule is
+run, it is enabled in the child process as well. The stubs keep the trace stamps of
+the grounding IUs, so :func:`breakdown<retico_core.tracing.breakdown>` includes the hop
+through the child process, but ends at the stub.
+
+Because the child process is started with the "spawn" method per default, the module
+class has to be importable and the script that runs the network has to be guarded by
+``if __name__ == "__main__":``.
+"""
+
+import multiprocessing
+import pickle
+import queue
+import threading
+
+from retico_core import abstract, tracing
+
+
+class ProcessIncrementalQueue(abstract.IncrementalQueue):
+    """An incremental queue that transfers update messages to another process.
+
+    Instead of being stored in the queue itself, the update messages are sent through a
+    multiprocessing queue (the channel) and can be retrieved with get in the process on
+    the other end of the channel. The update messages are pickled with
+    :func:`dumps_detached<retico_core.abstract.dumps_detached>` in the thread that puts
+    them into the queue, so that the size of every message is independent of the
+    history of the IUs it contains.
+
+    Attributes:
+        channel (multiprocessing.Queue): The multiprocessing queue the update messages
+            are sent through.
+    """
+
+    def __init__(self, provider, consumer, channel, maxsize=0):
+        super().__init__(provider, consumer, maxsize=maxsize)
+        self.channel = channel
+
+    def put(self, item, block=True, timeout=None):
+        self.channel.put(abstract.dumps_detached(item), block=block, timeout=timeout)
+
+    def get(self, block=True, timeout=None):
+        return pickle.loads(self.channel.get(block=block, timeout=timeout))
+
+    def empty(self):
+        return self.channel.empty()
+
+    def qsize(self):
+        return self.channel.qsize()
+
+
+class _ProcessInbox(abstract.Inbox):
+    """The inbox of a ProcessModule that forwards every update message arriving in one
+    of its left buffers to the child process."""
+
+    def __init__(self, to_child):
+        super().__init__()
+        self._to_child = to_child
+
+    def put(self, buffer, update_message):
+        try:
+            update_message = buffer.get_nowait()
+        except queue.Empty:
+            return
+        self._to_child.put(update_message)
+
+    def wakeup(self):
+        pass
+
+
+def _run_child(module_class, module_args, to_child, from_child, trace=False):
+    """The entry point of the child process that runs the wrapped module.
+
+    Update messages received from the parent process are put into a left buffer of the
+    module and everything the module appends to its right buffer is sent back to the
+    parent process. A None received from the parent stops the module. If trace is set,
+    the trace mode is enabled in the child process.
+    """
+    if trace:
+        tracing.enable()
+    module = module_class(**module_args)
+    receiver = ProcessIncrementalQueue(None, module, to_child)
+    sender = ProcessIncrementalQueue(module, None, from_child)
+    left_buffer = abstract.IncrementalQueue(None, module)
+    module.add_left_buffer(left_buffer)
+    module.add_right_buffer(sender)
+    module.setup()
+    t = threading.Thread(target=module._run)
+    t.start()
+    while True:
+        update_message = receiver.get()
+        if update_message is None:
+            break
+        left_buffer.put(update_message)
+    module.stop(clear_buffer=False)
+    t.join()
+    sender.put(None)
+
+
+class ProcessModule(abstract.AbstractModule):
+    """A module that runs another module in a child process.
+
+    The name, description, input IUs and output IU are taken from the class of the
+    wrapped module, so they have to be available without an instance of the module.
+
+    Only copies of the IUs reach the child process. The IUs of the parent process are
+    therefore never marked as processed, so their is_processed_by reports neither the
+    ProcessModule nor the wrapped module. The events of the wrapped module are only
+    delivered in the child process.
+
+    Attributes:
+        module_class (class): The class of the module that runs in the child process.
+        module_args (dict): The keyword arguments the module is instantiated with.
+    """
+
+    def name(self):
+        return self.module_class.name()
+
+    def description(self):
+        return self.module_class.description()
+
+    def input_ius(self):
+        return self.module_class.input_ius()
+
+    def output_iu(self):
+        return self.module_class.output_iu()
+
+    def __init__(self, module_class, module_args=None, start_method="spawn", **kwargs):
+        """Initialize the ProcessModule.
+
+        Args:
+            module_class (class): The class of the module to run in a child process.
+            module_args (dict): The keyword arguments to instantiate the module with.
+            start_method (str): The multiprocessing start method of the child process.
+        """
+        super().__init__(**kwargs)
+        self.module_class = module_class
+        self.module_args = module_args if module_args else {}
+        self._context = multiprocessing.get_context(start_method)
+        self._to_child = ProcessIncrementalQueue(self, None, self._context.Queue())
+        self._from_child = ProcessIncrementalQueue(None, self, self._context.Queue())
+        self._inbox = _ProcessInbox(self._to_child)
+        self._process = None
+        self._relay_thread = None
+
+    def is_schedulable(self):
+        return False
+
+    def process_update(self, update_message):
+        # Update messages are forwarded to the child process by the inbox.
+        return None
+
+    def _relay(self):
+        """Append the update messages produced in the child process to the right
+        buffers of this module."""
+        while True:
+            try:
+                update_message = self._from_child.get(timeout=self.WAKEUP_TIMEOUT)
+            except queue.Empty:
+                if self._process.is_alive():
+                    continue
+                break
+            if update_message is None:
+                break
+            for iu in update_message.incremental_units():
+                child_id = iu.creator_id
+                iu.creator = self
+                iu.creator_id = self.id
+                self._previous_iu = iu
+                # The stub was received by the wrapped module, which is known as the
+                # ProcessModule in this process
+                received_at = getattr(iu.grounded_in, "received_at", None)
+                if received_at and child_id in received_at:
+                    received_at.setdefault(self.id, received_at.pop(child_id))
+            self.append(update_message)
+        self._process.join()
+
+    def run(self, run_setup=True, scheduler=None):
+        """Start the child process running the wrapped module.
+
+        Args:
+            run_setup (bool): Whether or not the setup method should be executed
+                before the process is started. The setup method of the wrapped module
+                is always executed in the child process.
+            scheduler (Scheduler): Ignored, as the module runs in its own process.
+        """
+        if run_setup:
+            self.setup()
+        for q in self.right_buffers():
+            q.clear()
+        self._process = self._context.Process(
+            target=_run_child,
+            args=(
+                self.module_class,
+                self.module_args,
+                self._to_child.channel,
+                self._from_child.channel,
+                tracing.is_enabled(),
+            ),
+            daemon=True,
+        )
+        self._process.start()
+        self._is_running = True
+        self._relay_thread = threading.Thread(target=self._relay)
+        self._relay_thread.start()
+        self.event_call(self.EVENT_START)
+
+    def stop(self, clear_buffer=True):
+        """Stop the wrapped module and its child process.
+
+        Update messages that were already sent to the child process are processed
+        before it stops.
+        """
+        if self._is_running:
+            self._to_child.put(None)
+        super().stop(clear_buffer=clear_buffer)
+
+    def join(self, timeout=None):
+        """Wait until the child process has stopped and all its update messages were
+        appended to the right buffers.
+
+        Args:
+            timeout (float): The maximum time in seconds to wait.
+        """
+        if self._relay_thread is not None:
+            self._relay_thread.join(timeout)
@@ -21,7 +21,7 @@ class RobotStateIU(abstract.IncrementalUnit):
     def type():
         return "Robot State IU"
 
-    def __init__(self, creator=None, iuid=0, previous_iu=None, grounded_in=None, state=None,
+    def __init__(self, creator=None, iuid=None, previous_iu=None, grounded_in=None, state=None,
                  **kwargs):
         super().__init__(creator=creator, iuid=iuid, previous_iu=previous_iu,
                          grounded_in=grounded_in, payload=state)
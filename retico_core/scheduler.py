@@ -0,0 +1,171 @@
+"""
+Scheduler Module
+================
+
+A scheduler that runs incremental modules on a fixed-size pool of worker threads
+instead of running every module in its own thread.
+
+A module that is added to the scheduler is activated whenever an update message
+arrives in its inbox. An activation processes the waiting update messages of the
+module on one of the worker threads. A module is never activated more than once at
+the same time, so the update messages of each module are still processed in the
+order in which they arrived.
+
+Modules that define their own processing loop (e.g., producing modules) cannot be
+activated this way and keep running in their own thread. A scheduler is used by
+passing it to :meth:`network.run<retico_core.network.run>`:
+
+.. code-block:: python
+
+    scheduler = retico_core.scheduler.Scheduler(workers=4)
+    retico_core.network.run(module, scheduler=scheduler)
+"""
+
+import queue
+import threading
+import traceback
+
+
+class _ModuleState:
+    """The scheduling state of a module."""
+
+    __slots__ = ("active", "pending")
+
+    def __init__(self):
+        self.active = False
+        """Whether the module is queued for or currently in an activation."""
+        self.pending = False
+        """Whether the module was notified during an activation."""
+
+
+class Scheduler:
+    """A scheduler that activates modules on a shared pool of worker threads.
+
+    Attributes:
+        workers (int): The number of worker threads.
+        batch_size (int): The maximum number of update messages a module processes
+            in one activation before other modules get their turn.
+    """
+
+    def __init__(self, workers=4, batch_size=16):
+        """Initialize the scheduler.
+
+        The worker threads are started once the first module is added.
+
+        Args:
+            workers (int): The number of worker threads.
+            batch_size (int): The maximum number of update messages a module
+                processes in one activation.
+        """
+        if workers < 1:
+            raise ValueError("A scheduler needs at least one worker")
+        self.workers = workers
+        self.batch_size = batch_size
+        self._ready = queue.SimpleQueue()
+        self._states = {}
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        """Start the worker threads of the scheduler if they are not yet running."""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(
+                    target=self._worker, name="retico-worker-%d" % i, daemon=True
+                )
+                self._threads.append(t)
+                t.start()
+
+    def shutdown(self):
+        """Stop the worker threads of the scheduler.
+
+        Modules that are still added to the scheduler are not activated anymore and
+        should be stopped beforehand.
+        """
+        with self._lock:
+            threads = self._threads
+            self._threads = []
+        for _ in threads:
+            self._ready.put(None)
+        for t in threads:
+            t.join()
+
+    def add(self, module):
+        """Add a module to the scheduler and start processing its update messages.
+
+        This is called by the :meth:`run<retico_core.abstract.AbstractModule.run>`
+        method of the module when a scheduler is given. The module is removed from
+        the scheduler once it is stopped.
+
+        Args:
+            module (AbstractModule): The module to run.
+        """
+        if not module.is_schedulable():
+            raise ValueError("The module %s can not be scheduled" % module.name())
+        self.start()
+        module.prepare_run()
+        module._is_running = True
+        with self._lock:
+            self._states[module] = _ModuleState()
+        module._inbox.listener = lambda: self.schedule(module)
+        self.schedule(module)
+
+    def modules(self):
+        """Return the modules that are currently run by the scheduler.
+
+        Returns:
+            list: A list of modules.
+        """
+        with self._lock:
+            return list(self._states)
+
+    def schedule(self, module):
+        """Mark a module as ready to be activated.
+
+        If the module is already waiting for or in an activation, it will be
+        activated again afterwards instead.
+
+        Args:
+            module (AbstractModule): The module that should be activated.
+        """
+        with self._lock:
+            state = self._states.get(module)
+            if state is None:
+                return
+            if state.active:
+                state.pending = True
+                return
+            state.active = True
+        self._ready.put(module)
+
+    def _worker(self):
+        while True:
+            module = self._ready.get()
+            if module is None:
+                return
+            self._activate(module)
+
+    def _activate(self, module):
+        try:
+            module._process_pending(self.batch_size)
+        except Exception:
+            # Like an exception in the thread of a module, an exception stops the
+            # module, but it must not take down the worker thread.
+            traceback.print_exc()
+            module._is_running = False
+        with self._lock:
+            state = self._states[module]
+            stopped = not module._is_running
+            if stopped:
+                del self._states[module]
+            elif state.pending or not module._inbox.empty():
+                state.pending = False
+                self._ready.put(module)
+                return
+            else:
+                state.active = False
+        if stopped:
+            module._inbox.listener = None
+            module.shutdown()
@@ -0,0 +1,211 @@
+"""
+Stats Module
+============
+
+This module defines the statistics that every incremental module records about the
+update messages it processes, without any additional code in the module:
+
+- the time each update message waited in the left buffer of the module,
+- the time it took the module to process the update message,
+- the number of update messages and IUs processed (and per second), and
+- the number of IUs that were ignored because the module cannot process them.
+
+The times are recorded in :class:`Histogram` s with fixed buckets, so that recording a
+value takes constant time and memory. The statistics of a module can be retrieved with
+:meth:`AbstractModule.stats<retico_core.abstract.AbstractModule.stats>`:
+
+.. code-block:: python
+
+    stats = asr.stats()
+    print(stats["process_time"]["p95"], stats["queue_wait"]["p99"])
+"""
+
+import bisect
+
+DEFAULT_BUCKETS = (
+    0.00001,
+    0.00002,
+    0.00005,
+    0.0001,
+    0.0002,
+    0.0005,
+    0.001,
+    0.002,
+    0.005,
+    0.01,
+    0.02,
+    0.05,
+    0.1,
+    0.2,
+    0.5,
+    1.0,
+    2.0,
+    5.0,
+    10.0,
+)
+"""The default upper bounds (in seconds) of the buckets of a histogram."""
+
+
+class Histogram:
+    """A histogram with fixed buckets.
+
+    A value is counted in the first bucket whose upper bound is greater or equal to the
+    value. Values greater than the last bound are counted in an overflow bucket.
+    Percentiles are approximated by the upper bound of the bucket they fall into.
+
+    Attributes:
+        bounds (tuple): The upper bounds of the buckets in ascending order.
+        counts (list): The number of values in each bucket. The last element counts
+            the values greater than the last bound.
+        count (int): The number of recorded values.
+        total (float): The sum of all recorded values.
+        max (float): The greatest recorded value.
+    """
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        """Record a value.
+
+        Args:
+            value (float): The value to record.
+        """
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def mean(self):
+        """Return the mean of all recorded values.
+
+        Returns:
+            float: The mean or 0.0 if no value was recorded.
+        """
+        if not self.count:
+            return 0.0
+        return self.total / self.count
+
+    def percentile(self, p):
+        """Return an approximation of the given percentile of the recorded values.
+
+        Args:
+            p (float): The percentile between 0 and 100.
+
+        Returns:
+            float: The upper bound of the bucket the percentile falls into, the
+            greatest recorded value if it falls into the overflow bucket, or 0.0 if
+            no value was recorded.
+        """
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank and cumulative > 0:
+                if i < len(self.bounds):
+                    return min(self.bounds[i], self.max)
+                return self.max
+        return self.max
+
+    def summary(self):
+        """Return a summary of the histogram.
+
+        Returns:
+            dict: The count, mean, p50, p95, p99 and max of the recorded values.
+        """
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class ModuleStats:
+    """The statistics of an incremental module.
+
+    Attributes:
+        queue_wait (Histogram): The time in seconds the update messages waited in the
+            left buffers before they were processed.
+        process_time (Histogram): The time in seconds the processing of an update
+            message (or a batch of update messages) took.
+        messages (int): The number of processed update messages.
+        ius (int): The number of processed IUs.
+        invalid_ius (int): The number of IUs that were ignored because the module
+            can not process their type.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Reset all statistics."""
+        self.queue_wait = Histogram()
+        self.process_time = Histogram()
+        self.messages = 0
+        self.ius = 0
+        self.invalid_ius = 0
+        self._first = None
+        self._last = None
+
+    def record(self, update_messages, start, end, put_times=()):
+        """Record the processing of update messages.
+
+        Args:
+            update_messages (list): The update messages that were processed.
+            start (float): The time (of time.perf_counter) the processing started.
+            end (float): The time (of time.perf_counter) the processing ended.
+            put_times (list): The times (of time.perf_counter) the update messages
+                were put into the left buffer, as stored by the buffer. Unknown times
+                may be None.
+        """
+        for put_at in put_times:
+            if put_at is not None:
+                self.queue_wait.record(max(start - put_at, 0.0))
+        for update_message in update_messages:
+            self.ius += len(update_message)
+        self.messages += len(update_messages)
+        self.process_time.record(end - start)
+        if self._first is None:
+            self._first = start
+        self._last = end
+
+    def record_invalid(self, update_message):
+        """Record an update message that was ignored because of invalid IUs.
+
+        Args:
+            update_message (UpdateMessage): The ignored update message.
+        """
+        self.invalid_ius += len(update_message)
+
+    def summary(self):
+        """Return a summary of the statistics.
+
+        The rates are calculated over the time from the start of the first to the end
+        of the last processed update message.
+
+        Returns:
+            dict: The statistics as a dictionary.
+        """
+        elapsed = 0.0
+        if self._first is not None:
+            elapsed = self._last - self._first
+        return {
+            "messages": self.messages,
+            "ius": self.ius,
+            "invalid_ius": self.invalid_ius,
+            "messages_per_second": self.messages / elapsed if elapsed > 0 else 0.0,
+            "ius_per_second": self.ius / elapsed if elapsed > 0 else 0.0,
+            "queue_wait": self.queue_wait.summary(),
+            "process_time": self.process_time.summary(),
+        }
+
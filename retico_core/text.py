@@ -64,6 +64,8 @@ def get_text_increment(module, new_text):
 class TextIU(retico_core.IncrementalUnit):
     """An IU that contains text."""
 
+    __slots__ = ()
+
     @staticmethod
     def type():
         return "Text IU"
@@ -110,7 +112,7 @@ class SpeechRecognitionIU(TextIU):
         return "Speech Recgonition IU"
 
     def __init__(
-        self, creator, iuid=0, previous_iu=None, grounded_in=None, payload=None
+        self, creator, iuid=None, previous_iu=None, grounded_in=None, payload=None
     ):
         super().__init__(
             creator,
@@ -0,0 +1,323 @@
+"""
+Tracing Module
+==============
+
+This module provides an opt-in trace mode that records the latency of every stage of a
+network along the grounded_in chains of the incremental units.
+
+While tracing is enabled, every IU is stamped with the time it was emitted (i.e.,
+appended to the right buffers of its creator) and with the time it was taken out of
+the left buffer of every module that processes it. Given the final IU of a chain (e.g.,
+a DispatchedAudioIU), :func:`breakdown` follows the grounded_in links back to the
+original IU (e.g., the AudioIU of the MicrophoneModule) and returns the time each hop
+took:
+
+.. code-block:: python
+
+    retico_core.tracing.enable()
+    retico_core.network.run(mic)
+    ...
+    for hop in retico_core.tracing.breakdown(dispatched_iu, until=audio.AudioIU):
+        print(hop["module"], hop["queue_wait"], hop["processing"])
+
+All times are UNIX timestamps like the created_at attribute of the IUs. IUs that were
+created or processed while tracing was disabled have no stamps and their times in the
+breakdown are None.
+
+To see the concurrency behavior of a running network, a :class:`TraceRecorder` records
+every call of process_update, every put into and get from an incremental queue and
+every tick of an AudioDispatcherModule and saves them in the Chrome trace format. The
+file can be opened in a trace viewer (e.g., https://ui.perfetto.dev or
+chrome://tracing), which shows one track per thread:
+
+.. code-block:: python
+
+    with retico_core.tracing.TraceRecorder() as recorder:
+        retico_core.network.run(mic)
+        time.sleep(60)
+        retico_core.network.stop(mic)
+    recorder.save("session.json")
+"""
+
+import json
+import os
+import threading
+import time
+
+from retico_core import clock
+
+ENABLED = False
+"""Whether the trace mode is enabled. Use :func:`enable` and :func:`disable` to change
+it."""
+
+RECORDER = None
+"""The :class:`TraceRecorder` that is currently recording or None."""
+
+
+def enable():
+    """Enable the trace mode for all modules."""
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    """Disable the trace mode for all modules."""
+    global ENABLED
+    ENABLED = False
+
+
+def is_enabled():
+    """Return whether the trace mode is enabled.
+
+    Returns:
+        bool: True if IUs are stamped.
+    """
+    return ENABLED
+
+
+def stamp_emitted(update_message, timestamp=None):
+    """Stamp the IUs of an update message with the time they were emitted.
+
+    IUs that were already emitted (e.g., an IU that is committed after it was added)
+    keep their first stamp.
+
+    Args:
+        update_message (UpdateMessage): The update message that is appended to the
+            right buffers of a module.
+        timestamp (float): The time of the emission. Defaults to the current time.
+    """
+    if timestamp is None:
+        timestamp = clock.CLOCK.time()
+    for iu in update_message.incremental_units():
+        if iu.emitted_at is None:
+            iu.emitted_at = timestamp
+            if iu.received_at is None:
+                iu.received_at = {}
+
+
+def stamp_received(update_message, module, timestamp=None):
+    """Stamp the IUs of an update message with the time they were taken out of the
+    left buffer of a module.
+
+    Args:
+        update_message (UpdateMessage): The update message that is processed.
+        module (AbstractModule): The module that processes the update message.
+        timestamp (float): The time the update message was taken out of the left
+            buffer. Defaults to the current time.
+    """
+    if timestamp is None:
+        timestamp = clock.CLOCK.time()
+    for iu in update_message.incremental_units():
+        received_at = iu.received_at
+        if received_at is None:
+            received_at = iu.received_at = {}
+        received_at.setdefault(module.id, timestamp)
+
+
+def _difference(end, start):
+    if end is None or start is None:
+        return None
+    return end - start
+
+
+def breakdown(iu, until=None):
+    """Return the latency of every hop of the grounded_in chain of an IU.
+
+    The chain is followed from the given IU back to the first IU it is grounded in, or
+    to the first IU of the type given in until. The hops are returned in the order of
+    processing, starting with the origin of the chain. Each hop is a dictionary with:
+
+    - "module": the name of the module that created the IU of the hop,
+    - "iu": the IU created in the hop,
+    - "received_at": the time the module took the IU the hop is based on out of its
+      left buffer (None for the origin),
+    - "emitted_at": the time the IU of the hop was emitted,
+    - "queue_wait": the time the IU the hop is based on waited in the left buffer of
+      the module (None for the origin),
+    - "processing": the time between taking the input out of the left buffer and
+      emitting the IU of the hop (for the origin the time between creating and
+      emitting the IU), and
+    - "latency": the time between the emission of the input and the emission of the
+      IU of the hop, i.e., the sum of "queue_wait" and "processing".
+
+    Args:
+        iu (IncrementalUnit): The final IU of the chain.
+        until (class): The class of the IU at which the chain should end. If None, the
+            chain is followed to its first IU.
+
+    Returns:
+        list: A list of dictionaries with the times of the hops.
+    """
+    chain = [iu]
+    while chain[-1].grounded_in is not None:
+        if until is not None and isinstance(chain[-1], until):
+            break
+        chain.append(chain[-1].grounded_in)
+    chain.reverse()
+
+    origin = chain[0]
+    hops = [
+        {
+            "module": origin.creator.name(),
+            "iu": origin,
+            "received_at": None,
+            "emitted_at": origin.emitted_at,
+            "queue_wait": None,
+            "processing": _difference(origin.emitted_at, origin.created_at),
+            "latency": _difference(origin.emitted_at, origin.created_at),
+        }
+    ]
+    for source, current in zip(chain, chain[1:]):
+        received_at = None
+        if source.received_at is not None:
+            received_at = source.received_at.get(current.creator_id)
+        hops.append(
+            {
+                "module": current.creator.name(),
+                "iu": current,
+                "received_at": received_at,
+                "emitted_at": current.emitted_at,
+                "queue_wait": _difference(received_at, source.emitted_at),
+                "processing": _difference(current.emitted_at, received_at),
+                "latency": _difference(current.emitted_at, source.emitted_at),
+            }
+        )
+    return hops
+
+
+def end_to_end(iu, until=None):
+    """Return the time between the creation of the origin of the grounded_in chain of
+    an IU and the emission of the IU.
+
+    Args:
+        iu (IncrementalUnit): The final IU of the chain.
+        until (class): The class of the IU at which the chain should end. If None, the
+            chain is followed to its first IU.
+
+    Returns:
+        float: The latency in seconds or None if the IU was not emitted while tracing
+        was enabled.
+    """
+    origin = breakdown(iu, until)[0]["iu"]
+    return _difference(iu.emitted_at, origin.created_at)
+
+
+class TraceRecorder:
+    """Records the activity of all modules as events in the Chrome trace format.
+
+    While the recorder is started, the modules record spans for their process_update
+    calls, instant events for update messages put into and taken out of incremental
+    queues and spans for the ticks of AudioDispatcherModules. The events are kept in
+    memory until they are saved with :meth:`save`.
+
+    The recorder can be used as a context manager that starts and stops it.
+
+    Attributes:
+        events (list): The recorded trace events.
+    """
+
+    def __init__(self):
+        self.events = []
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._thread_names = {}
+
+    def start(self):
+        """Start recording. Only one recorder can record at a time."""
+        global RECORDER
+        self._origin = time.perf_counter()
+        RECORDER = self
+
+    def stop(self):
+        """Stop recording."""
+        global RECORDER
+        if RECORDER is self:
+            RECORDER = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _thread_id(self):
+        tid = threading.get_ident()
+        if tid not in self._thread_names:
+            self._thread_names[tid] = threading.current_thread().name
+        return tid
+
+    def _timestamp(self, perf_time):
+        return (perf_time - self._origin) * 1000000
+
+    def span(self, name, category, start, end, args=None):
+        """Record a span in the track of the current thread.
+
+        Args:
+            name (str): The name of the span (e.g., the name of the module).
+            category (str): The category of the span (e.g., "process_update").
+            start (float): The start of the span as a time.perf_counter value.
+            end (float): The end of the span as a time.perf_counter value.
+            args (dict): Additional data shown with the span.
+        """
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": self._timestamp(start),
+            "dur": (end - start) * 1000000,
+            "pid": self._pid,
+            "tid": self._thread_id(),
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def instant(self, name, category, args=None):
+        """Record an instant event in the track of the current thread.
+
+        Args:
+            name (str): The name of the event.
+            category (str): The category of the event (e.g., "queue").
+            args (dict): Additional data shown with the event.
+        """
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "i",
+            "s": "t",
+            "ts": self._timestamp(time.perf_counter()),
+            "pid": self._pid,
+            "tid": self._thread_id(),
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def trace(self):
+        """Return the recorded events together with the names of the threads in the
+        Chrome trace format.
+
+        Returns:
+            dict: The trace that can be serialized as JSON.
+        """
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": self._pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in list(self._thread_names.items())
+        ]
+        return {"traceEvents": metadata + list(self.events), "displayTimeUnit": "ms"}
+
+    def save(self, filename):
+        """Save the recorded events as a Chrome trace JSON file.
+
+        Args:
+            filename (str): The path of the file.
+        """
+        with open(filename, "w") as f:
+            json.dump(self.trace(), f, default=str)
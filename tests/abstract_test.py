@@ -1,3 +1,4 @@
+import threading
 import unittest
 from retico_core.core import abstract
 from mock_classes import MockAbstract
@@ -60,6 +61,8 @@ class TestAbstractModule(unittest.TestCase):
     def test_iu_remove_old_links(self):
         #Arrange
         mock_IU = MockIncrementalUnit()
+        mock_IU.previous_iu._previous_depth = 0
+        mock_IU.grounded_in._grounded_depth = 0
 
         #Act
         abstract.IncrementalUnit._remove_old_links(mock_IU)
@@ -68,17 +71,17 @@ class TestAbstractModule(unittest.TestCase):
         self.assertEqual(mock_IU.grounded_in.grounded_in, None)
         self.assertEqual(mock_IU.previous_iu.previous_iu, None)
 
-    @patch('time.time')
-    def test_iu_age(self, mock_time):
+    @patch.object(abstract.clock, 'CLOCK')
+    def test_iu_age(self, mock_clock):
         #Arrange
-        mock_time.return_value = 50
+        mock_clock.time.return_value = 50
         mock_IU = MockIncrementalUnit()
 
         #Act
         result = abstract.IncrementalUnit.age(mock_IU)
 
         #Assert
-        self.assertEqual(result, mock_time.return_value - mock_IU.created_at)
+        self.assertEqual(result, mock_clock.time.return_value - mock_IU.created_at)
     
     @patch('retico_core.core.abstract.IncrementalUnit._remove_old_links')
     @patch('retico_core.core.abstract.IncrementalUnit.age')
@@ -108,12 +111,17 @@ class TestAbstractModule(unittest.TestCase):
     def test_iu_processed_list(self):
         #Arrange
         mock_IU = MockIncrementalUnit()
+        mock_modules = [MockAbstract(), MockAbstract()]
+        for mock_abstract in mock_modules:
+            mock_abstract._module_index = None
+            mock_IU._processed |= 1 << abstract.MODULE_INDEX.register(mock_abstract)
+        mock_IU._processed_epoch = abstract.MODULE_INDEX.epoch
 
         #Act
         result = abstract.IncrementalUnit.processed_list(mock_IU)
 
         #Assert
-        self.assertEqual(result, list(mock_IU._processed_list))
+        self.assertEqual(result, mock_modules)
 
     def test_iu_set_processed_fail(self):
         #Arrange
@@ -127,25 +135,32 @@ class TestAbstractModule(unittest.TestCase):
         #Arrange
         mock_IU = MockIncrementalUnit()
         mock_abstract = MockAbstract()
-        expected = mock_IU._processed_list
-        expected.append(mock_abstract)
+        mock_abstract._module_index = None
 
         #Act
         abstract.IncrementalUnit.set_processed(mock_IU, mock_abstract)
 
         #Assert
-        self.assertEqual(mock_IU._processed_list, expected)
+        self.assertEqual(abstract.IncrementalUnit.processed_list(mock_IU), [mock_abstract])
 
     def test_iu_is_processed_by(self):
         #Arrange
         mock_IU = MockIncrementalUnit()
+        mock_processed = MockAbstract()
+        mock_processed._module_index = None
+        mock_other = MockAbstract()
+        mock_other._module_index = None
+        mock_IU._processed = 1 << abstract.MODULE_INDEX.register(mock_processed)
+        mock_IU._processed_epoch = abstract.MODULE_INDEX.epoch
 
         #Act
-        result_false = abstract.IncrementalUnit.is_processed_by(mock_IU, 41)
-        result_true= abstract.IncrementalUnit.is_processed_by(mock_IU, 4)
+        result_false = abstract.IncrementalUnit.is_processed_by(mock_IU, mock_other)
+        result_not_module = abstract.IncrementalUnit.is_processed_by(mock_IU, 4)
+        result_true = abstract.IncrementalUnit.is_processed_by(mock_IU, mock_processed)
 
         #Assert
         self.assertEqual(result_false, False)
+        self.assertEqual(result_not_module, False)
         self.assertEqual(result_true, True)
     
     def test_iu__repr__(self):
@@ -171,85 +186,84 @@ class TestAbstractModule(unittest.TestCase):
 
     def test_update_init(self):
         #Arrange
-        expected_msgs = []
-        expected_counter = -1
+        expected_pairs = []
+        expected_frozen = False
         #Act
         result = abstract.UpdateMessage()
 
         #Assert
-        self.assertEqual(result._msgs, expected_msgs)
-        self.assertEqual(result._counter, expected_counter)
+        self.assertEqual(list(result), expected_pairs)
+        self.assertEqual(result.is_frozen(), expected_frozen)
 
     def test_update_len(self):
         #Arrange
-        mock_update = MockUpdateMessage()
+        mock_update = abstract.UpdateMessage.from_ius([MockIncrementalUnit()] * 4)
 
         #Act
         result = abstract.UpdateMessage.__len__(mock_update)
 
         #Assert
-        self.assertEqual(result, len(mock_update._msgs))
+        self.assertEqual(result, 4)
 
-    @patch('retico_core.core.abstract.UpdateMessage.add_iu')
-    def test_update_from_iu(self, mock_add):
+    def test_update_from_iu(self):
         #Arrange
         mock_IU = MockIncrementalUnit()
-        mock_add.return_value = True
-        expected_msgs = []
-        expected_counter = -1
+        expected_pairs = [(mock_IU, abstract.UpdateType.ADD)]
+        expected_frozen = False
 
         #Act
-        result = abstract.UpdateMessage.from_iu(mock_IU, "mock_type")
+        result = abstract.UpdateMessage.from_iu(mock_IU, "add")
 
         #Assert
-        self.assertEqual(result._msgs, expected_msgs)
-        self.assertEqual(result._counter, expected_counter)
+        self.assertEqual(list(result), expected_pairs)
+        self.assertEqual(result.is_frozen(), expected_frozen)
 
-    @patch('retico_core.core.abstract.UpdateMessage.add_ius')
-    def test_update_from_iu_list(self, mock_add):
+    def test_update_from_iu_list(self):
         #Arrange
         mock_IU = MockIncrementalUnit()
-        mock_add.return_value = True
-        expected_msgs = []
-        expected_counter = -1
+        expected_pairs = [(mock_IU, abstract.UpdateType.ADD), (mock_IU, abstract.UpdateType.REVOKE)]
+        expected_frozen = False
 
         #Act
-        result = abstract.UpdateMessage.from_iu_list(mock_IU, "mock_type")
+        result = abstract.UpdateMessage.from_iu_list([(mock_IU, "add"), (mock_IU, "revoke")])
 
         #Assert
-        self.assertEqual(result._msgs, expected_msgs)
-        self.assertEqual(result._counter, expected_counter)
+        self.assertEqual(list(result), expected_pairs)
+        self.assertEqual(result.is_frozen(), expected_frozen)
 
     def test_update_iter_(self):
         #Arrange
-        mock_update = MockUpdateMessage()
+        mock_IUs = [MockIncrementalUnit(), MockIncrementalUnit()]
+        mock_update = abstract.UpdateMessage.from_ius(mock_IUs)
 
         #Act
         result = abstract.UpdateMessage.__iter__(mock_update)
 
         #Assert
-        self.assertEqual(result, mock_update)
+        self.assertEqual(list(result), [(iu, abstract.UpdateType.ADD) for iu in mock_IUs])
 
-    def test_update_next_raise_error(self):
+    def test_update_iter_independent(self):
         #Arrange
-        mock_update = MockUpdateMessage()
-        mock_update._counter = 1
-        mock_update._msgs = [1, 2]
+        mock_IUs = [MockIncrementalUnit(), MockIncrementalUnit()]
+        mock_update = abstract.UpdateMessage.from_ius(mock_IUs)
 
         #Act
+        first = abstract.UpdateMessage.__iter__(mock_update)
+        second = abstract.UpdateMessage.__iter__(mock_update)
+        next(first)
+
         #Assert
-        self.assertRaises(StopIteration, abstract.UpdateMessage.__next__, mock_update)
-    
-    def test_update_next_success(self):
+        self.assertEqual(next(second), list(mock_update)[0])
+        self.assertEqual(next(first), list(mock_update)[1])
+
+    def test_update_add_iu_frozen(self):
         #Arrange
-        mock_update = MockUpdateMessage()
-        expected_result = mock_update._msgs[(mock_update._counter + 1)]
+        update = abstract.UpdateMessage()
+        update.freeze()
 
         #Act
-        result = abstract.UpdateMessage.__next__(mock_update)
-
         #Assert
-        self.assertEqual(result, expected_result)
+        self.assertRaises(ValueError, update.add_iu, MockIncrementalUnit(), "add")
 
     def test_update_add_iu_fail(self):
         #Arrange
@@ -261,28 +275,29 @@ class TestAbstractModule(unittest.TestCase):
     
     def test_update_add_iu_strict(self):
         #Arrange
-        mock_update = MockUpdateMessage()
         mock_IU = MockIncrementalUnit()
-        expected_result = [1,2,3,4]
+        mock_update = abstract.UpdateMessage.from_iu(mock_IU, "commit")
+        expected_result = list(mock_update)
         expected_result.append((mock_IU, abstract.UpdateType("add")))
 
         #Act
         abstract.UpdateMessage.add_iu(mock_update, mock_IU, "add")
 
         #Assert
-        self.assertEqual(mock_update._msgs, expected_result)
+        self.assertEqual(list(mock_update), expected_result)
     
     def test_update_add_iu_not_strict(self):
         #Arrange
-        mock_update = MockUpdateMessage()
         mock_IU = MockIncrementalUnit()
-        expected_result = [1,2,3,4, (mock_IU, "add")]
+        mock_update = abstract.UpdateMessage.from_iu(mock_IU, "commit")
+        expected_result = list(mock_update)
+        expected_result.append((mock_IU, "add"))
 
         #Act
         abstract.UpdateMessage.add_iu(mock_update, mock_IU, "add", False)
 
         #Assert
-        self.assertEqual(mock_update._msgs, expected_result)
+        self.assertEqual(list(mock_update), expected_result)
 
     def test_update_add_ius_fail(self):
         #Arrange
@@ -294,9 +309,9 @@ class TestAbstractModule(unittest.TestCase):
 
     def test_update_add_ius_pass_strict(self):
         #Arrange
-        mock_update = MockUpdateMessage()
         mock_IU = MockIncrementalUnit()
-        expected_result = [1,2,3,4]
+        mock_update = abstract.UpdateMessage.from_iu(mock_IU, "commit")
+        expected_result = list(mock_update)
         expected_result.append((mock_IU, abstract.UpdateType("add")))
         expected_result.append((mock_IU, abstract.UpdateType("revoke")))
         mock_ius = [("add", mock_IU), ("revoke", mock_IU)]
@@ -305,13 +320,13 @@ class TestAbstractModule(unittest.TestCase):
         abstract.UpdateMessage.add_ius(mock_update, mock_ius)
 
         #Assert
-        self.assertEqual(mock_update._msgs, expected_result)
+        self.assertEqual(list(mock_update), expected_result)
 
     def test_update_add_ius_pass_not_strict(self):
         #Arrange
-        mock_update = MockUpdateMessage()
         mock_IU = MockIncrementalUnit()
-        expected_result = [1,2,3,4]
+        mock_update = abstract.UpdateMessage.from_iu(mock_IU, "commit")
+        expected_result = list(mock_update)
         expected_result.append((mock_IU, "add"))
         expected_result.append((mock_IU, "revoke"))
         mock_ius = [("add", mock_IU), ("revoke", mock_IU)]
@@ -320,7 +335,7 @@ class TestAbstractModule(unittest.TestCase):
         abstract.UpdateMessage.add_ius(mock_update, mock_ius, False)
 
         #Assert
-        self.assertEqual(mock_update._msgs, expected_result)
+        self.assertEqual(list(mock_update), expected_result)
 
     def test_update_has_valid_ius_empty(self):
         #Arrange
@@ -359,47 +374,41 @@ class TestAbstractModule(unittest.TestCase):
 
     def test_update_update_types(self):
         #Arrange
-        mock_update = MockUpdateMessage()
-        mock_update._msgs = [("IU1", "update1"), ("IU2", "update2")]
-        expected_result = ["update1", "update2"]
+        mock_IU = MockIncrementalUnit()
+        mock_update = abstract.UpdateMessage.from_iu_list([(mock_IU, "add"), (mock_IU, "commit")])
+        expected_result = [abstract.UpdateType.ADD, abstract.UpdateType.COMMIT]
 
         #Act
         result = abstract.UpdateMessage.update_types(mock_update)
 
         #Assert
-        for x in result:
-            self.assertTrue(x in expected_result)
+        self.assertEqual(list(result), expected_result)
 
     def test_update_incremental_units(self):
         #Arrange
-        mock_update = MockUpdateMessage()
-        mock_update._msgs = [("IU1", "update1"), ("IU2", "update2")]
-        expected_result = ["IU1", "IU2"]
+        expected_result = [MockIncrementalUnit(), MockIncrementalUnit()]
+        mock_update = abstract.UpdateMessage.from_ius(expected_result)
 
         #Act
         result = abstract.UpdateMessage.incremental_units(mock_update)
 
         #Assert
-        for x in result:
-            self.assertTrue(x in expected_result)
+        self.assertEqual(list(result), expected_result)
 
     def test_update_set_processed(self):
         #Arrange
-        mock_update = MockUpdateMessage()
         mock_IU_1 = MockIncrementalUnit()
-        mock_IU_1._processed_list = ["test", "Strings"]
         mock_IU_2 = MockIncrementalUnit()
-        mock_update.ius = [mock_IU_1, mock_IU_2]
-        expected_results = []
-        expected_results.append(mock_IU_1._processed_list)
-        expected_results.append(mock_IU_2._processed_list)
+        mock_update = abstract.UpdateMessage.from_ius([mock_IU_1, mock_IU_2])
+        mock_abstract = MockAbstract()
+        mock_abstract._module_index = None
 
         #Act
-        abstract.UpdateMessage.set_processed(mock_update, 20)
+        abstract.UpdateMessage.set_processed(mock_update, mock_abstract)
 
         #Assert
-        for x in range(0, len(mock_update.ius)):
-            self.assertEqual(mock_update.ius[x]._processed_list, expected_results[x])
+        for mock_IU in mock_update.incremental_units():
+            self.assertEqual(mock_IU.processed_list(), [mock_abstract])
 
     def test_abstract_name(self):
         #Arrange
@@ -606,6 +615,7 @@ class TestAbstractModule(unittest.TestCase):
         mock_abstract = MockAbstract()
         mock_abstract.EVENT_STOP = "test_abstract_stop"
         mock_abstract.rbs = [MockBuffer(), MockBuffer()]
+        mock_abstract._inbox = abstract.Inbox()
 
         #Act
         abstract.AbstractModule.stop(mock_abstract)
@@ -618,7 +628,11 @@ class TestAbstractModule(unittest.TestCase):
         mock_abstract = MockAbstract()
         mock_abstract.iu_counter = 1
         mock_abstract._previous_iu = "prev"
-        expected_iuid = f"{hash(mock_abstract)}:{mock_abstract.iu_counter}"
+        mock_abstract._next_iuid = 5
+        mock_abstract._iuid_limit = 10
+        mock_abstract._iu_lock = threading.Lock()
+        mock_abstract._history = None
+        expected_iuid = 5
         expected_creator = mock_abstract
         expected_prev = mock_abstract._previous_iu
         expected_grounded_in = None
@@ -631,6 +645,8 @@ class TestAbstractModule(unittest.TestCase):
         self.assertEqual(result.iuid, expected_iuid)
         self.assertEqual(result.previous_iu, expected_prev)
         self.assertEqual(result.grounded_in, expected_grounded_in)
+        self.assertEqual(mock_abstract.iu_counter, 2)
+        self.assertEqual(mock_abstract._previous_iu, result)
     
     def test_abstract_latest_iu(self):
         #Arrange
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import unittest
+import retico_core
+from retico_core import asynchronous, text, debug
+
+'''
+test format:
+def test_X(self):
+    #Arrange
+
+        #Act
+
+        #Assert
+'''
+
+class MockAsyncEcho(asynchronous.AsyncAbstractModule):
+    @staticmethod
+    def name():
+        return "mock_async_echo"
+    @staticmethod
+    def description():
+        return "mock"
+    @staticmethod
+    def input_ius():
+        return [text.TextIU]
+    @staticmethod
+    def output_iu():
+        return text.TextIU
+    async def process_update(self, update_message):
+        await asyncio.sleep(0)
+        um = retico_core.UpdateMessage()
+        for iu, ut in update_message:
+            output_iu = self.create_iu(iu)
+            output_iu.payload = iu.payload.upper()
+            um.add_iu(output_iu, ut)
+        return um
+
+class MockAsyncTrigger(asynchronous.AsyncAbstractTriggerModule):
+    @staticmethod
+    def name():
+        return "mock_async_trigger"
+    @staticmethod
+    def description():
+        return "mock"
+    @staticmethod
+    def output_iu():
+        return text.TextIU
+    async def trigger(self, data={}, update_type=retico_core.UpdateType.ADD):
+        output_iu = self.create_iu()
+        output_iu.payload = data["text"]
+        self.append(retico_core.UpdateMessage.from_iu(output_iu, update_type))
+
+# Test cases
+class TestAsynchronousModule(unittest.TestCase):
+
+    def test_async_module_between_thread_modules(self):
+        #Arrange
+        received = []
+        done = threading.Event()
+        def callback(update_message):
+            received.extend(iu.payload for iu in update_message.incremental_units())
+            if len(received) == 10:
+                done.set()
+        trigger = text.TextTriggerModule()
+        echo = MockAsyncEcho()
+        sink = debug.CallbackModule(callback)
+        trigger.subscribe(echo)
+        echo.subscribe(sink)
+        runner = asynchronous.EventLoopRunner()
+
+        #Act
+        retico_core.network.run(trigger, event_loop=runner)
+        for i in range(10):
+            trigger.trigger({"text": "t%d" % i})
+        done.wait(timeout=10)
+        retico_core.network.stop(trigger)
+        runner.shutdown()
+
+        #Assert
+        self.assertEqual(received, ["T%d" % i for i in range(10)])
+
+    def test_async_modules_share_event_loop(self):
+        #Arrange
+        received = []
+        done = threading.Event()
+        def callback(update_message):
+            received.extend(iu.payload for iu in update_message.incremental_units())
+            done.set()
+        trigger = MockAsyncTrigger()
+        echo = MockAsyncEcho()
+        sink = debug.CallbackModule(callback)
+        trigger.subscribe(echo)
+        echo.subscribe(sink)
+        runner = asynchronous.EventLoopRunner()
+        retico_core.network.run(trigger, event_loop=runner)
+
+        #Act
+        asyncio.run_coroutine_threadsafe(
+            trigger.trigger({"text": "hello"}), runner.loop
+        ).result(timeout=10)
+        done.wait(timeout=10)
+        retico_core.network.stop(trigger)
+        runner.shutdown()
+
+        #Assert
+        self.assertEqual(received, ["HELLO"])
+        self.assertFalse(echo.is_schedulable())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -700,6 +700,8 @@ class TestAudioModule(unittest.TestCase):
         mock_audio_IU.nframes = 10
         mock_audio_IU.target_chunk_size = 5
         mock_audio_IU.raw_audio = b"sound_file"
+        mock_audio_IU._revoke_dispatch = lambda iu: None
+        mock_audio_IU.dispatching_mutex = MockMutex()
         mock_update = [(mock_audio_IU,UpdateType.ADD), ("fake", UpdateType.REVOKE), (mock_audio_IU, UpdateType.ADD)]
         expected_result = None
 
@@ -0,0 +1,143 @@
+import threading
+import time
+import unittest
+import retico_core
+from retico_core import clock, network, scheduler, text
+
+'''
+test format:
+def test_X(self):
+    #Arrange
+
+        #Act
+
+        #Assert
+'''
+
+class MockPacedProducer(retico_core.AbstractProducingModule):
+    @staticmethod
+    def name():
+        return "mock_paced_producer"
+    @staticmethod
+    def description():
+        return "mock"
+    @staticmethod
+    def output_iu():
+        return text.TextIU
+    def __init__(self, interval, **kwargs):
+        super().__init__(**kwargs)
+        self.interval = interval
+    def process_update(self, update_message):
+        clock.CLOCK.sleep(self.interval)
+        output_iu = self.create_iu()
+        output_iu.payload = "tick"
+        return retico_core.UpdateMessage.from_iu(output_iu, retico_core.UpdateType.ADD)
+
+class MockRecorder(retico_core.AbstractConsumingModule):
+    @staticmethod
+    def name():
+        return "mock_recorder"
+    @staticmethod
+    def description():
+        return "mock"
+    @staticmethod
+    def input_ius():
+        return [text.TextIU]
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.received = []
+    def process_update(self, update_message):
+        for iu, ut in update_message:
+            self.received.append((iu.created_at, clock.CLOCK.time()))
+
+# Test cases
+class TestVirtualClock(unittest.TestCase):
+
+    def tearDown(self):
+        clock.set_clock(clock.RealClock())
+
+    def test_sleep_without_participants_jumps_ahead(self):
+        #Arrange
+        virtual_clock = clock.VirtualClock(start=100.0)
+
+        #Act
+        started = time.time()
+        virtual_clock.sleep(3600)
+
+        #Assert
+        self.assertEqual(virtual_clock.time(), 3700.0)
+        self.assertEqual(virtual_clock.advances, 1)
+        self.assertLess(time.time() - started, 1.0)
+
+    def test_participants_wake_up_in_order(self):
+        #Arrange
+        virtual_clock = clock.VirtualClock(start=0.0)
+        wake_ups = []
+        lock = threading.Lock()
+        def sleeper(name, seconds):
+            def target():
+                for _ in range(3):
+                    virtual_clock.sleep(seconds)
+                    with lock:
+                        wake_ups.append((virtual_clock.time(), name))
+            return target
+
+        #Act
+        with virtual_clock.hold():
+            threads = [
+                virtual_clock.start_thread(sleeper("slow", 3), "slow"),
+                virtual_clock.start_thread(sleeper("fast", 2), "fast"),
+            ]
+        for t in threads:
+            t.join(timeout=5)
+
+        #Assert
+        self.assertEqual(
+            wake_ups,
+            [(2, "fast"), (3, "slow"), (4, "fast"), (6, "fast"), (6, "slow"), (9, "slow")],
+        )
+        self.assertTrue(virtual_clock.is_idle())
+
+    def test_network_runs_in_virtual_time(self):
+        #Arrange
+        virtual_clock = clock.VirtualClock(start=0.0)
+        producer = MockPacedProducer(interval=60)
+        recorder = MockRecorder()
+        producer.subscribe(recorder)
+
+        previous_clock = clock.get_clock()
+
+        #Act
+        started = time.time()
+        network.run(producer, clock=virtual_clock)
+        running_clock = clock.get_clock()
+        virtual_clock.sleep(3600)
+        network.stop(producer)
+
+        #Assert
+        self.assertIs(running_clock, virtual_clock)
+        self.assertIs(clock.get_clock(), previous_clock)
+        self.assertLess(time.time() - started, 10)
+        self.assertGreaterEqual(len(recorder.received), 59)
+        created_at = [c for c, _ in recorder.received[:59]]
+        self.assertEqual(created_at, [60.0 * (i + 1) for i in range(59)])
+        self.assertTrue(all(c == r for c, r in recorder.received[:59]))
+
+    def test_virtual_clock_rejects_scheduler(self):
+        #Arrange
+        producer = MockPacedProducer(interval=1)
+        recorder = MockRecorder()
+        producer.subscribe(recorder)
+
+        #Act
+        run = lambda: network.run(
+            producer, scheduler=scheduler.Scheduler(), clock=clock.VirtualClock()
+        )
+
+        #Assert
+        self.assertRaises(ValueError, run)
+        self.assertFalse(clock.get_clock().virtual)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -178,10 +178,10 @@ class TestDialogueModule(unittest.TestCase):
         self.assertEqual(result.separator, mock_separator)
         self.assertEqual(result.txt_file, expected_txt_file)
 
-    @patch('time.time')
-    def test_dialogue_act_recorder_module_prepare_run(self, mock_time):
+    @patch.object(dialogue.retico_core.clock, 'CLOCK')
+    def test_dialogue_act_recorder_module_prepare_run(self, mock_clock):
         #Arrange
-        mock_time.return_value = 50
+        mock_clock.time.return_value = 50
         mock_dialog = MockDialog()
         
         #Act
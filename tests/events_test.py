@@ -0,0 +1,133 @@
+import contextlib
+import io
+import threading
+import unittest
+import retico_core
+from retico_core import events
+
+'''
+test format:
+def test_X(self):
+    #Arrange
+
+        #Act
+
+        #Assert
+'''
+
+class MockModule(retico_core.AbstractModule):
+    @staticmethod
+    def name():
+        return "mock_module"
+
+# Test cases
+class TestEventDispatcher(unittest.TestCase):
+
+    def test_inline_dispatcher_calls_callbacks_synchronously(self):
+        #Arrange
+        received = []
+        module = MockModule()
+        module.event_dispatcher = events.EventDispatcher(inline=True)
+        module.event_subscribe("test", lambda m, e, d: received.append((m, e, d)))
+        module.event_subscribe("*", lambda m, e, d: received.append(e))
+
+        #Act
+        module.event_call("test", {"value": 1})
+
+        #Assert
+        self.assertEqual(received, [(module, "test", {"value": 1}), "test"])
+        self.assertEqual(module.event_dispatcher.delivered, 2)
+
+    def test_subscription_sampling_and_filter(self):
+        #Arrange
+        received = []
+        module = MockModule()
+        module.event_dispatcher = events.EventDispatcher(inline=True)
+        module.event_subscribe("test", lambda m, e, d: received.append(d["i"]), sample=3)
+        module.event_subscribe(
+            "test",
+            lambda m, e, d: received.append(-d["i"]),
+            event_filter=lambda m, e, d: d["i"] == 4,
+        )
+
+        #Act
+        for i in range(7):
+            module.event_call("test", {"i": i})
+
+        #Assert
+        self.assertEqual(received, [2, -4, 5])
+        self.assertEqual(module.events["test"][0].skipped, 5)
+
+    def test_full_dispatcher_drops_events(self):
+        #Arrange
+        release = threading.Event()
+        received = []
+        def callback(module, event_name, data):
+            release.wait()
+            received.append(data["i"])
+        dispatcher = events.EventDispatcher(workers=1, maxsize=2)
+        module = MockModule()
+        module.event_dispatcher = dispatcher
+        module.event_subscribe("test", callback)
+
+        #Act
+        for i in range(10):
+            module.event_call("test", {"i": i})
+        release.set()
+        dispatcher.shutdown()
+
+        #Assert
+        self.assertEqual(received[0], 0)
+        self.assertEqual(len(received) + dispatcher.dropped, 10)
+        self.assertLessEqual(len(received), 3)
+
+    def test_full_dispatcher_keeps_start_and_stop(self):
+        #Arrange
+        release = threading.Event()
+        received = []
+        def callback(module, event_name, data):
+            release.wait()
+            received.append(event_name)
+        dispatcher = events.EventDispatcher(workers=1, maxsize=1)
+        module = MockModule()
+        module.event_dispatcher = dispatcher
+        module.event_subscribe("*", callback)
+        output = io.StringIO()
+
+        #Act
+        with contextlib.redirect_stdout(output):
+            for i in range(5):
+                module.event_call("test", {"i": i})
+            module.event_call(module.EVENT_START)
+            module.event_call(module.EVENT_STOP)
+        release.set()
+        dispatcher.shutdown()
+
+        #Assert
+        self.assertEqual(received[-2:], ["start", "stop"])
+        self.assertEqual(received.count("test") + dispatcher.dropped, 5)
+        self.assertEqual(output.getvalue().count("Warning"), 1)
+
+    def test_event_unsubscribe(self):
+        #Arrange
+        received = []
+        plain = lambda m, e, d: received.append("plain")
+        sampled = lambda m, e, d: received.append("sampled")
+        module = MockModule()
+        module.event_dispatcher = events.EventDispatcher(inline=True)
+        module.event_subscribe("test", plain)
+        module.event_subscribe("test", sampled, sample=1, event_filter=lambda m, e, d: True)
+
+        #Act
+        module.event_unsubscribe("test", sampled)
+        module.event_call("test")
+        module.event_unsubscribe("test", plain)
+        module.event_call("test")
+
+        #Assert
+        self.assertEqual(received, ["plain"])
+        self.assertRaises(ValueError, module.event_unsubscribe, "test", plain)
+
+
+if __name__ == '__main__':
+    unittest.main()
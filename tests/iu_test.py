@@ -0,0 +1,509 @@
+import gc
+import json
+import pickle
+import threading
+import unittest
+from unittest import mock
+import retico_core
+from retico_core import audio, network, text
+
+'''
+test format:
+def test_X(self):
+    #Arrange
+
+        #Act
+
+        #Assert
+'''
+
+class MockModule(retico_core.AbstractModule):
+    @staticmethod
+    def name():
+        return "mock_module"
+    @staticmethod
+    def description():
+        return "mock"
+
+class MockIU(retico_core.IncrementalUnit):
+    @staticmethod
+    def type():
+        return "mock_iu"
+
+# Test cases
+class TestCompactIncrementalUnit(unittest.TestCase):
+
+    def test_compact_iu_has_lazy_state(self):
+        #Arrange
+        creator = MockModule()
+
+        #Act
+        iu = audio.AudioIU(creator=creator, iuid=1, raw_audio=b"\0\0", nframes=1,
+                           rate=16000, sample_width=2)
+
+        #Assert
+        self.assertEqual(iu.__dict__, {})
+        self.assertIsNone(iu._mutex)
+        self.assertIsNone(iu._meta_data)
+        self.assertEqual(iu.processed_list(), [])
+        iu.set_processed(creator)
+        self.assertTrue(iu.is_processed_by(creator))
+        self.assertIsNone(iu._mutex)
+
+    def test_ius_accept_arbitrary_attributes(self):
+        #Arrange
+        creator = MockModule()
+        iu = text.TextIU(creator=creator, iuid=1, payload="hello")
+        mutex = threading.Lock()
+
+        #Act
+        iu.custom = 42
+        iu.mutex = mutex
+
+        #Assert
+        self.assertEqual(iu.custom, 42)
+        self.assertIs(iu.mutex, mutex)
+
+    def test_processed_by_bitmask(self):
+        #Arrange
+        creator = MockModule()
+        consumers = [MockModule() for _ in range(3)]
+        iu = MockIU(creator=creator, iuid=1)
+
+        #Act
+        iu.set_processed(consumers[2])
+        iu.set_processed(consumers[0])
+        iu.set_processed(consumers[0])
+
+        #Assert
+        self.assertTrue(iu.is_processed_by(consumers[0]))
+        self.assertFalse(iu.is_processed_by(consumers[1]))
+        self.assertFalse(iu.is_processed_by("not a module"))
+        self.assertEqual(
+            sorted(m.id for m in iu.processed_list()),
+            sorted([consumers[0].id, consumers[2].id]),
+        )
+        self.assertRaises(TypeError, iu.set_processed, 5)
+
+    def test_processed_by_survives_module_collection(self):
+        #Arrange
+        creator = MockModule()
+        consumer = MockModule()
+        iu = MockIU(creator=creator, iuid=1)
+
+        #Act
+        with mock.patch.object(retico_core.abstract, "MODULE_INDEX",
+                               retico_core.abstract.ModuleIndex()):
+            iu.set_processed(consumer)
+            index = consumer._module_index
+            del consumer
+            gc.collect()
+            new_consumer = MockModule()
+            new_index = retico_core.abstract.MODULE_INDEX.register(new_consumer)
+            reused = iu.is_processed_by(new_consumer)
+            iu.set_processed(creator)
+            processed = iu.processed_list()
+            iu.set_processed(new_consumer)
+
+            #Assert
+            self.assertEqual(new_index, index)
+            self.assertFalse(reused)
+            self.assertEqual(processed, [creator])
+            self.assertEqual(iu.processed_list(), [new_consumer, creator])
+
+    def test_processed_by_concurrent_modules(self):
+        #Arrange
+        creator = MockModule()
+        consumers = [MockModule() for _ in range(8)]
+        ius = [MockIU(creator=creator, iuid=i) for i in range(2000)]
+        def process(consumer):
+            for iu in ius:
+                iu.set_processed(consumer)
+
+        #Act
+        threads = [threading.Thread(target=process, args=(c,)) for c in consumers]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        #Assert
+        self.assertTrue(all(len(iu.processed_list()) == 8 for iu in ius))
+
+    def test_processed_by_shared_ius_in_network(self):
+        #Arrange
+        forwarding = MockProducer()
+        forwarder = MockForwarder()
+        forwarded = [forwarding.create_iu() for _ in range(301)]
+        forwarded_sink = MockSink(forwarded.pop())
+        forwarding.subscribe(forwarder)
+        forwarder.subscribe(forwarded_sink)
+        fanning = MockProducer()
+        fanned = [fanning.create_iu() for _ in range(301)]
+        fanned_sinks = [MockSink(fanned[-1]) for _ in range(3)]
+        for sink in fanned_sinks:
+            fanning.subscribe(sink)
+        fanned.pop()
+        single = MockProducer()
+        single_ius = [single.create_iu() for _ in range(2)]
+        single_sink = MockSink(single_ius[-1])
+        single.subscribe(single_sink)
+
+        #Act
+        for module in (forwarding, fanning, single):
+            network.run(module)
+        for forwarded_iu, fanned_iu in zip(forwarded + [forwarded_sink.sentinel],
+                                           fanned + [fanned_sinks[0].sentinel]):
+            forwarding.append(retico_core.UpdateMessage.from_iu(forwarded_iu, "add"))
+            fanning.append(retico_core.UpdateMessage.from_iu(fanned_iu, "add"))
+        for single_iu in single_ius:
+            single.append(retico_core.UpdateMessage.from_iu(single_iu, "add"))
+        for sink in [forwarded_sink, single_sink] + fanned_sinks:
+            sink.done.wait(timeout=10)
+        for module in (forwarding, fanning, single):
+            network.stop(module)
+
+        #Assert
+        self.assertTrue(all(iu._single_writer is False for iu in forwarded + fanned))
+        self.assertTrue(all(
+            iu.processed_list() == sorted([forwarder, forwarded_sink],
+                                          key=lambda m: m._module_index)
+            for iu in forwarded
+        ))
+        self.assertTrue(all(len(iu.processed_list()) == 3 for iu in fanned))
+        self.assertTrue(single_ius[0]._single_writer)
+        self.assertEqual(single_ius[0].processed_list(), [single_sink])
+
+    def test_meta_data_is_copied_from_grounded_in(self):
+        #Arrange
+        creator = MockModule()
+        source = MockIU(creator=creator, iuid=1)
+        source.meta_data["speaker"] = "user"
+
+        #Act
+        iu = MockIU(creator=creator, iuid=2, grounded_in=source)
+        iu.meta_data["turn"] = 1
+
+        #Assert
+        self.assertEqual(iu.meta_data, {"speaker": "user", "turn": 1})
+        self.assertEqual(source.meta_data, {"speaker": "user"})
+
+    def test_meta_data_is_shared_until_written(self):
+        #Arrange
+        creator = MockModule()
+        source = MockIU(creator=creator, iuid=1)
+        source.meta_data["speaker"] = "user"
+        chain = [source]
+        for i in range(2, 30):
+            chain.append(MockIU(creator=creator, iuid=i, grounded_in=chain[-1]))
+
+        #Act
+        source.meta_data["speaker"] = "system"
+        del chain[5].meta_data["speaker"]
+        chain[10].meta_data["turn"] = 2
+
+        #Assert
+        self.assertEqual(chain[1].meta_data._local, None)
+        self.assertEqual(chain[4].meta_data, {"speaker": "user"})
+        self.assertEqual(chain[5].meta_data, {})
+        self.assertEqual(chain[10].meta_data, {"speaker": "user", "turn": 2})
+        self.assertEqual(chain[-1].meta_data, {"speaker": "user"})
+        self.assertEqual(source.meta_data, {"speaker": "system"})
+        child = MockIU(creator=creator, iuid=99, grounded_in=chain[10])
+        self.assertEqual(child.meta_data, {"speaker": "user", "turn": 2})
+        self.assertEqual(pickle.loads(pickle.dumps(child.meta_data)), child.meta_data)
+
+    def test_meta_data_locks_are_lazy_and_per_meta_data(self):
+        #Arrange
+        creator = MockModule()
+        source = MockIU(creator=creator, iuid=1)
+        source.meta_data["speaker"] = "user"
+        chain = [source]
+        for i in range(2, 5):
+            chain.append(MockIU(creator=creator, iuid=i, grounded_in=chain[-1]))
+
+        #Act
+        chain[2].meta_data["turn"] = 1
+        chain[3].meta_data["turn"] = 2
+
+        #Assert
+        self.assertIsNone(chain[1].meta_data._lock)
+        self.assertIsNotNone(chain[2].meta_data._lock)
+        self.assertIsNot(chain[2].meta_data._lock, chain[3].meta_data._lock)
+        self.assertIsNot(source.meta_data._lock, chain[2].meta_data._lock)
+
+    def test_pickle_compact_and_dict_ius(self):
+        #Arrange
+        creator = MockModule()
+        compact = audio.SpeechIU(creator=creator, iuid=1, raw_audio=b"\0\0", nframes=1,
+                                 rate=16000, sample_width=2)
+        compact.dispatch = True
+        compact.meta_data["key"] = "value"
+        plain = MockIU(creator=creator, iuid=2, payload="text")
+        plain.custom = 42
+
+        #Act
+        compact_copy = pickle.loads(pickle.dumps(compact))
+        plain_copy = pickle.loads(pickle.dumps(plain))
+
+        #Assert
+        self.assertEqual(compact_copy.raw_audio, b"\0\0")
+        self.assertTrue(compact_copy.dispatch)
+        self.assertEqual(compact_copy.meta_data, {"key": "value"})
+        self.assertEqual(compact_copy.creator.name(), "mock_module")
+        self.assertEqual(compact_copy.creator_name, "mock_module")
+        self.assertEqual(plain_copy.custom, 42)
+        self.assertEqual(plain_copy.creator_name, "mock_module")
+        self.assertEqual(plain_copy.processed_list(), [])
+
+
+class MockProducer(MockModule):
+    @staticmethod
+    def output_iu():
+        return MockIU
+
+class MockForwarder(MockModule):
+    @staticmethod
+    def input_ius():
+        return [MockIU]
+    @staticmethod
+    def output_iu():
+        return MockIU
+    def process_update(self, update_message):
+        return retico_core.UpdateMessage.from_iu_list(list(update_message))
+
+class MockSink(MockModule):
+    """Sets done once it receives the given sentinel IU, after all IUs sent before
+    it were completely processed."""
+    @staticmethod
+    def input_ius():
+        return [MockIU]
+    def __init__(self, sentinel, **kwargs):
+        super().__init__(**kwargs)
+        self.sentinel = sentinel
+        self.done = threading.Event()
+    def process_update(self, update_message):
+        if self.sentinel in update_message.incremental_units():
+            self.done.set()
+
+def chain_length(iu, link):
+    length = 0
+    while getattr(iu, link) is not None:
+        iu = getattr(iu, link)
+        length += 1
+    return length
+
+class TestHistory(unittest.TestCase):
+
+    def test_chains_are_bounded(self):
+        #Arrange
+        module = MockProducer()
+        source = MockProducer()
+        max_depth = retico_core.IncrementalUnit.MAX_DEPTH
+
+        #Act
+        lengths = []
+        grounded_in = None
+        for _ in range(5 * max_depth):
+            grounded_in = source.create_iu(grounded_in)
+            iu = module.create_iu(grounded_in)
+            lengths.append(chain_length(iu, "previous_iu"))
+
+        #Assert
+        self.assertLessEqual(max(lengths), 2 * max_depth)
+        self.assertGreaterEqual(min(lengths[max_depth:]), max_depth)
+        self.assertLessEqual(chain_length(iu, "grounded_in"), 2 * max_depth + 1)
+
+    def test_chains_are_bounded_with_fan_out(self):
+        #Arrange
+        module = MockProducer()
+        source = MockProducer()
+        max_depth = retico_core.IncrementalUnit.MAX_DEPTH
+        grounded_in = None
+        for _ in range(2 * max_depth + 1):
+            grounded_in = source.create_iu(grounded_in)
+
+        #Act
+        with mock.patch.object(
+            retico_core.IncrementalUnit, "_cut_chain",
+            autospec=True, side_effect=retico_core.IncrementalUnit._cut_chain,
+        ) as cut_chain:
+            ius = [module.create_iu(grounded_in) for _ in range(5 * max_depth)]
+
+        #Assert
+        grounded_cuts = [c for c in cut_chain.call_args_list if c.args[2] == "grounded_in"]
+        self.assertEqual(len(grounded_cuts), 1)
+        self.assertTrue(all(iu.grounded_in is grounded_in for iu in ius))
+        self.assertLessEqual(chain_length(ius[-1], "grounded_in"), max_depth + 1)
+
+    def test_create_ius_links_a_run_of_ius(self):
+        #Arrange
+        module = MockProducer()
+        source = MockProducer().create_iu()
+        first = module.create_iu()
+
+        #Act
+        ius = module.create_ius(5, source)
+        last = module.create_iu()
+
+        #Assert
+        self.assertEqual(len(ius), 5)
+        self.assertIs(ius[0].previous_iu, first)
+        self.assertTrue(all(b.previous_iu is a for a, b in zip(ius, ius[1:])))
+        self.assertIs(last.previous_iu, ius[-1])
+        self.assertTrue(all(iu.grounded_in is source for iu in ius))
+        self.assertEqual(len({iu.iuid for iu in [first, *ius, last]}), 7)
+        self.assertEqual(module.iu_counter, 7)
+
+    def test_create_ius_from_multiple_threads(self):
+        #Arrange
+        module = MockProducer(history_length=10)
+        created = []
+        def create_single():
+            created.extend(module.create_iu() for _ in range(2000))
+        def create_runs():
+            for _ in range(200):
+                created.extend(module.create_ius(10))
+
+        #Act
+        threads = [threading.Thread(target=create_single), threading.Thread(target=create_runs)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        #Assert
+        self.assertEqual(module.iu_counter, 4000)
+        self.assertEqual(len({iu.iuid for iu in created}), 4000)
+        self.assertEqual(sorted(iu.iuid for iu in module._history),
+                         sorted(iu.iuid for iu in created)[-10:])
+
+    def test_iuids_are_sequential_integers_per_module(self):
+        #Arrange
+        module = MockProducer()
+        other = MockProducer()
+
+        #Act
+        ius = [module.create_iu()] + module.create_ius(3) + [module.create_iu()]
+        other_iu = other.create_iu()
+        anonymous = [MockIU(creator=module) for _ in range(2)]
+
+        #Assert
+        iuids = [iu.iuid for iu in ius]
+        self.assertTrue(all(isinstance(iuid, int) for iuid in iuids))
+        self.assertEqual(iuids, list(range(iuids[0], iuids[0] + 5)))
+        self.assertLess(iuids[-1], 1 << 64)
+        self.assertNotIn(other_iu.iuid, iuids)
+        self.assertEqual(anonymous[1].iuid, anonymous[0].iuid + 1)
+        self.assertNotEqual(anonymous[0], anonymous[1])
+
+    def test_module_history_length(self):
+        #Arrange
+        module = MockProducer(history_length=5)
+        source = MockProducer()
+
+        #Act
+        ius = [module.create_iu(source.create_iu()) for _ in range(20)]
+
+        #Assert
+        self.assertEqual(chain_length(ius[-1], "previous_iu"), 4)
+        self.assertEqual(list(module._history), ius[-5:])
+        self.assertIsNotNone(ius[-6].grounded_in)
+
+    def test_module_history_window(self):
+        #Arrange
+        module = MockProducer(history_window=1.0)
+        ius = [module.create_iu() for _ in range(3)]
+        for iu in ius:
+            iu.created_at -= 10
+
+        #Act
+        latest = module.create_iu()
+
+        #Assert
+        self.assertEqual(chain_length(latest, "previous_iu"), 0)
+        self.assertEqual(list(module._history), [latest])
+
+
+class TestIUList(unittest.TestCase):
+
+    def test_ius_are_hashable_by_iuid(self):
+        #Arrange
+        creator = MockModule()
+        iu = MockIU(creator=creator, iuid="a")
+        same = MockIU(creator=creator, iuid="a")
+
+        #Act
+        ius = {iu}
+        anonymous = MockIU(creator=creator)
+
+        #Assert
+        self.assertIn(same, ius)
+        self.assertIsNotNone(anonymous.iuid)
+        self.assertEqual(hash(anonymous), hash(anonymous.iuid))
+
+    def test_list_operations_keep_positions(self):
+        #Arrange
+        creator = MockModule()
+        ius = [MockIU(creator=creator, iuid=i) for i in range(6)]
+        iu_list = retico_core.IUList(ius[:4])
+
+        #Act
+        iu_list.append(ius[4])
+        iu_list += [ius[5]]
+        iu_list.remove(ius[1])
+        iu_list.pop()
+        iu_list.insert(0, ius[5])
+
+        #Assert
+        self.assertEqual(iu_list, [ius[5], ius[0], ius[2], ius[3], ius[4]])
+        self.assertEqual(iu_list.index(ius[3]), 3)
+        self.assertNotIn(ius[1], iu_list)
+        self.assertEqual(list(iu_list.after(ius[2])), [ius[3], ius[4]])
+        self.assertEqual(iu_list[1:3], [ius[0], ius[2]])
+        self.assertIsNone(iu_list.discard(ius[1]))
+
+    def test_behaves_like_a_list(self):
+        #Arrange
+        creator = MockModule()
+        ius = [MockIU(creator=creator, iuid=i) for i in range(3)]
+        iu_list = retico_core.IUList(reversed(ius))
+
+        #Act
+        iu_list.sort(key=lambda iu: iu.iuid)
+        concatenated = iu_list + [ius[0]]
+        copied = pickle.loads(pickle.dumps(iu_list))
+
+        #Assert
+        self.assertIsInstance(iu_list, list)
+        self.assertEqual(iu_list, ius)
+        self.assertEqual(iu_list.index(ius[0]), 0)
+        self.assertEqual(concatenated, ius + [ius[0]])
+        self.assertEqual(retico_core.IUList(), [])
+        self.assertEqual(json.dumps(retico_core.IUList([1, 2])), "[1, 2]")
+        self.assertIsInstance(copied, retico_core.IUList)
+        self.assertEqual(copied.index(copied[2]), 2)
+
+    def test_module_revoke_and_commit(self):
+        #Arrange
+        module = MockProducer()
+        module.current_output = [module.create_iu() for _ in range(5)]
+        first, last = module.current_output[0], module.current_output[-1]
+
+        #Act
+        module.revoke(last)
+        module.revoke(first, remove_revoked=False)
+        module.commit(module.current_output[1])
+
+        #Assert
+        self.assertIsInstance(module.current_output, retico_core.IUList)
+        self.assertEqual(len(module.current_output), 4)
+        self.assertTrue(last.revoked)
+        self.assertNotIn(last, module.current_output)
+        self.assertTrue(first.revoked)
+        self.assertIn(first, module.current_output)
+        self.assertTrue(module.current_output[1].committed)
+
+
+if __name__ == '__main__':
+    unittest.main()
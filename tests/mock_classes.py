@@ -21,8 +21,7 @@ class MockAudioBuffer:
 
 class MockUpdateMessage:
     def __init__(self, valid_ius=True):
-        self._msgs = [1,2,3,4]
-        self._counter = -1
+        self._frozen = False
         self.ius = [1, "revoke"]
         self.valid_ius = valid_ius
     def incremental_units(self):
@@ -35,6 +34,8 @@ class MockUpdateMessage:
         return self.output_message
     def add_iu(self, iu, ut):
         self.ius.append((iu, ut))
+    def _check_not_frozen(self):
+        return True
     
 class MockTextFile(abstract.IncrementalUnit):
     def __init__(self):
@@ -131,6 +132,8 @@ class MockAudioIU:
         self.chunk_size = 50
     def create_iu(self, *kwargs):
         return MockAudioIU()
+    def create_ius(self, n, *kwargs):
+        return [MockAudioIU() for _ in range(n)]
     def set_audio(self, *kwargs):
         self.set_audio_value = True
         return True
@@ -262,14 +265,14 @@ class MockIncrementalUnit(abstract.IncrementalUnit):
         self.MAX_DEPTH = 0
         self.grounded_in = grounded_in
         self.created_at = 30
-        self._processed_list = [1,2,3,4]
+        self._processed = 0
+        self._processed_epoch = 0
+        self._single_writer = None
         self.mutex = MockMutex()
         self.creator = creator
         self.payload = "payload!!!"
         self.revoked = False
         self.iuid = iuid
-    def set_processed(self, module):
-        self._processed_list.append(module)
     def type(self):
         return "MOCK IU"
     def index(self, iu):
@@ -0,0 +1,136 @@
+import os
+import queue
+import threading
+import unittest
+import retico_core
+from retico_core import process, text, debug, tracing
+
+'''
+test format:
+def test_X(self):
+    #Arrange
+
+        #Act
+
+        #Assert
+'''
+
+class MockPidModule(retico_core.AbstractModule):
+    @staticmethod
+    def name():
+        return "mock_pid"
+    @staticmethod
+    def description():
+        return "mock"
+    @staticmethod
+    def input_ius():
+        return [text.TextIU]
+    @staticmethod
+    def output_iu():
+        return text.TextIU
+    def __init__(self, suffix="", **kwargs):
+        super().__init__(**kwargs)
+        self.suffix = suffix
+    def process_update(self, update_message):
+        um = retico_core.UpdateMessage()
+        for iu, ut in update_message:
+            output_iu = self.create_iu(iu)
+            output_iu.payload = (iu.payload + self.suffix, os.getpid())
+            um.add_iu(output_iu, ut)
+        return um
+
+# Test cases
+class TestProcessModule(unittest.TestCase):
+
+    def test_process_module_runs_in_child_process(self):
+        #Arrange
+        received = []
+        done = threading.Event()
+        def callback(update_message):
+            received.extend(update_message.incremental_units())
+            if len(received) == 3:
+                done.set()
+        trigger = text.TextTriggerModule()
+        child = process.ProcessModule(MockPidModule, module_args={"suffix": "!"})
+        sink = debug.CallbackModule(callback)
+        trigger.subscribe(child)
+        child.subscribe(sink)
+
+        #Act
+        retico_core.network.run(trigger)
+        for i in range(3):
+            trigger.trigger({"text": str(i)})
+        done.wait(timeout=60)
+        retico_core.network.stop(trigger)
+        child.join(timeout=60)
+
+        #Assert
+        self.assertEqual([iu.payload[0] for iu in received], ["0!", "1!", "2!"])
+        self.assertTrue(all(iu.payload[1] != os.getpid() for iu in received))
+        self.assertTrue(all(iu.creator is child for iu in received))
+        self.assertIsInstance(received[0].grounded_in, retico_core.IncrementalUnitStub)
+        self.assertEqual(received[0].grounded_in.creator.name(), trigger.name())
+        self.assertIsNone(received[0].previous_iu)
+        self.assertEqual(child.name(), "mock_pid")
+
+    def test_traces_continue_through_child_process(self):
+        #Arrange
+        received = []
+        done = threading.Event()
+        def callback(update_message):
+            received.extend(update_message.incremental_units())
+            done.set()
+        trigger = text.TextTriggerModule()
+        child = process.ProcessModule(MockPidModule)
+        sink = debug.CallbackModule(callback)
+        trigger.subscribe(child)
+        child.subscribe(sink)
+        tracing.enable()
+
+        #Act
+        try:
+            retico_core.network.run(trigger)
+            trigger.trigger({"text": "0"})
+            done.wait(timeout=60)
+            retico_core.network.stop(trigger)
+            child.join(timeout=60)
+        finally:
+            tracing.disable()
+        hops = tracing.breakdown(received[0])
+
+        #Assert
+        self.assertEqual([hop["module"] for hop in hops], [trigger.name(), child.name()])
+        self.assertIsNotNone(hops[0]["emitted_at"])
+        self.assertIsNotNone(hops[1]["received_at"])
+        self.assertGreaterEqual(hops[1]["queue_wait"], 0)
+        self.assertGreaterEqual(hops[1]["processing"], 0)
+
+    def test_pickled_size_is_independent_of_history(self):
+        #Arrange
+        source = text.TextTriggerModule()
+        module = MockPidModule()
+        channel = queue.Queue()
+        q = process.ProcessIncrementalQueue(module, None, channel)
+        sizes = []
+
+        #Act
+        for i in range(3 * retico_core.IncrementalUnit.MAX_DEPTH):
+            grounded_in = source.create_iu(source.latest_iu())
+            grounded_in.payload = "x" * 1000
+            iu = module.create_iu(grounded_in)
+            iu.payload = "y"
+            q.put(retico_core.UpdateMessage.from_iu(iu, retico_core.UpdateType.ADD))
+            sizes.append(len(channel.queue[-1]))
+        received = [q.get() for _ in sizes][-1]
+
+        #Assert
+        self.assertEqual(len(set(sizes)), 1)
+        self.assertLess(sizes[-1], 1000)
+        received_iu = next(received.incremental_units())
+        self.assertEqual(received_iu, iu)
+        self.assertEqual(received_iu.grounded_in, grounded_in)
+        self.assertIsNone(received_iu.grounded_in.payload)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,357 @@
+import unittest
+from retico_core import abstract
+
+'''
+test format:
+def test_X(self):
+    #Arrange
+
+        #Act
+
+        #Assert
+'''
+
+# Test cases
+class TestIncrementalQueue(unittest.TestCase):
+
+    def test_inbox_keeps_arrival_order(self):
+        #Arrange
+        inbox = abstract.Inbox()
+        q1 = abstract.IncrementalQueue(provider="p1", consumer="c")
+        q2 = abstract.IncrementalQueue(provider="p2", consumer="c")
+        q1.inbox = inbox
+        q2.inbox = inbox
+
+        #Act
+        q1.put("m1")
+        q2.put("m2")
+        q1.put("m3")
+        result = [inbox.get(block=False) for _ in range(3)]
+
+        #Assert
+        self.assertEqual([(b.provider, m) for b, m in result],
+                         [("p1", "m1"), ("p2", "m2"), ("p1", "m3")])
+        self.assertTrue(inbox.empty())
+
+    def test_inbox_skips_removed_messages(self):
+        #Arrange
+        inbox = abstract.Inbox()
+        q = abstract.IncrementalQueue(provider="p", consumer="c")
+        q.inbox = inbox
+        q.put("m1")
+        q.get()
+
+        #Act
+        result = inbox.get(block=False)
+
+        #Assert
+        self.assertEqual(result, (None, None))
+
+    def test_inbox_skips_dropped_messages(self):
+        #Arrange
+        inbox = abstract.Inbox()
+        q1 = abstract.DropOldestIncrementalQueue(provider="p1", consumer="c", maxsize=1)
+        q2 = abstract.IncrementalQueue(provider="p2", consumer="c")
+        q3 = abstract.IncrementalQueue(provider="p3", consumer="c")
+        for q in (q1, q2, q3):
+            q.inbox = inbox
+
+        #Act
+        q1.put("m1")
+        q2.put("n1")
+        q1.put("m2")
+        q3.put("o1")
+        q3.clear()
+        q2.put("n2")
+        result = [inbox.get(block=False) for _ in range(4)]
+
+        #Assert
+        self.assertEqual([(b.provider, m) for b, m in result[:3]],
+                         [("p2", "n1"), ("p1", "m2"), ("p2", "n2")])
+        self.assertEqual(result[3], (None, None))
+        self.assertEqual(q1.dropped, 1)
+        self.assertEqual((q1._voided, q3._voided), (set(), set()))
+
+    def test_inbox_wakeup(self):
+        #Arrange
+        inbox = abstract.Inbox()
+
+        #Act
+        inbox.wakeup()
+        result = inbox.get(timeout=1.0)
+
+        #Assert
+        self.assertEqual(result, (None, None))
+
+    def _message(self, payload, update_type=abstract.UpdateType.ADD):
+        iu = MockIU(creator=MockModule(), iuid=payload, payload=payload)
+        return abstract.UpdateMessage.from_iu(iu, update_type)
+
+    def _payloads(self, q):
+        return [um_iu.payload for um in q.queue for um_iu in um.incremental_units()]
+
+    def test_bounded_queue_class(self):
+        #Arrange
+        queue_class = abstract.DropOldestIncrementalQueue.bounded(3)
+
+        #Act
+        q = queue_class(provider="p", consumer="c")
+
+        #Assert
+        self.assertTrue(issubclass(queue_class, abstract.DropOldestIncrementalQueue))
+        self.assertEqual(q.maxsize, 3)
+
+    def test_drop_oldest(self):
+        #Arrange
+        q = abstract.DropOldestIncrementalQueue(provider="p", consumer="c", maxsize=2)
+
+        #Act
+        for i in range(4):
+            q.put(self._message(i))
+
+        #Assert
+        self.assertEqual(self._payloads(q), [2, 3])
+        self.assertEqual(q.dropped, 2)
+
+    def test_drop_newest(self):
+        #Arrange
+        q = abstract.DropNewestIncrementalQueue(provider="p", consumer="c", maxsize=2)
+
+        #Act
+        for i in range(4):
+            q.put(self._message(i))
+
+        #Assert
+        self.assertEqual(self._payloads(q), [0, 1])
+        self.assertEqual(q.dropped, 2)
+
+    def test_drop_adds_keeps_revoke_and_commit(self):
+        #Arrange
+        q = abstract.DropAddsIncrementalQueue(provider="p", consumer="c", maxsize=2)
+
+        #Act
+        q.put(self._message(0))
+        q.put(self._message(1))
+        q.put(self._message(2))
+        q.put(self._message(3, abstract.UpdateType.REVOKE))
+        q.put(self._message(4, abstract.UpdateType.COMMIT))
+        q.put(self._message(5, abstract.UpdateType.COMMIT))
+
+        #Assert
+        self.assertEqual(self._payloads(q), [3, 4, 5])
+        self.assertEqual(q.dropped, 3)
+
+    def test_priority_queue_control_overtakes_adds(self):
+        #Arrange
+        q = abstract.PriorityIncrementalQueue(provider="p", consumer="c")
+
+        #Act
+        q.put(self._message(0))
+        q.put(self._message(1))
+        q.put(self._message(2, abstract.UpdateType.REVOKE))
+        q.put(self._message(3, abstract.UpdateType.COMMIT))
+        result = [q.get_nowait() for _ in range(4)]
+
+        #Assert
+        self.assertEqual([next(um.incremental_units()).payload for um in result], [2, 3, 0, 1])
+        self.assertTrue(q.empty())
+
+    def test_priority_queue_keeps_order_of_each_iu(self):
+        #Arrange
+        q = abstract.PriorityIncrementalQueue(provider="p", consumer="c")
+        add = self._message(0)
+        revoke = abstract.UpdateMessage.from_iu(next(add.incremental_units()), abstract.UpdateType.REVOKE)
+
+        #Act
+        q.put(add)
+        q.put(self._message(1))
+        q.put(revoke)
+        q.put(self._message(2, abstract.UpdateType.COMMIT))
+        result = [q.get_nowait() for _ in range(4)]
+
+        #Assert
+        self.assertIs(result[1], add)
+        self.assertIs(result[3], revoke)
+        self.assertEqual(next(result[0].incremental_units()).payload, 2)
+
+    def test_coalescing_queue_keeps_newest_per_key(self):
+        #Arrange
+        q = abstract.CoalescingIncrementalQueue.keyed(
+            lambda um: next(um.incremental_units()).payload % 2
+        )(provider="p", consumer="c")
+
+        #Act
+        for payload in range(6):
+            q.put(self._message(payload))
+        q.put(self._message(6, abstract.UpdateType.COMMIT))
+        q.put(self._message(7))
+
+        #Assert
+        self.assertEqual(self._payloads(q), [4, 7, 6])
+        self.assertEqual(q.coalesced, 5)
+        self.assertEqual(next([q.get_nowait() for _ in range(3)][1].incremental_units()).payload, 7)
+        self.assertEqual(q._waiting, {})
+
+    def test_coalescing_key_has_to_be_a_hashable_value(self):
+        #Arrange
+        by_iterator = abstract.CoalescingIncrementalQueue.keyed(
+            lambda um: um.update_types()
+        )(provider="p", consumer="c")
+        by_list = abstract.CoalescingIncrementalQueue.keyed(
+            lambda um: [iu.payload for iu in um.incremental_units()]
+        )(provider="p", consumer="c")
+
+        #Act
+        #Assert
+        self.assertRaises(TypeError, by_iterator.put, self._message(0))
+        self.assertRaises(TypeError, by_list.put, self._message(0))
+        self.assertRaises(TypeError, abstract.CoalescingIncrementalQueue.keyed, "joint")
+
+    def test_append_shares_frozen_update_message(self):
+        #Arrange
+        provider = MockModule()
+        consumers = [MockModule() for _ in range(3)]
+        queues = [provider.subscribe(c) for c in consumers]
+        um = self._message(0)
+
+        #Act
+        provider.append(um)
+        received = [q.get_nowait() for q in queues]
+
+        #Assert
+        self.assertTrue(all(r is um for r in received))
+        self.assertTrue(um.is_frozen())
+        self.assertRaises(ValueError, um.add_iu, next(um.incremental_units()), abstract.UpdateType.ADD)
+
+
+class TestBatchProcessing(unittest.TestCase):
+
+    def _message(self, payload, update_type=abstract.UpdateType.ADD, iu=None):
+        if iu is None:
+            iu = MockIU(creator=MockModule(), iuid=payload, payload=payload)
+        return abstract.UpdateMessage.from_iu(iu, update_type)
+
+    def test_merge_cancels_revoked_ius(self):
+        #Arrange
+        first = self._message(0)
+        second = self._message(1)
+        revoke = self._message(None, abstract.UpdateType.REVOKE, iu=next(first.incremental_units()))
+
+        #Act
+        merged = abstract.UpdateMessage.merge([first, second, revoke])
+        kept = abstract.UpdateMessage.merge([first, second, revoke], cancel_revoked=False)
+
+        #Assert
+        self.assertEqual([iu.payload for iu in merged.incremental_units()], [1])
+        self.assertEqual(len(kept), 3)
+
+    def test_batch_module_receives_pending_messages_at_once(self):
+        #Arrange
+        provider = MockModule()
+        consumer = MockBatchModule()
+        provider.subscribe(consumer)
+        messages = [self._message(i) for i in range(5)]
+        for um in messages:
+            provider.append(um)
+        consumer._is_running = True
+
+        #Act
+        count = consumer._process_pending()
+
+        #Assert
+        self.assertEqual(count, 5)
+        self.assertEqual(consumer.batches, [messages])
+        self.assertEqual(consumer.providers, [provider])
+        self.assertIsNone(consumer.current_provider())
+        self.assertTrue(all(iu.processed_list() for um in messages for iu in um.incremental_units()))
+
+
+class TestTypeValidation(unittest.TestCase):
+
+    def test_subscribe_marks_compatible_queues_as_trusted(self):
+        #Arrange
+        producer = MockProducer()
+
+        #Act
+        trusted = producer.subscribe(MockBatchModule())
+        untrusted = producer.subscribe(MockOtherConsumer())
+        unknown = MockModule().subscribe(MockBatchModule())
+
+        #Assert
+        self.assertTrue(trusted.trusted)
+        self.assertFalse(untrusted.trusted)
+        self.assertFalse(unknown.trusted)
+
+    def test_only_validated_messages_skip_the_input_check(self):
+        #Arrange
+        producer = MockProducer()
+        consumer = MockBatchModule()
+        q = producer.subscribe(consumer)
+        valid = abstract.UpdateMessage.from_iu(
+            MockIU(creator=producer, iuid=1), abstract.UpdateType.ADD
+        )
+        invalid = abstract.UpdateMessage.from_iu(
+            MockOtherIU(creator=producer, iuid=2), abstract.UpdateType.ADD
+        )
+
+        #Act
+        producer.append(valid)
+        producer.append(invalid)
+
+        #Assert
+        self.assertEqual(valid._validated_by, producer.id)
+        self.assertIsNone(invalid._validated_by)
+        self.assertTrue(consumer._check_input(q.get_nowait(), q))
+        self.assertFalse(consumer._check_input(q.get_nowait(), q))
+        self.assertEqual(consumer._input_types, {MockIU: True, MockOtherIU: False})
+
+
+class MockModule(abstract.AbstractModule):
+    @staticmethod
+    def name():
+        return "mock_module"
+
+
+class MockBatchModule(MockModule):
+    @staticmethod
+    def input_ius():
+        return [MockIU]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = []
+        self.providers = []
+
+    def process_update_batch(self, update_messages):
+        self.batches.append(update_messages)
+        self.providers.append(self.current_provider())
+        return None
+
+
+
+class MockIU(abstract.IncrementalUnit):
+    @staticmethod
+    def type():
+        return "mock_iu"
+
+
+class MockOtherIU(abstract.IncrementalUnit):
+    @staticmethod
+    def type():
+        return "mock_other_iu"
+
+
+class MockProducer(MockModule):
+    @staticmethod
+    def output_iu():
+        return MockIU
+
+
+class MockOtherConsumer(MockModule):
+    @staticmethod
+    def input_ius():
+        return [MockOtherIU]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import threading
+import unittest
+import retico_core
+from retico_core import network, scheduler, text, debug
+
+'''
+test format:
+def test_X(self):
+    #Arrange
+
+        #Act
+
+        #Assert
+'''
+
+class MockPassThrough(retico_core.AbstractModule):
+    @staticmethod
+    def name():
+        return "mock_pass_through"
+    @staticmethod
+    def description():
+        return "mock"
+    @staticmethod
+    def input_ius():
+        return [text.TextIU]
+    @staticmethod
+    def output_iu():
+        return text.TextIU
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.max_active = 0
+    def process_update(self, update_message):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        um = retico_core.UpdateMessage()
+        for iu, ut in update_message:
+            output_iu = self.create_iu(iu)
+            output_iu.payload = iu.payload
+            um.add_iu(output_iu, ut)
+        self.active -= 1
+        return um
+
+class MockLegacyRun(MockPassThrough):
+    def run(self, run_setup=True):
+        self.run_setup = run_setup
+        super().run(run_setup=run_setup)
+
+# Test cases
+class TestScheduler(unittest.TestCase):
+
+    def test_scheduler_keeps_order(self):
+        #Arrange
+        received = []
+        done = threading.Event()
+        def callback(update_message):
+            received.extend(iu.payload for iu in update_message.incremental_units())
+            if len(received) == 100:
+                done.set()
+        trigger = text.TextTriggerModule()
+        middle = MockPassThrough()
+        sink = debug.CallbackModule(callback)
+        trigger.subscribe(middle)
+        middle.subscribe(sink)
+        sched = scheduler.Scheduler(workers=4)
+
+        #Act
+        retico_core.network.run(trigger, scheduler=sched)
+        for i in range(100):
+            trigger.trigger({"text": str(i)})
+        done.wait(timeout=10)
+        retico_core.network.stop(trigger)
+        sched.shutdown()
+
+        #Assert
+        self.assertEqual(received, [str(i) for i in range(100)])
+        self.assertEqual(middle.max_active, 1)
+
+    def test_scheduler_runs_producing_module_in_thread(self):
+        #Arrange
+        trigger = text.TextTriggerModule()
+        middle = MockPassThrough()
+
+        #Act
+        trigger_schedulable = trigger.is_schedulable()
+        middle_schedulable = middle.is_schedulable()
+
+        #Assert
+        self.assertFalse(trigger_schedulable)
+        self.assertTrue(middle_schedulable)
+
+    def test_scheduler_removes_stopped_module(self):
+        #Arrange
+        middle = MockPassThrough()
+        sched = scheduler.Scheduler(workers=1)
+
+        #Act
+        middle.run(scheduler=sched)
+        added = sched.modules()
+        middle.stop()
+        sched.shutdown()
+
+        #Assert
+        self.assertEqual(added, [middle])
+        self.assertEqual(sched.modules(), [])
+
+    def test_network_runs_modules_without_scheduler_argument(self):
+        #Arrange
+        trigger = text.TextTriggerModule()
+        middle = MockLegacyRun()
+        trigger.subscribe(middle)
+
+        #Act
+        network.run(trigger)
+        network.stop(trigger)
+
+        #Assert
+        self.assertFalse(middle.run_setup)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import time
+import unittest
+from retico_core import abstract, stats
+
+'''
+test format:
+def test_X(self):
+    #Arrange
+
+        #Act
+
+        #Assert
+'''
+
+class MockModule(abstract.AbstractModule):
+    @staticmethod
+    def name():
+        return "mock_module"
+    @staticmethod
+    def input_ius():
+        return [MockIU]
+    def process_update(self, update_message):
+        return None
+
+class MockIU(abstract.IncrementalUnit):
+    @staticmethod
+    def type():
+        return "mock_iu"
+
+class OtherIU(abstract.IncrementalUnit):
+    @staticmethod
+    def type():
+        return "other_iu"
+
+# Test cases
+class TestStats(unittest.TestCase):
+
+    def test_histogram_percentiles(self):
+        #Arrange
+        histogram = stats.Histogram(bounds=(1, 2, 5, 10))
+
+        #Act
+        for value in [0.5] * 90 + [4] * 5 + [7] * 4 + [20]:
+            histogram.record(value)
+
+        #Assert
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.percentile(50), 1)
+        self.assertEqual(histogram.percentile(95), 5)
+        self.assertEqual(histogram.percentile(99), 10)
+        self.assertEqual(histogram.percentile(100), 20)
+        self.assertEqual(histogram.summary()["max"], 20)
+
+    def test_module_records_processed_and_invalid_messages(self):
+        #Arrange
+        provider = MockModule()
+        module = MockModule()
+        provider.subscribe(module)
+        for i in range(3):
+            provider.append(abstract.UpdateMessage.from_iu(
+                MockIU(creator=provider, iuid=i), abstract.UpdateType.ADD))
+        provider.append(abstract.UpdateMessage.from_iu(
+            OtherIU(creator=provider, iuid=3), abstract.UpdateType.ADD))
+        module._is_running = True
+
+        #Act
+        module._process_pending()
+        result = module.stats()
+
+        #Assert
+        self.assertEqual(result["messages"], 3)
+        self.assertEqual(result["ius"], 3)
+        self.assertEqual(result["invalid_ius"], 1)
+        self.assertEqual(result["queue_wait"]["count"], 3)
+        self.assertEqual(result["process_time"]["count"], 3)
+        self.assertGreater(result["queue_wait"]["p50"], 0)
+
+    def test_queue_wait_is_kept_per_buffer(self):
+        #Arrange
+        provider = MockModule()
+        relay = MockModule()
+        module = MockModule()
+        other = MockModule()
+        provider.subscribe(module)
+        relay.subscribe(other)
+        update_message = abstract.UpdateMessage.from_iu(
+            MockIU(creator=provider, iuid=0), abstract.UpdateType.ADD)
+        provider.append(update_message)
+        time.sleep(0.05)
+
+        #Act
+        relay.append(update_message)
+        module._is_running = True
+        module._process_pending()
+
+        #Assert
+        self.assertGreaterEqual(module.stats()["queue_wait"]["max"], 0.05)
+        self.assertEqual(module.left_buffers()[0]._put_times, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import json
+import os
+import tempfile
+import unittest
+from retico_core import abstract, tracing
+
+'''
+test format:
+def test_X(self):
+    #Arrange
+
+        #Act
+
+        #Assert
+'''
+
+class MockIU(abstract.IncrementalUnit):
+    @staticmethod
+    def type():
+        return "mock_iu"
+
+class MockModule(abstract.AbstractModule):
+    @staticmethod
+    def name():
+        return "mock_module"
+    @staticmethod
+    def input_ius():
+        return [MockIU]
+    @staticmethod
+    def output_iu():
+        return MockIU
+    def process_update(self, update_message):
+        um = abstract.UpdateMessage()
+        for iu, ut in update_message:
+            um.add_iu(self.create_iu(iu), ut)
+        return um
+
+# Test cases
+class TestTracing(unittest.TestCase):
+
+    def tearDown(self):
+        tracing.disable()
+
+    def test_breakdown_follows_grounded_in_chain(self):
+        #Arrange
+        tracing.enable()
+        source, first, second, sink = MockModule(), MockModule(), MockModule(), MockModule()
+        source.subscribe(first)
+        first.subscribe(second)
+        second.subscribe(sink)
+        for module in (first, second, sink):
+            module._is_running = True
+        origin = MockIU(creator=source, iuid=0)
+
+        #Act
+        source.append(abstract.UpdateMessage.from_iu(origin, abstract.UpdateType.ADD))
+        first._process_pending()
+        second._process_pending()
+        final = second.latest_iu()
+        hops = tracing.breakdown(final)
+
+        #Assert
+        self.assertEqual([hop["iu"] for hop in hops], [origin, final.grounded_in, final])
+        for hop in hops[1:]:
+            self.assertGreaterEqual(hop["queue_wait"], 0)
+            self.assertGreaterEqual(hop["processing"], 0)
+            self.assertAlmostEqual(hop["latency"], hop["queue_wait"] + hop["processing"])
+        self.assertEqual(tracing.breakdown(final, until=MockIU)[0]["iu"], final)
+        self.assertGreaterEqual(tracing.end_to_end(final), 0)
+
+    def test_no_stamps_when_disabled(self):
+        #Arrange
+        source, sink = MockModule(), MockModule()
+        source.subscribe(sink)
+        sink._is_running = True
+        iu = MockIU(creator=source, iuid=0)
+
+        #Act
+        source.append(abstract.UpdateMessage.from_iu(iu, abstract.UpdateType.ADD))
+        sink._process_pending()
+
+        #Assert
+        self.assertIsNone(iu.emitted_at)
+        self.assertIsNone(iu.received_at)
+
+
+class TestTraceRecorder(unittest.TestCase):
+
+    def test_records_process_update_and_queue_events(self):
+        #Arrange
+        source, sink = MockModule(), MockModule()
+        source.subscribe(sink)
+        sink._is_running = True
+        filename = os.path.join(tempfile.mkdtemp(), "trace.json")
+
+        #Act
+        with tracing.TraceRecorder() as recorder:
+            source.append(abstract.UpdateMessage.from_iu(
+                MockIU(creator=source, iuid=0), abstract.UpdateType.ADD))
+            sink._process_pending()
+        source.append(abstract.UpdateMessage.from_iu(
+            MockIU(creator=source, iuid=1), abstract.UpdateType.ADD))
+        recorder.save(filename)
+        with open(filename) as f:
+            trace = json.load(f)
+
+        #Assert
+        events = [(e["ph"], e["name"]) for e in trace["traceEvents"]]
+        self.assertEqual(events, [("M", "thread_name"), ("i", "put"), ("i", "get"),
+                                  ("X", "mock_module")])
+        self.assertIsNone(tracing.RECORDER)
+
+
+if __name__ == '__main__':
+    unittest.main()